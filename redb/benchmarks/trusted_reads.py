@@ -0,0 +1,87 @@
+"""
+Time reading documents with and without pydantic validation.
+
+    python -m benchmarks.trusted_reads [--documents 1000] [--dimensions 1536]
+
+Documents hold a vector of floats, as embeddings do, and are read back from
+a JSON database in a temporary folder.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from redb.core import Document, RedB
+from redb.core.base import construct_document
+from redb.interface.configs import JSONConfig
+
+
+class Embedding(Document):
+    text: str
+    model: str
+    vector: list[float]
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.text, cls.model]
+
+
+def _best(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = [
+        Embedding(
+            text=f"text {i}",
+            model="benchmark",
+            vector=[random.random() for _ in range(args.dimensions)],
+        )
+        for i in range(args.documents)
+    ]
+    data = [embedding.dict() for embedding in embeddings]
+
+    results = {
+        "model, validated": _best(
+            lambda: [Embedding(**doc) for doc in data], args.repeat
+        ),
+        "model, trusted": _best(
+            lambda: [construct_document(Embedding, doc) for doc in data], args.repeat
+        ),
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        RedB.setup(
+            JSONConfig(
+                client_folder_path=Path(folder),
+                default_database_folder_path="benchmark",
+            )
+        )
+        Embedding.insert_many(embeddings)
+        results["find_many, validated"] = _best(Embedding.find_many, args.repeat)
+        results["find_many, trusted"] = _best(
+            lambda: Embedding.find_many(validate=False), args.repeat
+        )
+
+    print(
+        f"{args.documents} documents, {args.dimensions} dimensions, best of {args.repeat}"
+    )
+    for name, seconds in results.items():
+        per_document = seconds / args.documents * 1e6
+        print(f"{name:<22} {seconds * 1e3:9.1f} ms {per_document:9.1f} us/doc")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 import hashlib
-import dataclasses
-from typing import Any, Callable, ClassVar, Dict, Type
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Type
 
 from pydantic import BaseModel, Field
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
 from pydantic.main import ModelMetaclass
 from typing_extensions import dataclass_transform
 
+from redb.interface.configs import ReadPolicy
 from redb.interface.fields import ClassField, CompoundIndex, Index
 
 from .instance import RedB
+from .serializers import get_serializer
 
 IMPORT_ERROR_MSG = (
     "%s does not seem to be installed, maybe you forgot to `pip install redb[%s]`"
@@ -32,30 +35,58 @@ class DocumentMetaclass(ModelMetaclass):
 
 class BaseDocument(BaseModel, metaclass=DocumentMetaclass):
     __database_name__: ClassVar[str | None] = None
+    # Name of a registered serializer (see redb.core.serializers), None for
+    # the fastest one installed
+    __serializer__: ClassVar[str | None] = None
+    # Whether documents read from the database go through pydantic validation,
+    # find calls may override it with `validate=`
+    __validate_reads__: ClassVar[bool] = True
+    # Mongo read preference and read concern of the reads of the class, read
+    # calls may override it with `read_policy=`. None reads as the client does.
+    __read_policy__: ClassVar[ReadPolicy | None] = None
 
     def dict(self, *args, **kwargs) -> dict:
         if "by_alias" not in kwargs:
             kwargs["by_alias"] = True
         out = super().dict(*args, **kwargs)
-        return _apply_encoders(out, self.__config__.json_encoders)
+        serializer = get_serializer(self.__serializer__)
+        return serializer.to_builtins(out, self.__config__.json_encoders)
+
+    @staticmethod
+    def _get_database(instance_or_class: Type["BaseDocument"] | "BaseDocument") -> Any:
+        database_name = instance_or_class.__database_name__
+        client = RedB.get_client()
+        if database_name:
+            return client.get_database(database_name)
+        return client.get_default_database()
+
+    @staticmethod
+    def _get_read_policy(
+        instance_or_class: Type["BaseDocument"] | "BaseDocument",
+        read_policy: ReadPolicy | None = None,
+    ) -> ReadPolicy | None:
+        if read_policy is not None:
+            return read_policy
+        return instance_or_class.__read_policy__
 
     @staticmethod
     def _get_driver_collection(
         instance_or_class: Type["BaseDocument"] | "BaseDocument",
+        read_policy: ReadPolicy | None = None,
     ) -> Any:
         collection_name = instance_or_class.collection_name()
-        database_name = instance_or_class.__database_name__
-
-        client = RedB.get_client()
-        database = (
-            client.get_database(database_name)
-            if database_name
-            else client.get_default_database()
-        )
+        database = BaseDocument._get_database(instance_or_class)
 
         client_name = RedB.get_client_name()
         if client_name == "mongo":
-            return database._get_driver_database()[collection_name]
+            collection = database._get_driver_database()[collection_name]
+            read_policy = BaseDocument._get_read_policy(instance_or_class, read_policy)
+            if read_policy is None:
+                return collection
+            from redb.mongo_system import with_read_policy
+
+            # Cached, the same handle serves every read with this policy
+            return with_read_policy(collection, read_policy)
         elif client_name == "json":
             return database._get_driver_database() / collection_name
         elif client_name == "migo":
@@ -79,7 +110,7 @@ class BaseDocument(BaseModel, metaclass=DocumentMetaclass):
             except ImportError:
                 raise ImportError(IMPORT_ERROR_MSG.format("json_system", "json"))
 
-            return JSONCollection(driver_collection)
+            return JSONCollection(driver_collection, RedB.get_config())
 
         elif client_name == "migo":
             try:
@@ -92,11 +123,48 @@ class BaseDocument(BaseModel, metaclass=DocumentMetaclass):
         raise ValueError(f"Unknown client: {client_name}")
 
     @staticmethod
-    def _get_collection(instance_or_class: Type["BaseDocument"] | "BaseDocument"):
+    def _get_collection(
+        instance_or_class: Type["BaseDocument"] | "BaseDocument",
+        read_policy: ReadPolicy | None = None,
+    ):
+        client_name = RedB.get_client_name()
+        if client_name in ("json", "mongo"):
+            # JSON databases keep their collection handles around for reuse,
+            # Mongo ones hand the options of their client down to them
+            database = BaseDocument._get_database(instance_or_class)
+            collection_name = instance_or_class.collection_name()
+            read_policy = BaseDocument._get_read_policy(instance_or_class, read_policy)
+            if client_name == "mongo" and read_policy is not None:
+                return database.get_collection(collection_name, read_policy=read_policy)
+            return database[collection_name]
+
         driver_collection = BaseDocument._get_driver_collection(instance_or_class)
         system_collection = BaseDocument._get_system_collection(driver_collection)
         return system_collection
 
+    @staticmethod
+    def _get_async_collection(
+        instance_or_class: Type["BaseDocument"] | "BaseDocument",
+        read_policy: ReadPolicy | None = None,
+    ):
+        if RedB.get_client_name() == "mongo":
+            try:
+                from redb.mongo_system import get_async_collection
+            except ImportError:
+                raise ImportError(IMPORT_ERROR_MSG.format("mongo_system", "mongo"))
+
+            driver_collection = BaseDocument._get_driver_collection(instance_or_class)
+            return get_async_collection(
+                driver_collection,
+                BaseDocument._get_read_policy(instance_or_class, read_policy),
+            )
+
+        # No asyncio driver, blocking calls go to a thread pool instead
+        from .threaded import ThreadedCollection
+
+        collection = BaseDocument._get_collection(instance_or_class, read_policy)
+        return ThreadedCollection(collection, RedB.get_executor())
+
     @classmethod
     def collection_name(cls: Type["BaseDocument"]) -> str:
         return cls.__name__.lower()
@@ -174,26 +242,47 @@ class BaseDocument(BaseModel, metaclass=DocumentMetaclass):
         return f"{class_name}({attributes})"
 
 
-def _apply_encoders(obj, encoders):
-    obj_type = type(obj)
-    if obj_type == list:
-        obj = [_apply_encoders(val, encoders) for val in obj]
-    elif obj_type == set:
-        obj = {_apply_encoders(val, encoders) for val in obj}
-    elif obj_type == tuple:
-        obj = (_apply_encoders(val, encoders) for val in obj)
-    elif obj_type == dict:
-        obj = {
-            _apply_encoders(key, encoders): _apply_encoders(val, encoders)
-            for key, val in obj.items()
-        }
-    elif obj_type in encoders:
-        encoding = encoders[obj_type]
-        obj = encoding(obj) if callable(encoding) else encoding
-    elif dataclasses.is_dataclass(obj):
-        return dataclasses.asdict(obj)
-    else:
-        for encoder_from, encoder_fn in encoders.items():
-            if isinstance(obj, encoder_from):
-                return encoder_fn(obj)
-    return obj
+def construct_document(cls: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """
+    Build `cls` from trusted data, such as documents read back from the
+    database, without validating it.
+
+    Aliases and defaults are applied and nested models are built the same
+    way, every other value is kept as stored. Data missing a required field
+    goes through regular validation, which reports it.
+    """
+    values = {}
+    fields_set = set()
+    for name, field in cls.__fields__.items():
+        if field.alias in data:
+            value = data[field.alias]
+        elif name in data:
+            value = data[name]
+        elif field.required:
+            return cls(**data)
+        else:
+            values[name] = field.get_default()
+            continue
+        values[name] = _construct_value(field, value)
+        fields_set.add(name)
+    return cls.construct(fields_set, **values)
+
+
+def _construct_value(field: ModelField, value: Any) -> Any:
+    if value is None:
+        return None
+    type_ = field.type_
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        if field.shape == SHAPE_SINGLETON and isinstance(value, dict):
+            return construct_document(type_, value)
+        if field.shape == SHAPE_LIST and isinstance(value, list):
+            return [
+                construct_document(type_, v) if isinstance(v, dict) else v
+                for v in value
+            ]
+    elif (
+        type_ is datetime and field.shape == SHAPE_SINGLETON and isinstance(value, str)
+    ):
+        # Backends storing datetimes as ISO 8601 text
+        return datetime.fromisoformat(value)
+    return value
@@ -0,0 +1,248 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Type
+
+import bson
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+from redb.interface.errors import BulkWriteError
+from redb.interface.fields import PyMongoOperations
+from redb.interface.results import BulkWriteResult
+
+from .document import (
+    Document,
+    DocumentData,
+    _format_document_data,
+    _optimize_filter,
+    _raise_if_updating_hashable,
+    _stamp_update,
+    _validate_fields,
+)
+
+# Size of the largest document Mongo takes, a batch never grows past it
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class BulkWriter:
+    """
+    Buffers writes to the collection of `cls` and sends them as unordered
+    bulk writes once `max_ops` operations or `max_bytes` of data are
+    buffered, every `flush_interval` seconds and when the writer closes.
+
+    Operations are checked and formatted when buffered, like the `Document`
+    methods do, and return a future holding the inserted or upserted id of
+    the operation (None for the rest) or its error once flushed. Operations
+    of a batch may run in any order. Leaving a `with` block raises a
+    `BulkWriteError` with the errors of every failed operation, keyed by
+    the order they were buffered in.
+    """
+
+    def __init__(
+        self,
+        cls: Type[Document],
+        max_ops: int = 1000,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        flush_interval: float | None = None,
+    ) -> None:
+        self.__cls = cls
+        self.__max_ops = max_ops
+        self.__max_bytes = max_bytes
+        self.__flush_interval = flush_interval
+        # Index, operation, future and inserted id of every buffered operation
+        self.__buffer: list[tuple[int, PyMongoOperations, Future, Any]] = []
+        self.__buffered_bytes = 0
+        self.__count = 0
+        self.__errors: dict[int, Exception] = {}
+        self.__result = BulkWriteResult(
+            deleted_count=0,
+            inserted_count=0,
+            matched_count=0,
+            modified_count=0,
+            upserted_count=0,
+            upserted_ids={},
+        )
+        # Held while buffering and flushing, batches go out in order
+        self.__lock = threading.RLock()
+        self.__closed = threading.Event()
+        self.__timer: threading.Thread | None = None
+
+    def __enter__(self) -> "BulkWriter":
+        if self.__flush_interval is not None:
+            self.__timer = threading.Thread(
+                target=self.__flush_periodically, daemon=True
+            )
+            self.__timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        if exc_type is None and self.__errors:
+            raise BulkWriteError(
+                errors=dict(self.__errors),
+                result=self.__result,
+                collection_name=self.__cls.collection_name(),
+            )
+
+    @property
+    def result(self) -> BulkWriteResult:
+        """Totals of the operations flushed so far."""
+        return self.__result
+
+    @property
+    def errors(self) -> dict[int, Exception]:
+        """Errors of the operations flushed so far, by index."""
+        return self.__errors
+
+    def insert(self, document: Document) -> Future:
+        data = _format_document_data(document)
+        return self.__add(InsertOne(data), data)
+
+    def insert_one(self, data: DocumentData) -> Future:
+        _validate_fields(self.__cls, data)
+        data = _format_document_data(data)
+        if "_id" not in data:
+            # Not every backend hands generated ids back, so they are made here
+            data = _format_document_data(self.__cls(**data))
+        return self.__add(InsertOne(data), data)
+
+    def replace_one(
+        self,
+        filter: DocumentData,
+        replacement: DocumentData,
+        upsert: bool = False,
+        allow_new_fields: bool = False,
+    ) -> Future:
+        if not allow_new_fields:
+            _validate_fields(self.__cls, replacement)
+        filter = _format_document_data(filter)
+        replacement = _format_document_data(replacement)
+        return self.__add(ReplaceOne(filter, replacement, upsert=upsert), replacement)
+
+    def update_one(
+        self,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> Future:
+        filter, update = self.__format_update(
+            filter, update, upsert, operator, allow_new_fields
+        )
+        return self.__add(UpdateOne(filter, update, upsert=upsert), update)
+
+    def update_many(
+        self,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> Future:
+        filter, update = self.__format_update(
+            filter, update, upsert, operator, allow_new_fields
+        )
+        return self.__add(UpdateMany(filter, update, upsert=upsert), update)
+
+    def delete_one(self, filter: DocumentData) -> Future:
+        filter = _format_document_data(filter)
+        return self.__add(DeleteOne(filter), filter)
+
+    def delete_many(self, filter: DocumentData) -> Future:
+        filter = _format_document_data(filter)
+        return self.__add(DeleteMany(filter), filter)
+
+    def flush(self) -> None:
+        with self.__lock:
+            batch = self.__buffer
+            self.__buffer = []
+            self.__buffered_bytes = 0
+            if batch:
+                self.__write(batch)
+
+    def close(self) -> None:
+        self.__closed.set()
+        if self.__timer is not None:
+            self.__timer.join()
+            self.__timer = None
+        self.flush()
+
+    def __format_update(
+        self,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool,
+        operator: str | None,
+        allow_new_fields: bool,
+    ) -> tuple[dict, dict]:
+        if not allow_new_fields:
+            _validate_fields(self.__cls, update)
+        filter = _format_document_data(filter)
+        update = _format_document_data(update)
+        if not upsert:
+            filter = _optimize_filter(self.__cls, filter)
+        _raise_if_updating_hashable(self.__cls, update)
+        if operator is not None:
+            update = {operator: update}
+        return filter, _stamp_update(update, filter, upsert)
+
+    def __add(self, operation: PyMongoOperations, data: dict) -> Future:
+        if self.__closed.is_set():
+            raise ValueError("Cannot write through a closed BulkWriter")
+        future: Future = Future()
+        size = len(bson.encode(data))
+        with self.__lock:
+            if self.__buffer and self.__buffered_bytes + size > self.__max_bytes:
+                self.flush()
+            inserted = data if isinstance(operation, InsertOne) else None
+            self.__buffer.append((self.__count, operation, future, inserted))
+            self.__buffered_bytes += size
+            self.__count += 1
+            if len(self.__buffer) >= self.__max_ops:
+                self.flush()
+        return future
+
+    def __write(self, batch: list[tuple[int, PyMongoOperations, Future, Any]]) -> None:
+        errors: dict[int, Exception] = {}
+        try:
+            result = self.__cls.bulk_write(
+                [operation for _, operation, _, _ in batch], ordered=False
+            )
+        except BulkWriteError as e:
+            errors = e.errors
+            result = e.result
+        except Exception as e:
+            # Nothing tells which operations went through
+            for index, _, future, _ in batch:
+                self.__errors[index] = e
+                future.set_exception(e)
+            return
+
+        self.__add_result(result, batch)
+        for i, (index, _, future, inserted) in enumerate(batch):
+            if i in errors:
+                self.__errors[index] = errors[i]
+                future.set_exception(errors[i])
+            elif i in result.upserted_ids:
+                future.set_result(result.upserted_ids[i])
+            else:
+                future.set_result(None if inserted is None else inserted["_id"])
+
+    def __add_result(
+        self,
+        result: BulkWriteResult | None,
+        batch: list[tuple[int, PyMongoOperations, Future, Any]],
+    ) -> None:
+        if result is None:
+            return
+        self.__result.deleted_count += result.deleted_count
+        self.__result.inserted_count += result.inserted_count
+        self.__result.matched_count += result.matched_count
+        self.__result.modified_count += result.modified_count
+        self.__result.upserted_count += result.upserted_count
+        for i, id in result.upserted_ids.items():
+            self.__result.upserted_ids[batch[i][0]] = id
+
+    def __flush_periodically(self) -> None:
+        while not self.__closed.wait(self.__flush_interval):
+            self.flush()
@@ -1,10 +1,24 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Sequence, Type, TypeAlias, TypeVar, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    Sequence,
+    Type,
+    TypeAlias,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import pytz
 from pymongo.errors import DuplicateKeyError
 
+from redb.interface.configs import ReadPolicy
 from redb.interface.errors import (
     CannotUpdateIdentifyingField,
     UniqueConstraintViolation,
@@ -31,7 +45,12 @@ from redb.interface.results import (
     UpdateOneResult,
 )
 
-from .base import BaseDocument
+from .base import BaseDocument, construct_document
+from .pagination import Page, keyset_sort, make_page, page_query
+from .serializers import encode_datetime, encode_dbref
+
+if TYPE_CHECKING:
+    from .bulk import BulkWriter
 
 DocumentData: TypeAlias = Union["Document", Dict[str, Any]]
 IncludeColumns: TypeAlias = list[IncludeColumn] | list[str] | None
@@ -47,8 +66,8 @@ class Document(BaseDocument):
 
     class Config:
         json_encoders = {
-            datetime: lambda d: d.isoformat(),
-            DBRef: lambda ref: dict(ref.as_doc()),
+            datetime: encode_datetime,
+            DBRef: encode_dbref,
             Path: str,
             ObjectId: str,
         }
@@ -80,11 +99,13 @@ class Document(BaseDocument):
         self: T,
         fields: IncludeColumns = None,
         skip: int = 0,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
     ) -> T:
-        collection = Document._get_collection(self.__class__)
+        collection = Document._get_collection(self.__class__, read_policy)
         filter = _format_document_data(self)
         formatted_fields = _format_fields(fields)
-        return_cls = _get_return_cls(self.__class__, fields)
+        return_cls = _get_return_cls(self.__class__, fields, validate)
         return collection.find_one(
             cls=self.__class__,
             return_cls=return_cls,
@@ -99,11 +120,13 @@ class Document(BaseDocument):
         filter: OptionalDocumentData = None,
         fields: IncludeColumns = None,
         skip: int = 0,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
     ) -> T:
-        collection = Document._get_collection(cls)
+        collection = Document._get_collection(cls, read_policy)
         filter = _format_document_data(filter)
         formatted_fields = _format_fields(fields)
-        return_cls = _get_return_cls(cls, formatted_fields)
+        return_cls = _get_return_cls(cls, formatted_fields, validate)
         return collection.find_one(
             cls=cls,
             return_cls=return_cls,
@@ -122,15 +145,17 @@ class Document(BaseDocument):
         limit: int = 0,
         iterate: bool = False,
         batch_size: int | None = None,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
     ) -> list[T]:
         if iterate and batch_size is not None:
             msg = "'iterate' cannot be used with 'batch_size'. Batched find_many is already an iterable."
             raise UnsupportedOperation(msg)
 
-        collection = Document._get_collection(cls)
+        collection = Document._get_collection(cls, read_policy)
         filter = _format_document_data(filter)
         formatted_fields = _format_fields(fields)
-        return_cls = _get_return_cls(cls, formatted_fields)
+        return_cls = _get_return_cls(cls, formatted_fields, validate)
         sort_order = _format_sort(sort)
         return collection.find(
             cls=cls,
@@ -144,13 +169,50 @@ class Document(BaseDocument):
             batch_size=batch_size,
         )
 
+    @classmethod
+    def paginate(
+        cls: Type[T],
+        filter: OptionalDocumentData = None,
+        sort: SortColumns = None,
+        page_size: int = 50,
+        after: str | None = None,
+        before: str | None = None,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> Page[T]:
+        """
+        Page of documents following the `after` cursor or preceding the
+        `before` one, the first page when neither is given.
+
+        Pages seek past the cursor on the sort keys, with `_id` breaking
+        ties, instead of skipping documents, so an index on them keeps every
+        page as cheap as the first. Sorted fields must be set on every
+        document.
+        """
+        collection = Document._get_collection(cls, read_policy)
+        sort_order = keyset_sort(_format_sort(sort))
+        query, query_sort = page_query(
+            _format_document_data(filter), sort_order, after, before
+        )
+        items = collection.find(
+            cls=cls,
+            return_cls=_get_return_cls(cls, None, validate),
+            filter=query,
+            fields=None,
+            sort=query_sort,
+            skip=0,
+            limit=page_size + 1,
+        )
+        return make_page(items, sort_order, page_size, after, before)
+
     @classmethod
     def distinct(
         cls: Type[T],
         key: str,
         filter: OptionalDocumentData = None,
+        read_policy: ReadPolicy | None = None,
     ) -> list[Any]:
-        collection = Document._get_collection(cls)
+        collection = Document._get_collection(cls, read_policy)
         filter = _format_document_data(filter)
         return collection.distinct(
             cls=cls,
@@ -162,23 +224,69 @@ class Document(BaseDocument):
     def count_documents(
         cls: Type[T],
         filter: OptionalDocumentData = None,
+        read_policy: ReadPolicy | None = None,
     ) -> int:
-        collection = Document._get_collection(cls)
+        collection = Document._get_collection(cls, read_policy)
         filter = _format_document_data(filter)
         return collection.count_documents(
             cls=cls,
             filter=filter,
         )
 
+    @classmethod
+    def aggregate(
+        cls: Type[T],
+        pipeline: list[dict[str, Any]],
+        return_cls: Type[Any] | None = None,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> Iterator[Any]:
+        """
+        Stream the results of an aggregation pipeline, as dicts unless a
+        `return_cls` is given. Mongo runs it on the server, the JSON backend
+        in process.
+        """
+        collection = Document._get_collection(cls, read_policy)
+        return collection.aggregate(
+            cls=cls,
+            pipeline=pipeline,
+            return_cls=return_cls or dict,
+            allow_disk_use=allow_disk_use,
+            batch_size=batch_size,
+        )
+
     @classmethod
     def bulk_write(
         cls: Type[T],
         operations: list[PyMongoOperations],
+        ordered: bool = True,
     ) -> BulkWriteResult:
         collection = Document._get_collection(cls)
         return collection.bulk_write(
             cls=cls,
             operations=operations,
+            ordered=ordered,
+        )
+
+    @classmethod
+    def bulk_writer(
+        cls: Type[T],
+        max_ops: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        flush_interval: float | None = None,
+    ) -> "BulkWriter":
+        """
+        Buffer writes and send them as unordered bulk writes, see `BulkWriter`.
+
+            with Embedding.bulk_writer(max_ops=500) as writer:
+                for embedding in embeddings:
+                    writer.insert(embedding)
+        """
+        from .bulk import BulkWriter
+
+        return BulkWriter(
+            cls, max_ops=max_ops, max_bytes=max_bytes, flush_interval=flush_interval
         )
 
     def insert(self: T) -> InsertOneResult:
@@ -313,6 +421,7 @@ class Document(BaseDocument):
         _raise_if_updating_hashable(self.__class__, update)
         if operator is not None:
             update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
 
         result = collection.update_one(
             cls=self.__class__,
@@ -320,11 +429,6 @@ class Document(BaseDocument):
             update=update,
             upsert=upsert,
         )
-        collection.update_one(
-            cls=self.__class__,
-            filter=filter,
-            update={"$set": {"updated_at": datetime.now(pytz.UTC).isoformat()}},
-        )
         return result
 
     @classmethod
@@ -349,6 +453,7 @@ class Document(BaseDocument):
         _raise_if_updating_hashable(cls, update_data)
         if operator is not None:
             update_data = {operator: update_data}
+        update_data = _stamp_update(update_data, filter, upsert)
 
         try:
             result = collection.update_one(
@@ -357,11 +462,6 @@ class Document(BaseDocument):
                 update=update_data,
                 upsert=upsert,
             )
-            collection.update_one(
-                cls=cls,
-                filter=filter,
-                update={"$set": {"updated_at": datetime.now(pytz.UTC).isoformat()}},
-            )
         except DuplicateKeyError as e:
             raise UniqueConstraintViolation(
                 dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
@@ -390,6 +490,7 @@ class Document(BaseDocument):
         _raise_if_updating_hashable(cls, update)
         if operator is not None:
             update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
 
         try:
             result = collection.update_many(
@@ -398,11 +499,6 @@ class Document(BaseDocument):
                 update=update,
                 upsert=upsert,
             )
-            collection.update_many(
-                cls=cls,
-                filter=filter,
-                update={"$set": {"updated_at": datetime.now(pytz.UTC).isoformat()}},
-            )
         except DuplicateKeyError as e:
             raise UniqueConstraintViolation(
                 dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
@@ -442,6 +538,306 @@ class Document(BaseDocument):
             filter=filter,
         )
 
+    @classmethod
+    async def acreate_indexes(cls: Type[T]) -> None:
+        collection = Document._get_async_collection(cls)
+        for index in cls.get_indexes():
+            await collection.create_index(_format_index(index))
+
+    @classmethod
+    async def afind_one(
+        cls: Type[T],
+        filter: OptionalDocumentData = None,
+        fields: IncludeColumns = None,
+        skip: int = 0,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> T:
+        collection = Document._get_async_collection(cls, read_policy)
+        filter = _format_document_data(filter)
+        formatted_fields = _format_fields(fields)
+        return_cls = _get_return_cls(cls, formatted_fields, validate)
+        return await collection.find_one(
+            cls=cls,
+            return_cls=return_cls,
+            filter=filter,
+            skip=skip,
+            fields=formatted_fields,
+        )
+
+    @classmethod
+    async def afind_many(
+        cls: Type[T],
+        filter: OptionalDocumentData = None,
+        fields: IncludeColumns = None,
+        sort: SortColumns = None,
+        skip: int = 0,
+        limit: int = 0,
+        iterate: bool = False,
+        batch_size: int | None = None,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> list[T] | AsyncIterator[T] | AsyncIterator[list[T]]:
+        """Like `find_many`, iterating with `async for` when `iterate` or `batch_size` is set."""
+        if iterate and batch_size is not None:
+            msg = "'iterate' cannot be used with 'batch_size'. Batched find_many is already an iterable."
+            raise UnsupportedOperation(msg)
+
+        collection = Document._get_async_collection(cls, read_policy)
+        filter = _format_document_data(filter)
+        formatted_fields = _format_fields(fields)
+        return_cls = _get_return_cls(cls, formatted_fields, validate)
+        sort_order = _format_sort(sort)
+        return await collection.find(
+            cls=cls,
+            return_cls=return_cls,
+            filter=filter,
+            fields=formatted_fields,
+            sort=sort_order,
+            skip=skip,
+            limit=limit,
+            iterate=iterate,
+            batch_size=batch_size,
+        )
+
+    @classmethod
+    async def apaginate(
+        cls: Type[T],
+        filter: OptionalDocumentData = None,
+        sort: SortColumns = None,
+        page_size: int = 50,
+        after: str | None = None,
+        before: str | None = None,
+        validate: bool | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> Page[T]:
+        collection = Document._get_async_collection(cls, read_policy)
+        sort_order = keyset_sort(_format_sort(sort))
+        query, query_sort = page_query(
+            _format_document_data(filter), sort_order, after, before
+        )
+        items = await collection.find(
+            cls=cls,
+            return_cls=_get_return_cls(cls, None, validate),
+            filter=query,
+            fields=None,
+            sort=query_sort,
+            skip=0,
+            limit=page_size + 1,
+        )
+        return make_page(items, sort_order, page_size, after, before)
+
+    @classmethod
+    async def adistinct(
+        cls: Type[T],
+        key: str,
+        filter: OptionalDocumentData = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> list[Any]:
+        collection = Document._get_async_collection(cls, read_policy)
+        filter = _format_document_data(filter)
+        return await collection.distinct(cls=cls, key=key, filter=filter)
+
+    @classmethod
+    async def acount_documents(
+        cls: Type[T],
+        filter: OptionalDocumentData = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> int:
+        collection = Document._get_async_collection(cls, read_policy)
+        filter = _format_document_data(filter)
+        return await collection.count_documents(cls=cls, filter=filter)
+
+    @classmethod
+    async def aaggregate(
+        cls: Type[T],
+        pipeline: list[dict[str, Any]],
+        return_cls: Type[Any] | None = None,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+        read_policy: ReadPolicy | None = None,
+    ) -> AsyncIterator[Any]:
+        """Like `aggregate`, iterating with `async for`."""
+        collection = Document._get_async_collection(cls, read_policy)
+        return await collection.aggregate(
+            cls=cls,
+            pipeline=pipeline,
+            return_cls=return_cls or dict,
+            allow_disk_use=allow_disk_use,
+            batch_size=batch_size,
+        )
+
+    @classmethod
+    async def abulk_write(
+        cls: Type[T],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        collection = Document._get_async_collection(cls)
+        return await collection.bulk_write(
+            cls=cls, operations=operations, ordered=ordered
+        )
+
+    async def ainsert(self: T) -> InsertOneResult:
+        collection = Document._get_async_collection(self.__class__)
+        data = _format_document_data(self)
+        try:
+            return await collection.insert_one(cls=self.__class__, data=data)
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(
+                dup_keys=e.details["keyValue"], collection_name=self.collection_name()
+            )
+
+    @classmethod
+    async def ainsert_one(
+        cls: Type[T],
+        data: DocumentData,
+    ) -> InsertOneResult:
+        _validate_fields(cls, data)
+
+        collection = Document._get_async_collection(cls)
+        data = _format_document_data(data)
+        try:
+            return await collection.insert_one(cls=cls, data=data)
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(
+                dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
+            )
+
+    @classmethod
+    async def ainsert_many(
+        cls: Type[T],
+        data: Sequence[DocumentData],
+    ) -> InsertManyResult:
+        for val in data:
+            _validate_fields(cls, val)
+        collection = Document._get_async_collection(cls)
+        data = [_format_document_data(val) for val in data]
+        try:
+            return await collection.insert_many(cls=cls, data=data)
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(
+                dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
+            )
+
+    @classmethod
+    async def areplace_one(
+        cls: Type[T],
+        filter: DocumentData,
+        replacement: DocumentData,
+        upsert: bool = False,
+        allow_new_fields: bool = False,
+    ) -> ReplaceOneResult:
+        if not allow_new_fields:
+            _validate_fields(filter.__class__, replacement)
+
+        collection = Document._get_async_collection(cls)
+        filter = _format_document_data(filter)
+        replacement = _format_document_data(replacement)
+        return await collection.replace_one(
+            cls=cls,
+            filter=filter,
+            replacement=replacement,
+            upsert=upsert,
+        )
+
+    @classmethod
+    async def aupdate_one(
+        cls,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> UpdateOneResult:
+        if not allow_new_fields:
+            _validate_fields(cls, update)
+
+        collection = Document._get_async_collection(cls)
+        filter = _format_document_data(filter)
+        update_data = _format_document_data(update)
+
+        if not upsert:
+            filter = _optimize_filter(cls, filter)
+
+        _raise_if_updating_hashable(cls, update_data)
+        if operator is not None:
+            update_data = {operator: update_data}
+        update_data = _stamp_update(update_data, filter, upsert)
+
+        try:
+            result = await collection.update_one(
+                cls=cls,
+                filter=filter,
+                update=update_data,
+                upsert=upsert,
+            )
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(
+                dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
+            )
+        return result
+
+    @classmethod
+    async def aupdate_many(
+        cls: Type[T],
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> UpdateManyResult:
+        if not allow_new_fields:
+            _validate_fields(cls, update)
+
+        collection = Document._get_async_collection(cls)
+        filter = _format_document_data(filter)
+        update = _format_document_data(update)
+
+        if not upsert:
+            filter = _optimize_filter(cls, filter)
+
+        _raise_if_updating_hashable(cls, update)
+        if operator is not None:
+            update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
+
+        try:
+            result = await collection.update_many(
+                cls=cls,
+                filter=filter,
+                update=update,
+                upsert=upsert,
+            )
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(
+                dup_keys=e.details["keyValue"], collection_name=cls.collection_name()
+            )
+        return result
+
+    async def adelete(self: T) -> DeleteOneResult:
+        collection = Document._get_async_collection(self.__class__)
+        filter = _format_document_data(self)
+        return await collection.delete_one(cls=self.__class__, filter=filter)
+
+    @classmethod
+    async def adelete_one(
+        cls: Type[T],
+        filter: DocumentData,
+    ) -> DeleteOneResult:
+        collection = Document._get_async_collection(cls)
+        filter = _format_document_data(filter)
+        return await collection.delete_one(cls=cls, filter=filter)
+
+    @classmethod
+    async def adelete_many(
+        cls: Type[T],
+        filter: DocumentData,
+    ) -> DeleteManyResult:
+        collection = Document._get_async_collection(cls)
+        filter = _format_document_data(filter)
+        return await collection.delete_many(cls=cls, filter=filter)
+
 
 def _validate_fields(cls: Type[DocumentData], data: DocumentData) -> None:
     if data is None:
@@ -459,9 +855,10 @@ def _validate_fields(cls: Type[DocumentData], data: DocumentData) -> None:
 def _get_return_cls(
     cls: Type[Document],
     fields: dict[str, bool] | None = None,
-) -> Type[Document | dict]:
+    validate: bool | None = None,
+) -> Type[Document | dict] | Callable[..., Document]:
     if not fields:
-        return cls
+        return _get_reader(cls, validate)
     return_type = cls
     selected_fields = {k for k, v in fields.items() if v}
     unselected_fields = {k for k, v in fields.items() if not v}
@@ -476,7 +873,20 @@ def _get_return_cls(
         if selected_fields and v.alias not in selected_fields:
             return_type = dict
             break
-    return return_type
+    if return_type is dict:
+        return dict
+    return _get_reader(cls, validate)
+
+
+def _get_reader(
+    cls: Type[Document],
+    validate: bool | None,
+) -> Type[Document] | Callable[..., Document]:
+    if validate is None:
+        validate = cls.__validate_reads__
+    if validate:
+        return cls
+    return lambda **data: construct_document(cls, data)
 
 
 def _format_fields(fields: IncludeColumns) -> dict[str, bool] | None:
@@ -537,6 +947,26 @@ def _raise_if_updating_hashable(cls: Type[T], update_dict: dict):
             raise CannotUpdateIdentifyingField(m)
 
 
+def _stamp_update(update: dict, filter: dict, upsert: bool) -> dict:
+    """
+    Copy of `update` also setting `updated_at`, and `created_at` on upserted
+    documents, so timestamps are written in the same operation as the update.
+    """
+    now = datetime.now(pytz.UTC).isoformat()
+    if not any(key.startswith("$") for key in update):
+        # Plain fields are set as they are
+        update = {"$set": update}
+
+    stamped = dict(update)
+    touched = {key for fields in update.values() for key in fields}
+    # Only the fields the user sets may hold updated_at, anything else would conflict
+    if "updated_at" not in touched or "updated_at" in update.get("$set", {}):
+        stamped["$set"] = update.get("$set", {}) | {"updated_at": now}
+    if upsert and "created_at" not in touched and "created_at" not in filter:
+        stamped["$setOnInsert"] = update.get("$setOnInsert", {}) | {"created_at": now}
+    return stamped
+
+
 def _optimize_filter(cls: Type[T], filter: dict) -> dict:
     if "_id" in filter:
         return {"_id": filter["_id"]}
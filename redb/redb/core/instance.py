@@ -1,3 +1,5 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 
 from redb.interface.configs import (
@@ -17,6 +19,10 @@ class RedB:
     _uris: dict[str, int] = {}
     _client_name: str | None = None
     _configs: list[CONFIG_TYPE] | None = None
+    # Runs the async API of the backends without an asyncio driver
+    _executor: ThreadPoolExecutor | None = None
+    _executor_workers: int = 8
+    _executor_lock = threading.Lock()
 
     @classmethod
     def add_client(
@@ -103,12 +109,29 @@ class RedB:
             raise RuntimeError("Client not setup. Call setup() first.")
         return cls._configs[0]
 
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls._executor_workers,
+                    thread_name_prefix="redb-async",
+                )
+            return cls._executor
+
     @classmethod
     def setup(
         cls,
         config: CONFIG_TYPE,
         backend: Literal["json", "mongo"] | None = None,
+        async_config: MongoConfig | dict | None = None,
+        async_workers: int = 8,
     ) -> None:
+        """
+        Set the client up. Mongo clients talk asyncio through a client built
+        from `async_config` (`config` by default); other backends run their
+        async calls on a pool of `async_workers` threads.
+        """
         if backend is None and isinstance(config, dict):
             raise ValueError("Cannot determine client type from backend and config")
         elif backend == "json" or (
@@ -124,7 +147,7 @@ class RedB:
         ):
             from redb.mongo_system import MongoClient
 
-            cls._clients = [MongoClient(config)]
+            cls._clients = [MongoClient(config, async_config)]
             if isinstance(config, dict):
                 database_uri = config["database_uri"]
             else:
@@ -145,3 +168,9 @@ class RedB:
             raise ValueError(f"Backend not found for config type: {type(config)!r}.")
 
         cls._configs = [config]
+        with cls._executor_lock:
+            if cls._executor is not None and async_workers != cls._executor_workers:
+                # Calls already running finish on the old pool
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
+            cls._executor_workers = async_workers
@@ -0,0 +1,123 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from bson import json_util
+
+T = TypeVar("T")
+
+SortOrder = list[tuple[str, int]]
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    # Cursor of the last item, None when no page follows
+    next: str | None = None
+    # Cursor of the first item, None when no page precedes
+    previous: str | None = None
+
+
+def keyset_sort(sort: list[tuple[str, str | int]] | None) -> SortOrder:
+    """Sort with `_id` as a tiebreaker, so every document has a unique position."""
+    sort = [(name, int(direction)) for name, direction in sort or []]
+    if all(name != "_id" for name, _ in sort):
+        # Following the last key, a compound index on (..., _id) serves both ways
+        sort.append(("_id", sort[-1][1] if sort else 1))
+    return sort
+
+
+def encode_cursor(item: Any, sort: SortOrder) -> str:
+    data = item.dict() if hasattr(item, "dict") else item
+    values = [_key_value(data, name) for name, _ in sort]
+    payload = json_util.dumps({"s": sort, "v": values})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortOrder) -> list[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json_util.loads(payload)
+        cursor_sort = [(name, direction) for name, direction in data["s"]]
+        values = data["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if cursor_sort != sort or len(values) != len(sort):
+        raise ValueError("Cursor was created for a different sort")
+    return values
+
+
+def page_query(
+    filter: dict,
+    sort: SortOrder,
+    after: str | None,
+    before: str | None,
+) -> tuple[dict, SortOrder]:
+    """
+    Filter and sort fetching the documents after or before a cursor.
+
+    Documents before a cursor are fetched in reverse, closest first.
+    """
+    if after is not None and before is not None:
+        raise ValueError("Cannot paginate both after and before a cursor")
+    cursor = after if after is not None else before
+    if cursor is None:
+        return filter, sort
+    values = decode_cursor(cursor, sort)
+    if before is not None:
+        sort = [(name, -direction) for name, direction in sort]
+    seek = _seek_filter(sort, values)
+    if not filter:
+        return seek, sort
+    return {"$and": [filter, seek]}, sort
+
+
+def make_page(
+    items: list[T],
+    sort: SortOrder,
+    page_size: int,
+    after: str | None,
+    before: str | None,
+) -> Page[T]:
+    """Page out of up to `page_size + 1` items fetched with `page_query`."""
+    more = len(items) > page_size
+    items = items[:page_size]
+    if before is not None:
+        items.reverse()
+    page: Page[T] = Page(items=items)
+    if not items:
+        return page
+    first, last = encode_cursor(items[0], sort), encode_cursor(items[-1], sort)
+    if before is not None:
+        page.next = last
+        page.previous = first if more else None
+    else:
+        page.next = last if more else None
+        page.previous = first if after is not None else None
+    return page
+
+
+def _seek_filter(sort: SortOrder, values: list[Any]) -> dict:
+    """
+    Documents sorting strictly past `values`, one branch per sort key:
+    equal on the keys before it and past it on the key itself.
+    """
+    branches = []
+    for i, (name, direction) in enumerate(sort):
+        branch = {prefix: value for (prefix, _), value in zip(sort[:i], values)}
+        branch[name] = {"$gt" if direction > 0 else "$lt": values[i]}
+        branches.append(branch)
+    if len(branches) == 1:
+        return branches[0]
+    # Bounds the leading key too, so an index on it narrows the scan
+    name, direction = sort[0]
+    return {name: {"$gte" if direction > 0 else "$lte": values[0]}, "$or": branches}
+
+
+def _key_value(data: Any, path: str) -> Any:
+    for attr in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(attr)
+    return data
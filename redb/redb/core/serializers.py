@@ -0,0 +1,255 @@
+import dataclasses
+import json
+import math
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from bson import DBRef, ObjectId
+
+Encoders = dict[type, Any]
+
+
+def encode_datetime(value: datetime) -> str:
+    return value.isoformat()
+
+
+def encode_dbref(value: DBRef) -> dict:
+    return dict(value.as_doc())
+
+
+# Encoders every serializer applies on its own, so documents that do not
+# customize them never go through `apply_encoders`
+NATIVE_ENCODERS: Encoders = {
+    datetime: encode_datetime,
+    DBRef: encode_dbref,
+    Path: str,
+    ObjectId: str,
+}
+
+
+class Serializer(ABC):
+    """Turns documents into JSON bytes and back."""
+
+    @abstractmethod
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes | str) -> Any:
+        pass
+
+    def to_builtins(self, obj: Any, encoders: Encoders) -> Any:
+        """Encode the values of `obj` that JSON has no type for."""
+        return apply_encoders(obj, encoders)
+
+
+class StdlibSerializer(Serializer):
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=4, default=_default).encode()
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    def __init__(self) -> None:
+        import orjson
+
+        self.__orjson = orjson
+        # Datetimes go through `encode_datetime` like `apply_encoders` does
+        self.__builtins_option = (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        option = self.__orjson.OPT_NON_STR_KEYS
+        if not pretty:
+            return self.__orjson.dumps(obj, default=_default, option=option)
+        # orjson only indents by 2, the other serializers write 4
+        data = self.__orjson.dumps(
+            obj, default=_default, option=option | self.__orjson.OPT_INDENT_2
+        )
+        return _INDENT.sub(lambda match: match.group() * 2, data)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self.__orjson.loads(data)
+
+    def to_builtins(self, obj: Any, encoders: Encoders) -> Any:
+        # orjson has its own take on NaN, UUIDs, enums, dates, tuples and
+        # non-string keys, so it only gets what comes out the same. Checking
+        # still walks `obj` in Python, but builds nothing along the way.
+        if not _uses_native_encoders(encoders):
+            return super().to_builtins(obj, encoders)
+        leaves = tuple(type_ for type_ in _STRING_LEAVES if type_ in encoders)
+        if not _is_plain(obj, leaves):
+            return super().to_builtins(obj, encoders)
+        try:
+            data = self.__orjson.dumps(
+                obj, default=_builtins_default, option=self.__builtins_option
+            )
+        except TypeError:
+            # Integers past 64 bits, lone surrogates...
+            return super().to_builtins(obj, encoders)
+        return self.__orjson.loads(data)
+
+
+# Leading spaces of the lines of indented JSON, strings never span lines
+_INDENT = re.compile(rb"^ +", re.MULTILINE)
+
+
+class MsgspecSerializer(Serializer):
+    def __init__(self) -> None:
+        import msgspec
+
+        self.__msgspec = msgspec
+        self.__encoder = msgspec.json.Encoder(enc_hook=_default)
+        self.__decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        data = self.__encoder.encode(obj)
+        if pretty:
+            return self.__msgspec.json.format(data, indent=4)
+        return data
+
+    def loads(self, data: bytes | str) -> Any:
+        return self.__decoder.decode(data)
+
+
+_factories: dict[str, Callable[[], Serializer]] = {
+    "json": StdlibSerializer,
+    "orjson": OrjsonSerializer,
+    "msgspec": MsgspecSerializer,
+}
+_serializers: dict[str, Serializer] = {}
+_serializers_lock = threading.Lock()
+
+
+def register_serializer(name: str, factory: Callable[[], Serializer]) -> None:
+    with _serializers_lock:
+        _factories[name] = factory
+        _serializers.pop(name, None)
+
+
+def get_serializer(name: str | None = None) -> Serializer:
+    """
+    Serializer registered as `name`.
+
+    "auto" (or None) picks the fastest one installed: orjson, msgspec and then
+    the standard library.
+    """
+    name = name or "auto"
+    with _serializers_lock:
+        if name not in _serializers:
+            _serializers[name] = _build_serializer(name)
+        return _serializers[name]
+
+
+def _build_serializer(name: str) -> Serializer:
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            try:
+                return _factories[candidate]()
+            except ImportError:
+                continue
+        return StdlibSerializer()
+
+    if name not in _factories:
+        raise ValueError(f"Unknown serializer: {name!r}")
+    return _factories[name]()
+
+
+def _uses_native_encoders(encoders: Encoders) -> bool:
+    return all(
+        any(
+            issubclass(type_, native_type) and encoder is native_encoder
+            for native_type, native_encoder in NATIVE_ENCODERS.items()
+        )
+        for type_, encoder in encoders.items()
+    )
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return encode_datetime(obj)
+    elif isinstance(obj, DBRef):
+        return encode_dbref(obj)
+    elif isinstance(obj, (ObjectId, Path)):
+        return str(obj)
+    elif isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    elif dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _builtins_default(obj: Any) -> Any:
+    # Anything but the leaves that `NATIVE_ENCODERS` turns into strings falls
+    # back to `apply_encoders`, which keeps the rest of the values untouched
+    if isinstance(obj, datetime):
+        return encode_datetime(obj)
+    if isinstance(obj, (ObjectId, Path)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not a JSON leaf")
+
+
+_JSON_LEAVES = frozenset({str, int, bool, type(None)})
+# Types `NATIVE_ENCODERS` turns into strings, and `_builtins_default` too
+_STRING_LEAVES = (datetime, ObjectId, Path)
+
+
+def _is_plain(obj: Any, leaves: tuple[type, ...]) -> bool:
+    """
+    Whether `obj` holds only dicts with string keys, lists, JSON scalars
+    (finite floats) and values of `leaves`, encoded into strings.
+    """
+    obj_type = type(obj)
+    if obj_type in _JSON_LEAVES:
+        return True
+    if obj_type is float:
+        return math.isfinite(obj)
+    if obj_type is dict:
+        return all(type(key) is str for key in obj) and all(
+            _is_plain(value, leaves) for value in obj.values()
+        )
+    if obj_type is list:
+        types = set(map(type, obj))
+        if types <= _JSON_LEAVES:
+            return True
+        if types == {float}:
+            # Vectors, a non-finite sum means a NaN or infinity (or overflow)
+            return math.isfinite(sum(obj))
+        return all(_is_plain(value, leaves) for value in obj)
+    return isinstance(obj, leaves)
+
+
+def apply_encoders(obj, encoders):
+    obj_type = type(obj)
+    if obj_type == list:
+        obj = [apply_encoders(val, encoders) for val in obj]
+    elif obj_type == set:
+        obj = {apply_encoders(val, encoders) for val in obj}
+    elif obj_type == tuple:
+        obj = (apply_encoders(val, encoders) for val in obj)
+    elif obj_type == dict:
+        obj = {
+            apply_encoders(key, encoders): apply_encoders(val, encoders)
+            for key, val in obj.items()
+        }
+    elif obj_type in encoders:
+        encoding = encoders[obj_type]
+        obj = encoding(obj) if callable(encoding) else encoding
+    elif dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    else:
+        for encoder_from, encoder_fn in encoders.items():
+            if isinstance(obj, encoder_from):
+                return encoder_fn(obj)
+    return obj
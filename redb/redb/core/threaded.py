@@ -0,0 +1,241 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterator, Type, TypeVar
+
+from redb.interface.collection import (
+    AsyncCollection,
+    Collection,
+    Json,
+    OptionalJson,
+    ReturnType,
+)
+from redb.interface.fields import CompoundIndex, PyMongoOperations
+from redb.interface.results import (
+    BulkWriteResult,
+    DeleteManyResult,
+    DeleteOneResult,
+    InsertManyResult,
+    InsertOneResult,
+    ReplaceOneResult,
+    UpdateManyResult,
+    UpdateOneResult,
+)
+
+from .base import BaseDocument
+
+R = TypeVar("R")
+
+# Documents pulled from a blocking iterator per trip to the executor
+_ITERATION_CHUNK = 64
+
+
+class ThreadedCollection(AsyncCollection):
+    """
+    Async facade over a blocking collection, for the backends without an
+    asyncio driver. Calls run on a bounded thread pool, so they never block
+    the event loop and never pile up more threads than the pool holds.
+    """
+
+    def __init__(self, collection: Collection, executor: ThreadPoolExecutor) -> None:
+        self.__collection = collection
+        self.__executor = executor
+
+    def _get_driver_collection(self) -> Any:
+        return self.__collection._get_driver_collection()
+
+    async def create_index(
+        self,
+        index: CompoundIndex,
+    ) -> bool:
+        return await self.__run(self.__collection.create_index, index)
+
+    async def find(
+        self,
+        cls: Type[BaseDocument],
+        return_cls: Type[ReturnType],
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        sort: list[tuple[str, str | int]] | None = None,
+        skip: int = 0,
+        limit: int = 0,
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | AsyncIterator[list[ReturnType]] | AsyncIterator[ReturnType]:
+        results = await self.__run(
+            self.__collection.find,
+            cls=cls,
+            return_cls=return_cls,
+            filter=filter,
+            fields=fields,
+            sort=sort,
+            skip=skip,
+            limit=limit,
+            iterate=iterate,
+            batch_size=batch_size,
+        )
+        if iterate:
+            return self.__iterate(results, _ITERATION_CHUNK)
+        if batch_size is not None:
+            # Each item is already a batch
+            return self.__iterate(results, 1)
+        return results
+
+    async def find_one(
+        self,
+        cls: Type[BaseDocument],
+        return_cls: Type[ReturnType],
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        skip: int = 0,
+    ) -> ReturnType:
+        return await self.__run(
+            self.__collection.find_one,
+            cls=cls,
+            return_cls=return_cls,
+            filter=filter,
+            fields=fields,
+            skip=skip,
+        )
+
+    async def distinct(
+        self,
+        cls: ReturnType,
+        key: str,
+        filter: OptionalJson = None,
+    ) -> list[Any]:
+        return await self.__run(
+            self.__collection.distinct, cls=cls, key=key, filter=filter
+        )
+
+    async def count_documents(
+        self,
+        cls: Type[BaseDocument],
+        filter: OptionalJson = None,
+    ) -> int:
+        return await self.__run(
+            self.__collection.count_documents, cls=cls, filter=filter
+        )
+
+    async def aggregate(
+        self,
+        cls: Type[BaseDocument],
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[ReturnType]:
+        results = await self.__run(
+            self.__collection.aggregate,
+            cls=cls,
+            pipeline=pipeline,
+            return_cls=return_cls,
+            allow_disk_use=allow_disk_use,
+            batch_size=batch_size,
+        )
+        return self.__iterate(results, batch_size or _ITERATION_CHUNK)
+
+    async def bulk_write(
+        self,
+        cls: Type[BaseDocument],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        return await self.__run(
+            self.__collection.bulk_write,
+            cls=cls,
+            operations=operations,
+            ordered=ordered,
+        )
+
+    async def insert_one(
+        self,
+        cls: Type[BaseDocument],
+        data: Json,
+    ) -> InsertOneResult:
+        return await self.__run(self.__collection.insert_one, cls=cls, data=data)
+
+    async def insert_many(
+        self,
+        cls: Type[BaseDocument],
+        data: list[Json],
+    ) -> InsertManyResult:
+        return await self.__run(self.__collection.insert_many, cls=cls, data=data)
+
+    async def replace_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        replacement: Json,
+        upsert: bool = False,
+    ) -> ReplaceOneResult:
+        return await self.__run(
+            self.__collection.replace_one,
+            cls=cls,
+            filter=filter,
+            replacement=replacement,
+            upsert=upsert,
+        )
+
+    async def update_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateOneResult:
+        return await self.__run(
+            self.__collection.update_one,
+            cls=cls,
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+
+    async def update_many(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateManyResult:
+        return await self.__run(
+            self.__collection.update_many,
+            cls=cls,
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+
+    async def delete_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+    ) -> DeleteOneResult:
+        return await self.__run(self.__collection.delete_one, cls=cls, filter=filter)
+
+    async def delete_many(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+    ) -> DeleteManyResult:
+        return await self.__run(self.__collection.delete_many, cls=cls, filter=filter)
+
+    async def __run(self, function: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, partial(function, *args, **kwargs)
+        )
+
+    async def __iterate(
+        self, iterator: Iterator[R], chunk_size: int
+    ) -> AsyncIterator[R]:
+        """Drain a blocking iterator from the pool, `chunk_size` items per trip."""
+        iterator = iter(iterator)
+        while True:
+            chunk = await self.__run(lambda: list(islice(iterator, chunk_size)))
+            for item in chunk:
+                yield item
+            if len(chunk) < chunk_size:
+                return
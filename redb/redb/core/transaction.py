@@ -1,9 +1,17 @@
 import contextlib
 import logging
-from datetime import datetime
-from typing import Any, ContextManager, Dict, Sequence, Type, TypeVar, overload
+from typing import (
+    Any,
+    AsyncIterator,
+    ContextManager,
+    Dict,
+    Iterator,
+    Sequence,
+    Type,
+    TypeVar,
+    overload,
+)
 
-import pytz
 from pymongo.errors import DuplicateKeyError
 
 from redb.behaviors import IRememberDoc
@@ -20,10 +28,13 @@ from redb.core.document import (
     _get_return_cls,
     _optimize_filter,
     _raise_if_updating_hashable,
+    _stamp_update,
     _validate_fields,
 )
 from redb.core.instance import RedB
+from redb.core.threaded import ThreadedCollection
 from redb.interface.collection import (
+    AsyncCollection,
     BulkWriteResult,
     Collection,
     DeleteManyResult,
@@ -43,7 +54,7 @@ from redb.interface.configs import (
     check_config,
 )
 from redb.interface.errors import UniqueConstraintViolation
-from redb.mongo_system import MongoClient
+from redb.mongo_system import MongoCollection, get_async_collection
 
 T = TypeVar("T", bound=Document)
 
@@ -150,9 +161,10 @@ class CollectionWrapper:
         filter: OptionalDocumentData = None,
         fields: IncludeColumns = None,
         skip: int = 0,
+        validate: bool | None = None,
     ) -> "Document":
         chosen_fields = _format_fields(fields)
-        return_cls = _get_return_cls(self.__collection_class, chosen_fields)
+        return_cls = _get_return_cls(self.__collection_class, chosen_fields, validate)
         filters = _format_document_data(filter)
         return self.__collection.find_one(
             cls=self.__collection_class,
@@ -169,9 +181,10 @@ class CollectionWrapper:
         sort: SortColumns = None,
         skip: int = 0,
         limit: int = 0,
+        validate: bool | None = None,
     ) -> list["Document"]:
         chosen_fields = _format_fields(fields)
-        return_cls = _get_return_cls(self.__collection_class, chosen_fields)
+        return_cls = _get_return_cls(self.__collection_class, chosen_fields, validate)
         filter = _format_document_data(filter)
         sort = _format_sort(sort)
         return self.__collection.find(
@@ -206,13 +219,30 @@ class CollectionWrapper:
             filter=filter,
         )
 
+    def aggregate(
+        self,
+        pipeline: list[dict[str, Any]],
+        return_cls: Type[Any] | None = None,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[Any]:
+        return self.__collection.aggregate(
+            cls=self.__collection_class,
+            pipeline=pipeline,
+            return_cls=return_cls or dict,
+            allow_disk_use=allow_disk_use,
+            batch_size=batch_size,
+        )
+
     def bulk_write(
         self,
         operations: list[PyMongoOperations],
+        ordered: bool = True,
     ) -> BulkWriteResult:
         return self.__collection.bulk_write(
             cls=self.__collection_class,
             operations=operations,
+            ordered=ordered,
         )
 
     def insert_one(self, data: DocumentData) -> InsertOneResult:
@@ -311,6 +341,7 @@ class CollectionWrapper:
         _raise_if_updating_hashable(self.__collection_class, update)
         if operator is not None:
             update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
 
         result = self.__collection.update_one(
             cls=self.__collection_class,
@@ -318,11 +349,6 @@ class CollectionWrapper:
             update=update,
             upsert=upsert,
         )
-        self.__collection.update_one(
-            cls=self.__collection_class,
-            filter=filter,
-            update={"$set": {"updated_at": datetime.now(pytz.UTC).isoformat()}},
-        )
         return result
 
     def historical_update_one(
@@ -383,6 +409,7 @@ class CollectionWrapper:
         _raise_if_updating_hashable(self.__collection_class, update)
         if operator is not None:
             update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
 
         result = self.__collection.update_many(
             cls=self.__collection_class,
@@ -390,11 +417,6 @@ class CollectionWrapper:
             update=update,
             upsert=upsert,
         )
-        self.__collection.update_many(
-            cls=self.__collection_class,
-            filter=filter,
-            update={"$set": {"updated_at": datetime.now(pytz.UTC).isoformat()}},
-        )
         return result
 
     def delete_one(self, filter: DocumentData) -> DeleteOneResult:
@@ -427,6 +449,227 @@ class CollectionWrapper:
             filter=filter,
         )
 
+    async def afind_one(
+        self,
+        filter: OptionalDocumentData = None,
+        fields: IncludeColumns = None,
+        skip: int = 0,
+        validate: bool | None = None,
+    ) -> "Document":
+        chosen_fields = _format_fields(fields)
+        return_cls = _get_return_cls(self.__collection_class, chosen_fields, validate)
+        filters = _format_document_data(filter)
+        return await self.__get_async_collection().find_one(
+            cls=self.__collection_class,
+            return_cls=return_cls,
+            filter=filters,
+            skip=skip,
+            fields=chosen_fields,
+        )
+
+    async def afind_many(
+        self,
+        filter: OptionalDocumentData = None,
+        fields: IncludeColumns = None,
+        sort: SortColumns = None,
+        skip: int = 0,
+        limit: int = 0,
+        iterate: bool = False,
+        batch_size: int | None = None,
+        validate: bool | None = None,
+    ) -> list["Document"] | AsyncIterator["Document"] | AsyncIterator[list["Document"]]:
+        chosen_fields = _format_fields(fields)
+        return_cls = _get_return_cls(self.__collection_class, chosen_fields, validate)
+        filter = _format_document_data(filter)
+        sort = _format_sort(sort)
+        return await self.__get_async_collection().find(
+            cls=self.__collection_class,
+            return_cls=return_cls,
+            filter=filter,
+            fields=chosen_fields,
+            sort=sort,
+            skip=skip,
+            limit=limit,
+            iterate=iterate,
+            batch_size=batch_size,
+        )
+
+    async def adistinct(
+        self,
+        key: str,
+        filter: OptionalDocumentData = None,
+    ) -> list["Document"]:
+        filter = _format_document_data(filter)
+        return await self.__get_async_collection().distinct(
+            cls=self.__collection_class,
+            key=key,
+            filter=filter,
+        )
+
+    async def acount_documents(
+        self,
+        filter: OptionalDocumentData = None,
+    ) -> int:
+        filter = _format_document_data(filter)
+        return await self.__get_async_collection().count_documents(
+            cls=self.__collection_class,
+            filter=filter,
+        )
+
+    async def aaggregate(
+        self,
+        pipeline: list[dict[str, Any]],
+        return_cls: Type[Any] | None = None,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[Any]:
+        return await self.__get_async_collection().aggregate(
+            cls=self.__collection_class,
+            pipeline=pipeline,
+            return_cls=return_cls or dict,
+            allow_disk_use=allow_disk_use,
+            batch_size=batch_size,
+        )
+
+    async def abulk_write(
+        self,
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        return await self.__get_async_collection().bulk_write(
+            cls=self.__collection_class,
+            operations=operations,
+            ordered=ordered,
+        )
+
+    async def ainsert_one(self, data: DocumentData) -> InsertOneResult:
+        data = _format_document_data(data)
+
+        try:
+            return await self.__get_async_collection().insert_one(
+                cls=self.__collection_class,
+                data=data,
+            )
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(dup_keys=e.details["keyValue"])
+
+    async def ainsert_many(
+        self,
+        data: Sequence[DocumentData],
+    ) -> InsertManyResult:
+        [_validate_fields(self.__collection_class, val) for val in data]
+
+        data = [_format_document_data(val) for val in data]
+
+        try:
+            return await self.__get_async_collection().insert_many(
+                cls=self.__collection_class,
+                data=data,
+            )
+        except DuplicateKeyError as e:
+            raise UniqueConstraintViolation(dup_keys=e.details["keyValue"])
+
+    async def areplace_one(
+        self,
+        filter: DocumentData,
+        replacement: DocumentData,
+        upsert: bool = False,
+        allow_new_fields: bool = False,
+    ) -> ReplaceOneResult:
+        if not allow_new_fields:
+            _validate_fields(self.__collection_class, replacement)
+
+        filter = _format_document_data(filter)
+        replacement = _format_document_data(replacement)
+        return await self.__get_async_collection().replace_one(
+            cls=self.__collection_class,
+            filter=filter,
+            replacement=replacement,
+            upsert=upsert,
+        )
+
+    async def aupdate_one(
+        self,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> UpdateOneResult:
+        if not allow_new_fields:
+            _validate_fields(self.__collection_class, update)
+
+        filter = _format_document_data(filter)
+        update = _format_document_data(update)
+
+        if not upsert:
+            filter = _optimize_filter(self.__collection_class, filter)
+
+        _raise_if_updating_hashable(self.__collection_class, update)
+        if operator is not None:
+            update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
+
+        collection = self.__get_async_collection()
+        result = await collection.update_one(
+            cls=self.__collection_class,
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+        return result
+
+    async def aupdate_many(
+        self,
+        filter: DocumentData,
+        update: DocumentData,
+        upsert: bool = False,
+        operator: str | None = "$set",
+        allow_new_fields: bool = False,
+    ) -> UpdateManyResult:
+        if not allow_new_fields:
+            _validate_fields(self.__collection_class, update)
+
+        filter = _format_document_data(filter)
+        update = _format_document_data(update)
+
+        if not upsert:
+            filter = _optimize_filter(self.__collection_class, filter)
+
+        _raise_if_updating_hashable(self.__collection_class, update)
+        if operator is not None:
+            update = {operator: update}
+        update = _stamp_update(update, filter, upsert)
+
+        collection = self.__get_async_collection()
+        result = await collection.update_many(
+            cls=self.__collection_class,
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+        return result
+
+    async def adelete_one(self, filter: DocumentData) -> DeleteOneResult:
+        filter = _format_document_data(filter)
+        return await self.__get_async_collection().delete_one(
+            cls=self.__collection_class,
+            filter=filter,
+        )
+
+    async def adelete_many(self, filter: DocumentData) -> DeleteManyResult:
+        filter = _format_document_data(filter)
+        return await self.__get_async_collection().delete_many(
+            cls=self.__collection_class,
+            filter=filter,
+        )
+
+    def __get_async_collection(self) -> AsyncCollection:
+        # Follows the collection the wrapper was last switched to
+        if isinstance(self.__collection, MongoCollection):
+            return get_async_collection(self.__collection._get_driver_collection())
+        return ThreadedCollection(self.__collection, RedB.get_executor())
+
 
 @overload
 def transaction(
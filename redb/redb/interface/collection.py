@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Any, Type, TypeAlias
+from typing import Any, AsyncIterator, Iterable, Iterator, Type, TypeAlias, TypeVar
 
 from redb.core import BaseDocument
 
+from .errors import UnsupportedOperation
 from .fields import CompoundIndex, PyMongoOperations
 from .results import (
     BulkWriteResult,
@@ -18,6 +19,7 @@ from .results import (
 Json: TypeAlias = dict[str, Any]
 OptionalJson: TypeAlias = dict[str, Any] | None
 ReturnType: TypeAlias = BaseDocument | dict
+T = TypeVar("T")
 
 
 class Collection(ABC):
@@ -42,7 +44,9 @@ class Collection(ABC):
         sort: list[tuple[str, str | int]] | None = None,
         skip: int = 0,
         limit: int = 0,
-    ) -> list[ReturnType]:
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | Iterator[list[ReturnType]] | Iterator[ReturnType]:
         pass
 
     @abstractmethod
@@ -73,11 +77,30 @@ class Collection(ABC):
     ) -> int:
         pass
 
+    def aggregate(
+        self,
+        cls: Type[BaseDocument],
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[ReturnType]:
+        """Stream the results of an aggregation pipeline."""
+        raise UnsupportedOperation(
+            f"{type(self).__name__} cannot run aggregation pipelines"
+        )
+
     @abstractmethod
     def bulk_write(
         self,
+        cls: Type[BaseDocument],
         operations: list[PyMongoOperations],
+        ordered: bool = True,
     ) -> BulkWriteResult:
+        """
+        Unordered writes go on past the operations that fail, then raise a
+        BulkWriteError with the result of the rest and the error of each.
+        """
         pass
 
     @abstractmethod
@@ -141,3 +164,177 @@ class Collection(ABC):
         filter: Json,
     ) -> DeleteManyResult:
         pass
+
+
+class AsyncCollection(ABC):
+    """Asyncio counterpart of `Collection`."""
+
+    @abstractmethod
+    def _get_driver_collection(self) -> Any:
+        pass
+
+    @abstractmethod
+    async def create_index(
+        self,
+        index: CompoundIndex,
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def find(
+        self,
+        cls: Type[BaseDocument],
+        return_cls: Type[ReturnType],
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        sort: list[tuple[str, str | int]] | None = None,
+        skip: int = 0,
+        limit: int = 0,
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | AsyncIterator[list[ReturnType]] | AsyncIterator[ReturnType]:
+        pass
+
+    @abstractmethod
+    async def find_one(
+        self,
+        cls: Type[BaseDocument],
+        return_cls: Type[ReturnType],
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        skip: int = 0,
+    ) -> ReturnType:
+        pass
+
+    @abstractmethod
+    async def distinct(
+        self,
+        cls: ReturnType,
+        key: str,
+        filter: OptionalJson = None,
+    ) -> list[Any]:
+        pass
+
+    @abstractmethod
+    async def count_documents(
+        self,
+        cls: Type[BaseDocument],
+        filter: OptionalJson = None,
+    ) -> int:
+        pass
+
+    async def aggregate(
+        self,
+        cls: Type[BaseDocument],
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[ReturnType]:
+        raise UnsupportedOperation(
+            f"{type(self).__name__} cannot run aggregation pipelines"
+        )
+
+    @abstractmethod
+    async def bulk_write(
+        self,
+        cls: Type[BaseDocument],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        pass
+
+    @abstractmethod
+    async def insert_one(
+        self,
+        cls: Type[BaseDocument],
+        data: Json,
+    ) -> InsertOneResult:
+        pass
+
+    @abstractmethod
+    async def insert_many(
+        self,
+        cls: Type[BaseDocument],
+        data: list[Json],
+    ) -> InsertManyResult:
+        pass
+
+    @abstractmethod
+    async def replace_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        replacement: Json,
+        upsert: bool = False,
+    ) -> ReplaceOneResult:
+        pass
+
+    @abstractmethod
+    async def update_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateOneResult:
+        pass
+
+    @abstractmethod
+    async def update_many(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateManyResult:
+        pass
+
+    @abstractmethod
+    async def delete_one(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+    ) -> DeleteOneResult:
+        pass
+
+    @abstractmethod
+    async def delete_many(
+        self,
+        cls: Type[BaseDocument],
+        filter: Json,
+    ) -> DeleteManyResult:
+        pass
+
+
+def iterate_converted_results(iterator: Iterable[Json], clazz: Type[T]) -> Iterator[T]:
+    for result in iterator:
+        yield clazz(**result)  # type: ignore
+
+
+def batch_iterate_converted_results(
+    iterator: Iterable[Json], batch_size: int, clazz: Type[T]
+) -> Iterator[list[T]]:
+    iterator = iter(iterator)
+    while True:
+        output = []
+        try:
+            for _ in range(batch_size):
+                output.append(clazz(**next(iterator)))
+        except StopIteration:
+            break
+        finally:
+            if output:
+                yield output
+
+
+def unpack_operation(
+    operation: PyMongoOperations,
+) -> tuple[str, OptionalJson, OptionalJson, bool]:
+    """Name, filter, document and upsert flag of a pymongo bulk operation."""
+    return (
+        type(operation).__name__,
+        getattr(operation, "_filter", None),
+        getattr(operation, "_doc", None),
+        bool(getattr(operation, "_upsert", False)),
+    )
@@ -1,11 +1,43 @@
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Literal
 
 
 @dataclass
 class JSONConfig:
     client_folder_path: str
     default_database_folder_path: str | None = None
+    # "files" keeps one JSON file per document, "segments" appends them to
+    # JSON-Lines segment files (see redb.json_system.segments) and "packed"
+    # serves a read-only snapshot made by redb.json_system.packed.pack_collection
+    storage: Literal["files", "segments", "packed"] = "files"
+    segment_max_bytes: int = 64 * 1024 * 1024
+    compaction_interval: float | None = 60.0
+    compaction_garbage_ratio: float = 0.5
+    # Documents loaded concurrently by find, 1 reads them one by one
+    read_workers: int = 8
+    # Registered serializer name (see redb.core.serializers), "auto" picks the
+    # fastest one installed. `pretty` indents one-file-per-document storage.
+    serializer: str = "auto"
+    pretty: bool = True
+    # Documents an unbounded sort keeps in memory before spilling to disk
+    sort_buffer_size: int = 10_000
+    # When written documents are flushed to disk: after each one, once per
+    # batch or left to the OS. The write-ahead log lets a batch interrupted by
+    # a crash be completed when the collection is opened again.
+    fsync: Literal["document", "batch", "none"] = "none"
+    write_ahead_log: bool = False
+    # New "files" collections spread their documents over `ab/cd/` folders
+    # named after their ids. Existing flat collections keep their layout
+    # until converted with redb.json_system.storage.shard_collection.
+    shard_documents: bool = False
+    # Codec new "files" documents are compressed with, "auto" being zstd when
+    # zstandard is installed and zlib otherwise. Documents already written
+    # with other codecs stay readable.
+    compression: Literal["none", "zlib", "zstd", "auto"] = "none"
+    # Bytes of parsed "files" documents kept in memory, shared by the handles
+    # of a collection and checked against the mtime and size of their files.
+    # 0 disables the cache.
+    document_cache_bytes: int = 0
 
 
 @dataclass
@@ -23,6 +55,23 @@ class MongoConfig:
     database_uri: str
     default_database: str | None = None
     driver_kwargs: dict = field(default_factory=dict)
+    # Documents found are fetched as raw BSON and returned as
+    # redb.mongo_system.lazy.LazyDocument, decoding fields on first access
+    lazy_documents: bool = False
+
+
+@dataclass(frozen=True)
+class ReadPolicy:
+    # Mongo read preference: "primary", "primaryPreferred", "secondary",
+    # "secondaryPreferred" or "nearest"
+    mode: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
+    # Seconds a secondary may lag behind the primary and still be read from
+    # (at least 90), None for no limit. Not allowed with "primary".
+    max_staleness: int | None = None
+    # Read concern level ("local", "majority", ...), None keeps the client's
+    read_concern: str | None = None
 
 
 CONFIGS = JSONConfig | MigoConfig | MongoConfig
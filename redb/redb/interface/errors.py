@@ -1,3 +1,6 @@
+from typing import Any
+
+
 class REDBError(Exception):
     """Base class for all REDB errors."""
 
@@ -30,3 +33,23 @@ class UniqueConstraintViolation(REDBError):
 
 class UnsupportedOperation(REDBError):
     pass
+
+
+class BulkWriteError(REDBError):
+    """
+    Raised by unordered bulk writes once every operation ran, `errors` maps
+    the index of each failed operation to its error, `result` counts the rest.
+    """
+
+    def __init__(
+        self,
+        *args: object,
+        errors: dict[int, Exception],
+        result: Any = None,
+        collection_name: str = "",
+    ) -> None:
+        if not args:
+            args = (f"{len(errors)} bulk write operations failed",)
+        super().__init__(*args, collection_name=collection_name)
+        self.errors = errors
+        self.result = result
@@ -9,7 +9,8 @@ class BulkWriteResult:
     matched_count: int
     modified_count: int
     upserted_count: int
-    upserted_ids: int
+    # Index of the upserting operation -> _id of the upserted document
+    upserted_ids: dict[int, Any]
 
 
 @dataclass
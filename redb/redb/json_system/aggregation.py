@@ -0,0 +1,427 @@
+import json
+import sys
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+from redb.core.serializers import Serializer
+from redb.interface.errors import UnsupportedOperation
+
+from .indexes import sort_value
+from .query import Query
+from .sorting import sort_documents
+
+# Collection name -> function finding the documents of that collection matching a filter
+Lookup = Callable[[str], Callable[[dict], Iterable[dict]]]
+
+# Stands for fields a document does not have
+_MISSING = object()
+
+
+def run_pipeline(
+    docs: Iterable[dict],
+    pipeline: list[dict],
+    serializer: Serializer,
+    lookup: Lookup | None = None,
+    sort_buffer_size: int | None = 10_000,
+) -> Iterator[dict]:
+    """
+    Run a Mongo aggregation pipeline over `docs`, in process.
+
+    Stages stream documents through one another. Only `$group` holds all of
+    its groups in memory, and `$sort` spills runs of `sort_buffer_size`
+    documents to disk (None keeps them all in memory) unless a `$limit`
+    follows it, keeping the top documents only.
+    """
+    for position, stage in enumerate(pipeline):
+        if len(stage) != 1:
+            raise ValueError(
+                f"Pipeline stages take a single operator, got {list(stage)}"
+            )
+        name, spec = next(iter(stage.items()))
+        if name == "$sort":
+            following = pipeline[position + 1] if position + 1 < len(pipeline) else {}
+            docs = sort_documents(
+                docs,
+                list(spec.items()),
+                serializer,
+                limit=following.get("$limit", 0),
+                buffer_size=sort_buffer_size or sys.maxsize,
+            )
+        elif name == "$lookup":
+            docs = _lookup(docs, spec, lookup)
+        elif name in _STAGES:
+            docs = _STAGES[name](docs, spec)
+        else:
+            raise UnsupportedOperation(f"Aggregation stage {name} is not supported")
+    return iter(docs)
+
+
+def _match(docs: Iterable[dict], spec: dict) -> Iterator[dict]:
+    query = Query(spec)
+    return (doc for doc in docs if query(doc))
+
+
+def _project(docs: Iterable[dict], spec: dict) -> Iterator[dict]:
+    fields = {key: value for key, value in spec.items() if key != "_id"}
+    id = spec.get("_id", 1)
+    hides_id = _is_flag(id) and not id
+    if all(_is_flag(value) and not value for value in fields.values()) and (
+        fields or hides_id
+    ):
+        excluded = list(fields) + (["_id"] if hides_id else [])
+        for doc in docs:
+            doc = dict(doc)
+            for key in excluded:
+                _unset_path(doc, key)
+            yield doc
+        return
+
+    for doc in docs:
+        projected: dict = {}
+        if not _is_flag(id):
+            projected["_id"] = _evaluate(id, doc)
+        elif id and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        for key, value in fields.items():
+            if _is_flag(value):
+                if value:
+                    found = _get_path(doc, key)
+                    if found is not _MISSING:
+                        _set_path(projected, key, found)
+                continue
+            found = _evaluate(value, doc)
+            if found is not _MISSING:
+                _set_path(projected, key, found)
+        yield projected
+
+
+def _add_fields(docs: Iterable[dict], spec: dict) -> Iterator[dict]:
+    for doc in docs:
+        updated = dict(doc)
+        for key, value in spec.items():
+            found = _evaluate(value, doc)
+            if found is _MISSING:
+                _unset_path(updated, key)
+            else:
+                _set_path(updated, key, found)
+        yield updated
+
+
+def _unset(docs: Iterable[dict], spec: str | list[str]) -> Iterator[dict]:
+    return _project(
+        docs, {key: 0 for key in ([spec] if isinstance(spec, str) else spec)}
+    )
+
+
+def _replace_root(docs: Iterable[dict], spec: dict) -> Iterator[dict]:
+    for doc in docs:
+        root = _evaluate(spec["newRoot"], doc)
+        if not isinstance(root, dict):
+            raise ValueError(f"$replaceRoot needs a document, got {root!r}")
+        yield root
+
+
+def _skip(docs: Iterable[dict], spec: int) -> Iterator[dict]:
+    return islice(docs, spec, None)
+
+
+def _limit(docs: Iterable[dict], spec: int) -> Iterator[dict]:
+    return islice(docs, spec)
+
+
+def _count(docs: Iterable[dict], spec: str) -> Iterator[dict]:
+    count = sum(1 for _ in docs)
+    if count:
+        yield {spec: count}
+
+
+def _unwind(docs: Iterable[dict], spec: str | dict) -> Iterator[dict]:
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"].removeprefix("$")
+    preserve = spec.get("preserveNullAndEmptyArrays", False)
+    index_field = spec.get("includeArrayIndex")
+    for doc in docs:
+        value = _get_path(doc, path)
+        if isinstance(value, list) and value:
+            for i, item in enumerate(value):
+                unwound = dict(doc)
+                _set_path(unwound, path, item)
+                if index_field:
+                    _set_path(unwound, index_field, i)
+                yield unwound
+        elif value not in (_MISSING, None) and not isinstance(value, list):
+            # A single value unwinds to itself
+            unwound = dict(doc)
+            if index_field:
+                _set_path(unwound, index_field, None)
+            yield unwound
+        elif preserve:
+            unwound = dict(doc)
+            if value == []:
+                _unset_path(unwound, path)
+            if index_field:
+                _set_path(unwound, index_field, None)
+            yield unwound
+
+
+def _group(docs: Iterable[dict], spec: dict) -> Iterator[dict]:
+    if "_id" not in spec:
+        raise ValueError("$group needs an _id")
+    accumulators = {}
+    for key, value in spec.items():
+        if key == "_id":
+            continue
+        if not isinstance(value, dict) or len(value) != 1:
+            raise ValueError(f"$group field {key!r} needs a single accumulator")
+        operator, expression = next(iter(value.items()))
+        if operator not in _ACCUMULATORS:
+            raise UnsupportedOperation(f"Accumulator {operator} is not supported")
+        accumulators[key] = (_ACCUMULATORS[operator], expression)
+    # Checked before any document is read, like a server would
+    return _grouped(docs, spec["_id"], accumulators)
+
+
+def _grouped(
+    docs: Iterable[dict], id_expression: Any, accumulators: dict
+) -> Iterator[dict]:
+    groups: dict[Any, tuple[Any, dict]] = {}
+    for doc in docs:
+        id = _missing_to_none(_evaluate(id_expression, doc))
+        key = _hashable(id)
+        if key not in groups:
+            groups[key] = (
+                id,
+                {name: start() for name, ((start, _, _), _) in accumulators.items()},
+            )
+        states = groups[key][1]
+        for name, ((_, add, _), expression) in accumulators.items():
+            states[name] = add(states[name], _evaluate(expression, doc))
+
+    for id, states in groups.values():
+        result = {"_id": id}
+        for name, ((_, _, finish), _) in accumulators.items():
+            result[name] = finish(states[name])
+        yield result
+
+
+def _lookup(docs: Iterable[dict], spec: dict, lookup: Lookup | None) -> Iterator[dict]:
+    if lookup is None or "pipeline" in spec:
+        raise UnsupportedOperation(
+            "Only $lookup by localField and foreignField is supported"
+        )
+    return _joined(docs, spec, lookup(spec["from"]))
+
+
+def _joined(
+    docs: Iterable[dict], spec: dict, find: Callable[[dict], Iterable[dict]]
+) -> Iterator[dict]:
+    for doc in docs:
+        value = _missing_to_none(_get_path(doc, spec["localField"]))
+        if isinstance(value, list):
+            filter = {spec["foreignField"]: {"$in": value}}
+        else:
+            filter = {spec["foreignField"]: value}
+        joined = dict(doc)
+        _set_path(joined, spec["as"], list(find(filter)))
+        yield joined
+
+
+_STAGES: dict[str, Callable[[Iterable[dict], Any], Iterator[dict]]] = {
+    "$match": _match,
+    "$project": _project,
+    "$addFields": _add_fields,
+    "$set": _add_fields,
+    "$unset": _unset,
+    "$replaceRoot": _replace_root,
+    "$skip": _skip,
+    "$limit": _limit,
+    "$count": _count,
+    "$unwind": _unwind,
+    "$group": _group,
+}
+
+
+def _sum(total: Any, value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return total + value
+    return total
+
+
+def _average(state: list, value: Any) -> list:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        state[0] += value
+        state[1] += 1
+    return state
+
+
+def _extreme(pick: Callable) -> Callable[[Any, Any], Any]:
+    def add(current: Any, value: Any) -> Any:
+        if value is _MISSING or value is None:
+            return current
+        if current is _MISSING:
+            return value
+        return pick(current, value, key=sort_value)
+
+    return add
+
+
+def _first(current: Any, value: Any) -> Any:
+    return value if current is _MISSING else current
+
+
+def _push(values: list, value: Any) -> list:
+    if value is not _MISSING:
+        values.append(value)
+    return values
+
+
+def _add_to_set(values: dict, value: Any) -> dict:
+    if value is not _MISSING:
+        values.setdefault(_hashable(value), value)
+    return values
+
+
+def _missing_to_none(value: Any) -> Any:
+    return None if value is _MISSING else value
+
+
+# Operator -> (initial state, add a value, final value)
+_ACCUMULATORS: dict[str, tuple[Callable, Callable, Callable]] = {
+    "$sum": (lambda: 0, _sum, lambda total: total),
+    "$count": (lambda: 0, lambda total, _: total + 1, lambda total: total),
+    "$avg": (
+        lambda: [0, 0],
+        _average,
+        lambda state: state[0] / state[1] if state[1] else None,
+    ),
+    "$min": (lambda: _MISSING, _extreme(min), _missing_to_none),
+    "$max": (lambda: _MISSING, _extreme(max), _missing_to_none),
+    "$first": (lambda: _MISSING, _first, _missing_to_none),
+    "$last": (lambda: _MISSING, lambda _, value: value, _missing_to_none),
+    "$push": (list, _push, lambda values: values),
+    "$addToSet": (dict, _add_to_set, lambda values: list(values.values())),
+}
+
+
+def _evaluate(expression: Any, doc: dict) -> Any:
+    """Value of an aggregation expression for `doc`, _MISSING if it has none."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        if expression == "$$ROOT":
+            return doc
+        if expression.startswith("$$"):
+            raise UnsupportedOperation(f"Variable {expression} is not supported")
+        return _get_path(doc, expression[1:])
+
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            operator, operand = next(iter(expression.items()))
+            if operator.startswith("$"):
+                if operator not in _OPERATORS:
+                    raise UnsupportedOperation(
+                        f"Expression operator {operator} is not supported"
+                    )
+                if operator == "$literal":
+                    return operand
+                operands = operand if isinstance(operand, list) else [operand]
+                return _OPERATORS[operator](
+                    *[_evaluate(value, doc) for value in operands]
+                )
+        evaluated = {key: _evaluate(value, doc) for key, value in expression.items()}
+        return {key: value for key, value in evaluated.items() if value is not _MISSING}
+
+    if isinstance(expression, list):
+        return [_missing_to_none(_evaluate(value, doc)) for value in expression]
+    return expression
+
+
+def _arithmetic(function: Callable[..., Any]) -> Callable[..., Any]:
+    def evaluate(*values: Any) -> Any:
+        if any(value is _MISSING or value is None for value in values):
+            return None
+        return function(*values)
+
+    return evaluate
+
+
+def _concat(*values: Any) -> str | None:
+    if any(value is _MISSING or value is None for value in values):
+        return None
+    return "".join(values)
+
+
+def _size(value: Any) -> int:
+    if not isinstance(value, list):
+        raise ValueError(f"$size needs an array, got {value!r}")
+    return len(value)
+
+
+def _if_null(*values: Any) -> Any:
+    for value in values:
+        if value is not _MISSING and value is not None:
+            return value
+    return _missing_to_none(values[-1])
+
+
+_OPERATORS: dict[str, Callable[..., Any]] = {
+    "$literal": lambda value: value,
+    "$add": _arithmetic(lambda *values: sum(values)),
+    "$subtract": _arithmetic(lambda a, b: a - b),
+    "$multiply": _arithmetic(lambda *values: _product(values)),
+    "$divide": _arithmetic(lambda a, b: a / b),
+    "$concat": _concat,
+    "$size": _size,
+    "$ifNull": _if_null,
+}
+
+
+def _product(values: Iterable[Any]) -> Any:
+    result = 1
+    for value in values:
+        result *= value
+    return result
+
+
+def _get_path(value: Any, path: str) -> Any:
+    """Value at a dotted path, arrays along the way give the array of their values."""
+    parts = path.split(".")
+    for i, part in enumerate(parts):
+        if isinstance(value, list):
+            rest = ".".join(parts[i:])
+            found = [_get_path(item, rest) for item in value if isinstance(item, dict)]
+            return [item for item in found if item is not _MISSING]
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_path(doc: dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        child = doc.get(part)
+        # Copied, the documents above may share it
+        doc[part] = child = dict(child) if isinstance(child, dict) else {}
+        doc = child
+    doc[last] = value
+
+
+def _unset_path(doc: dict, path: str) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        child = doc.get(part)
+        if not isinstance(child, dict):
+            return
+        doc[part] = child = dict(child)
+        doc = child
+    doc.pop(last, None)
+
+
+def _is_flag(value: Any) -> bool:
+    return isinstance(value, (bool, int))
+
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
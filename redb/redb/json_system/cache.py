@@ -0,0 +1,100 @@
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Identifies one version of a document file: (path, st_mtime_ns, st_size)
+CacheKey = tuple[str, int, int]
+
+
+class DocumentCache:
+    """
+    Bounded LRU of the parsed documents of a collection, shared by all of its
+    handles.
+
+    Entries are keyed by the path, modification time and size of the file a
+    document was parsed from, so a file rewritten by another process is never
+    served from the cache. Documents are kept marshalled: unmarshalling hands
+    out a private copy each hit, at a fraction of the cost of parsing JSON.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        # Key of the version cached for each path
+        self.__keys: dict[str, CacheKey] = {}
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the cached documents."""
+        return self.__size
+
+    def get(self, key: CacheKey) -> dict | None:
+        with self.__lock:
+            data = self.__entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(key)
+        return marshal.loads(data)
+
+    def put(self, key: CacheKey, doc: dict) -> None:
+        try:
+            data = marshal.dumps(doc)
+        except ValueError:
+            # Holds values marshal knows nothing about, parsed again each time
+            return
+        if len(data) > self.max_bytes:
+            return
+
+        with self.__lock:
+            self.__pop(key[0])
+            self.__entries[key] = data
+            self.__keys[key[0]] = key
+            self.__size += len(data)
+            while self.__size > self.max_bytes:
+                old_key, old_data = self.__entries.popitem(last=False)
+                del self.__keys[old_key[0]]
+                self.__size -= len(old_data)
+
+    def discard(self, *paths: Path) -> None:
+        """Forget the documents stored at `paths`, rewritten or removed."""
+        with self.__lock:
+            for path in paths:
+                self.__pop(str(path))
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__keys.clear()
+            self.__size = 0
+
+    def __pop(self, path: str) -> None:
+        key = self.__keys.pop(path, None)
+        if key is not None:
+            self.__size -= len(self.__entries.pop(key))
+
+
+def cache_key(path: Path, stat: os.stat_result) -> CacheKey:
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+_caches: dict[Path, DocumentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_document_cache(collection_path: Path, max_bytes: int) -> DocumentCache:
+    key = Path(os.path.abspath(collection_path))
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = DocumentCache(max_bytes)
+        return _caches[key]
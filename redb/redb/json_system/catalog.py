@@ -0,0 +1,347 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Literal
+
+from .codecs import document_id
+
+METADATA_FOLDER = ".redb"
+CATALOG_FILE = "catalog"
+LAYOUT_FILE = "layout"
+
+# "flat" keeps every document in the collection folder, "sharded" spreads
+# them over `ab/cd/` subfolders named after their id (see shard_folder)
+Layout = Literal["flat", "sharded"]
+
+# Directory mtimes are only as precise as the filesystem clock tick, so a
+# change made by another process right after one of ours may leave the mtime
+# untouched. Signatures recorded within this window are re-checked by a listing.
+_RACY_WINDOW_NS = 50_000_000
+_COMPACTION_MIN_ENTRIES = 1024
+
+Listener = Callable[[set[str], set[str]], None]
+
+
+class Catalog:
+    """
+    Primary-key catalog of a JSON collection.
+
+    Keeps the ids of the collection in memory (ordered as they were
+    inserted) and mirrors them to an append-only log under `.redb/catalog`,
+    so that other processes can load it without scanning the directory.
+    The directory is only scanned again when its mtime shows that someone
+    else changed it. Sharded collections are scanned shard by shard, and
+    their writers touch the collection folder so that its mtime still moves.
+    """
+
+    def __init__(self, collection_path: Path) -> None:
+        self.__collection_path = collection_path
+        self.__log_path = collection_path / METADATA_FOLDER / CATALOG_FILE
+        self.__ids: dict[str, None] = {}
+        self.__mtime_ns: int | None = None
+        self.__racy = False
+        self.__loaded = False
+        self.__log_entries = 0
+        self.__listeners: list[Listener] = []
+        self.__lock = threading.RLock()
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call `listener(added, removed)` when ids change outside of redb."""
+        self.__listeners.append(listener)
+
+    def ids(self) -> list[str]:
+        with self.__lock:
+            self.__validate()
+            return list(self.__ids)
+
+    def __contains__(self, id: object) -> bool:
+        with self.__lock:
+            self.__validate()
+            return str(id) in self.__ids
+
+    def __len__(self) -> int:
+        with self.__lock:
+            self.__validate()
+            return len(self.__ids)
+
+    def refresh(self) -> None:
+        with self.__lock:
+            self.__validate()
+
+    # The mutators below record changes redb itself just made to the
+    # directory. Callers are expected to have refreshed the catalog before
+    # touching the files, so that only their own change is acknowledged.
+
+    def add(self, *ids: object) -> None:
+        with self.__lock:
+            if not self.__is_tracking():
+                return
+            new_ids = [str(id) for id in ids if str(id) not in self.__ids]
+            for id in new_ids:
+                self.__ids[id] = None
+            self.__append([f"+{id}" for id in new_ids])
+
+    def discard(self, *ids: object) -> None:
+        with self.__lock:
+            if not self.__is_tracking():
+                return
+            old_ids = [str(id) for id in ids if str(id) in self.__ids]
+            for id in old_ids:
+                del self.__ids[id]
+            self.__append([f"-{id}" for id in old_ids])
+
+    def sync(self) -> None:
+        """Acknowledge a directory change made by redb that kept the same ids."""
+        with self.__lock:
+            if self.__is_tracking():
+                self.__append([])
+
+    def rebuild(self) -> None:
+        with self.__lock:
+            mtime_ns = _get_mtime_ns(self.__collection_path)
+            if mtime_ns is None:
+                self.__reset()
+            else:
+                self.__rebuild(mtime_ns)
+
+    def __is_tracking(self) -> bool:
+        if self.__loaded and self.__mtime_ns is not None:
+            return True
+        # Nothing was tracked yet, so a scan already includes the change
+        self.__validate()
+        return False
+
+    def __validate(self) -> None:
+        mtime_ns = _get_mtime_ns(self.__collection_path)
+        if mtime_ns is None:
+            self.__reset()
+            return
+
+        if not self.__loaded:
+            self.__loaded = True
+            if self.__load(mtime_ns):
+                return
+            self.__rebuild(mtime_ns, notify=False)
+        elif mtime_ns != self.__mtime_ns or self.__racy:
+            self.__rebuild(mtime_ns)
+
+    def __reset(self) -> None:
+        self.__notify(set(), set(self.__ids))
+        self.__ids.clear()
+        self.__mtime_ns = None
+        self.__racy = False
+        self.__log_entries = 0
+
+    def __load(self, mtime_ns: int) -> bool:
+        try:
+            with open(self.__log_path, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return False
+
+        ids: dict[str, None] = {}
+        signature = None
+        for line in lines:
+            if line.startswith("+"):
+                ids[line[1:]] = None
+                signature = None
+            elif line.startswith("-"):
+                ids.pop(line[1:], None)
+                signature = None
+            elif line.startswith("@"):
+                signature = line[1:].split()
+
+        # A log not ending in a signature was interrupted mid-update
+        if signature is None or signature != [str(mtime_ns), "0"]:
+            return False
+
+        self.__ids = ids
+        self.__mtime_ns = mtime_ns
+        self.__racy = False
+        self.__log_entries = len(lines)
+        return True
+
+    def __rebuild(self, mtime_ns: int, notify: bool = True) -> None:
+        layout = read_layout(self.__collection_path)
+        # A document being recompressed may briefly have two files
+        ids = sorted(set(list_document_ids(self.__collection_path, layout)))
+
+        if self.__mtime_ns is not None and self.__ids.keys() == set(ids):
+            self.__append([])
+            return
+
+        if notify:
+            self.__notify(set(ids) - self.__ids.keys(), self.__ids.keys() - set(ids))
+        self.__ids = dict.fromkeys(ids)
+        self.__mtime_ns = mtime_ns
+        self.__compact()
+
+    def __notify(self, added: set[str], removed: set[str]) -> None:
+        if not added and not removed:
+            return
+        for listener in self.__listeners:
+            listener(added, removed)
+
+    def __append(self, lines: list[str]) -> None:
+        self.__record_signature()
+        if self.__log_entries > 2 * len(self.__ids) + _COMPACTION_MIN_ENTRIES:
+            self.__compact()
+            return
+
+        lines.append(self.__signature_line())
+        try:
+            with open(self.__log_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+            self.__log_entries += len(lines)
+        except OSError:
+            # The catalog is only a cache, a read-only collection still works
+            pass
+
+    def __compact(self) -> None:
+        try:
+            self.__log_path.parent.mkdir(exist_ok=True)
+        except OSError:
+            return
+
+        # Creating the metadata folder may itself have changed the directory
+        self.__record_signature()
+        lines = [f"+{id}" for id in self.__ids]
+        lines.append(self.__signature_line())
+        tmp_path = self.__log_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, self.__log_path)
+            self.__log_entries = len(lines)
+        except OSError:
+            pass
+
+    def __record_signature(self) -> None:
+        self.__mtime_ns = _get_mtime_ns(self.__collection_path)
+        if self.__mtime_ns is not None:
+            self.__racy = time.time_ns() - self.__mtime_ns < _RACY_WINDOW_NS
+
+    def __signature_line(self) -> str:
+        return f"@{self.__mtime_ns} {int(self.__racy)}"
+
+
+class FolderCatalog:
+    """
+    Names of the subfolders of a folder (databases of a client, collections
+    of a database), listed again only when the folder's mtime changes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__path = path
+        self.__names: set[str] = set()
+        self.__mtime_ns: int | None = None
+        self.__racy = False
+        self.__lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        with self.__lock:
+            self.__validate()
+            return sorted(self.__names)
+
+    def __contains__(self, name: object) -> bool:
+        with self.__lock:
+            self.__validate()
+            return name in self.__names
+
+    def __validate(self) -> None:
+        mtime_ns = _get_mtime_ns(self.__path)
+        if mtime_ns is None:
+            self.__names = set()
+            self.__mtime_ns = None
+            return
+        if mtime_ns == self.__mtime_ns and not self.__racy:
+            return
+
+        with os.scandir(self.__path) as entries:
+            self.__names = {
+                entry.name
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir()
+            }
+        self.__mtime_ns = mtime_ns
+        self.__racy = time.time_ns() - mtime_ns < _RACY_WINDOW_NS
+
+
+_catalogs: dict[Path, Catalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(collection_path: Path) -> Catalog:
+    key = Path(os.path.abspath(collection_path))
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = Catalog(key)
+        return _catalogs[key]
+
+
+def read_layout(collection_path: Path) -> Layout:
+    try:
+        with open(collection_path / METADATA_FOLDER / LAYOUT_FILE, "r") as f:
+            layout = f.read().strip()
+    except FileNotFoundError:
+        return "flat"
+    if layout not in ("flat", "sharded"):
+        raise ValueError(f"Unknown layout {layout!r} in {collection_path}")
+    return layout  # type: ignore
+
+
+def write_layout(collection_path: Path, layout: Layout) -> None:
+    folder = collection_path / METADATA_FOLDER
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp_path = folder / f"{LAYOUT_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(layout)
+    os.replace(tmp_path, folder / LAYOUT_FILE)
+
+
+def shard_folder(id: str) -> str:
+    """`ab/cd` subfolder of a sharded document, from the first digits of its id."""
+    prefix = id[:4].lower()
+    if len(prefix) < 4 or not all(char in "0123456789abcdef" for char in prefix):
+        # Ids that are not content hashes still spread evenly
+        prefix = hashlib.sha256(id.encode()).hexdigest()[:4]
+    return f"{prefix[:2]}/{prefix[2:]}"
+
+
+def list_document_ids(collection_path: Path, layout: Layout) -> list[str]:
+    if layout == "flat":
+        return _list_document_ids(collection_path)
+
+    ids = []
+    for first in _list_shards(collection_path):
+        for second in _list_shards(first):
+            ids.extend(_list_document_ids(second))
+    return ids
+
+
+def _list_shards(path: Path | str) -> list[str]:
+    with os.scandir(path) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if len(entry.name) == 2 and entry.is_dir(follow_symlinks=False)
+        ]
+
+
+def _list_document_ids(path: Path | str) -> list[str]:
+    ids = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            id = document_id(entry.name)
+            if id is not None and entry.is_file(follow_symlinks=False):
+                ids.append(id)
+    return ids
+
+
+def _get_mtime_ns(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
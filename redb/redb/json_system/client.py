@@ -4,6 +4,7 @@ from pathlib import Path
 from redb.interface.client import Client
 from redb.interface.configs import JSONConfig
 
+from .catalog import FolderCatalog
 from .database import JSONDatabase
 
 
@@ -11,41 +12,47 @@ class JSONClient(Client):
     def __init__(self, json_config: JSONConfig | dict) -> None:
         if isinstance(json_config, dict):
             json_config = JSONConfig(**json_config)
+        self.__config = json_config
         self.__client_folder_path = Path(json_config.client_folder_path)
+        self.__folders = FolderCatalog(self.__client_folder_path)
+        # Handles are reused so that resolving a database is a dict lookup
+        self.__databases: dict[str, JSONDatabase] = {}
 
         database_default_path = json_config.default_database_folder_path
         if database_default_path is None:
             self.__default_database = JSONDatabase(
-                self.__client_folder_path / Path("default-database")
+                self.__client_folder_path / Path("default-database"), json_config
             )
         else:
             self.__default_database = JSONDatabase(
-                self.__client_folder_path / database_default_path
+                self.__client_folder_path / database_default_path, json_config
             )
 
     def _get_driver_client(self) -> "JSONClient":
         return self
 
     def get_databases(self) -> list[JSONDatabase]:
-        return [
-            JSONDatabase(folder)
-            for folder in self.__client_folder_path.glob("*")
-            if folder.is_dir()
-        ]
+        names = self.__folders.names()
+        for name in self.__databases.keys() - set(names):
+            self.__databases.pop(name, None)
+        return [self.__get_handle(name) for name in names]
 
     def get_database(self, name: str) -> JSONDatabase:
-        for folder in self.__client_folder_path.glob("*"):
-            if folder.is_dir() and folder.name == name:
-                return JSONDatabase(folder)
+        # Checked against the folder listing, refreshed when its mtime changes,
+        # so a database deleted from outside is not served from the cache
+        if name in self.__folders:
+            return self.__get_handle(name)
 
+        self.__databases.pop(name, None)
         raise ValueError(f"Database {name} not found")
 
     def get_default_database(self) -> JSONDatabase:
         return self.__default_database
 
     def drop_database(self, name: str) -> bool:
+        self.__databases.pop(name, None)
         try:
-            shutil.rmtree(self.get_database(name).database_path)
+            shutil.rmtree(self.__client_folder_path / name)
             return True
         except:
             return False
@@ -53,5 +60,12 @@ class JSONClient(Client):
     def close(self) -> bool:
         return True
 
+    def __get_handle(self, name: str) -> JSONDatabase:
+        database = self.__databases.get(name)
+        if database is None:
+            database = JSONDatabase(self.__client_folder_path / name, self.__config)
+            self.__databases[name] = database
+        return database
+
     def __truediv__(self, other):
         return self.__client_folder_path / other
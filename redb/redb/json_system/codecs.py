@@ -0,0 +1,128 @@
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class Codec(ABC):
+    """Compresses serialized documents, stored with names ending in `suffix`."""
+
+    suffix: str
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def read(self, f: BinaryIO) -> bytes:
+        """Decompress the rest of `f` while reading it."""
+        pass
+
+
+class PlainCodec(Codec):
+    suffix = ".json"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def read(self, f: BinaryIO) -> bytes:
+        return f.read()
+
+
+class ZlibCodec(Codec):
+    suffix = ".json.zlib"
+
+    def __init__(self, level: int = 6) -> None:
+        self.__level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.__level)
+
+    def read(self, f: BinaryIO) -> bytes:
+        decompressor = zlib.decompressobj()
+        chunks = []
+        while chunk := f.read(_CHUNK_SIZE):
+            chunks.append(decompressor.decompress(chunk))
+        chunks.append(decompressor.flush())
+        return b"".join(chunks)
+
+
+class ZstdCodec(Codec):
+    suffix = ".json.zst"
+
+    def __init__(self, level: int = 3) -> None:
+        import zstandard
+
+        self.__zstandard = zstandard
+        self.__level = level
+        # (De)compressors must not be shared by threads
+        self.__local = threading.local()
+
+    def compress(self, data: bytes) -> bytes:
+        if not hasattr(self.__local, "compressor"):
+            self.__local.compressor = self.__zstandard.ZstdCompressor(
+                level=self.__level
+            )
+        return self.__local.compressor.compress(data)
+
+    def read(self, f: BinaryIO) -> bytes:
+        if not hasattr(self.__local, "decompressor"):
+            self.__local.decompressor = self.__zstandard.ZstdDecompressor()
+        chunks = self.__local.decompressor.read_to_iter(f, read_size=_CHUNK_SIZE)
+        return b"".join(chunks)
+
+
+# Every suffix a document may be stored under, longest first
+DOCUMENT_SUFFIXES = (ZstdCodec.suffix, ZlibCodec.suffix, PlainCodec.suffix)
+
+_factories: dict[str, Callable[[], Codec]] = {
+    "none": PlainCodec,
+    "zlib": ZlibCodec,
+    "zstd": ZstdCodec,
+}
+_codecs: dict[str, Codec] = {}
+_codecs_lock = threading.Lock()
+
+
+def get_codec(name: str | None = None) -> Codec:
+    """
+    Codec registered as `name`, None meaning no compression.
+
+    "auto" picks zstd when zstandard is installed and zlib otherwise.
+    """
+    name = name or "none"
+    with _codecs_lock:
+        if name not in _codecs:
+            _codecs[name] = _build_codec(name)
+        return _codecs[name]
+
+
+def get_codec_by_suffix(suffix: str) -> Codec:
+    for name, factory in _factories.items():
+        if getattr(factory, "suffix", None) == suffix:
+            return get_codec(name)
+    raise ValueError(f"No codec stores documents as {suffix!r}")
+
+
+def document_id(name: str) -> str | None:
+    """Id of the document stored in a file called `name`, if it is one."""
+    if name.startswith("."):
+        return None
+    for suffix in DOCUMENT_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return None
+
+
+def _build_codec(name: str) -> Codec:
+    if name == "auto":
+        try:
+            return ZstdCodec()
+        except ImportError:
+            return ZlibCodec()
+
+    if name not in _factories:
+        raise ValueError(f"Unknown codec: {name!r}")
+    return _factories[name]()
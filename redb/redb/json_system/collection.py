@@ -1,11 +1,27 @@
-import json
 import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import Any, Type
-
-from redb.core import BaseDocument, Document
-from redb.interface.errors import DocumentNotFound
-from redb.interface.collection import Collection, Json, OptionalJson, ReturnType
+from typing import Any, Callable, Generator, Iterable, Iterator, Type
+
+from pymongo.errors import DuplicateKeyError
+
+from redb.core import Document
+from redb.core.serializers import get_serializer
+from redb.interface.collection import (
+    Collection,
+    Json,
+    OptionalJson,
+    ReturnType,
+    batch_iterate_converted_results,
+    iterate_converted_results,
+    unpack_operation,
+)
+from redb.interface.configs import JSONConfig
+from redb.interface.errors import BulkWriteError, DocumentNotFound, UnsupportedOperation
 from redb.interface.fields import CompoundIndex, PyMongoOperations
 from redb.interface.results import (
     BulkWriteResult,
@@ -18,14 +34,40 @@ from redb.interface.results import (
     UpdateOneResult,
 )
 
+from .aggregation import run_pipeline
+from .indexes import get_indexes, is_equality_value, resolve_path, sort_value
+from .locks import get_locks
+from .partial import extract_fields
+from .query import Query
+from .sorting import sort_documents
+from .storage import get_storage
+
 
 class JSONCollection(Collection):
     __client_name__ = "json"
 
-    def __init__(self, collection: Path, *args, **kwargs):
+    def __init__(
+        self,
+        collection: Path,
+        config: JSONConfig | dict | None = None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
+        if config is None:
+            config = JSONConfig(client_folder_path=str(collection.parent.parent))
+        elif isinstance(config, dict):
+            config = JSONConfig(**config)
+
         self.__collection = collection
+        self.__config = config
+        self.__read_workers = config.read_workers
+        self.__sort_buffer_size = config.sort_buffer_size
+        self.__serializer = get_serializer(config.serializer)
+        self.__storage = get_storage(collection, config)
+        self.__indexes = get_indexes(collection, self.__storage)
+        self.__locks = get_locks(collection)
 
     def _get_driver_collection(self):
         return self.__collection
@@ -34,7 +76,13 @@ class JSONCollection(Collection):
         self,
         index: CompoundIndex,
     ) -> bool:
-        raise NotImplementedError
+        self.__check_writable()
+        try:
+            self.__indexes.sync(self.__load)
+            self.__indexes.create(index, self.__load)
+            return True
+        except (DuplicateKeyError, OSError):
+            return False
 
     def find(
         self,
@@ -45,50 +93,17 @@ class JSONCollection(Collection):
         sort: list[tuple[str, str | int]] | None = None,
         skip: int = 0,
         limit: int = 0,
-    ) -> list[ReturnType]:
-        transform = lambda file_path: json.load(open(file_path))
-        if filter is not None and "_id" in filter:
-            file_path = self.__collection / f"{filter['_id']}.json"
-            if file_path.is_file() and not file_path.is_symlink():
-                return [return_cls(**transform(file_path))]
-
-            if len(filter.keys()) == 1:
-                # If the only filter was the ID, return empty list
-                return []
-
-        json_files = self.__collection.glob("*.json")
-        out = []
-        for i, json_file in enumerate(json_files):
-            if i < skip:
-                continue
-            if limit and len(out) >= limit:
-                break
-            if not json_file.is_file():
-                continue
-
-            transformed_json: dict = transform(json_file)
-            if filter is not None:
-                ignore_file = False
-                for key in filter:
-                    if key not in transformed_json:
-                        ignore_file = True
-                        break
-                    if transformed_json[key] != filter[key]:
-                        ignore_file = True
-                        break
-                if ignore_file:
-                    continue
-
-            if fields is not None:
-                transformed_json = {
-                    key: value
-                    for key, value in transformed_json.items()
-                    if key in fields
-                }
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | Iterator[list[ReturnType]] | Iterator[ReturnType]:
+        results = self.__iterate(filter, fields, sort, skip, limit)
+        if iterate:
+            return iterate_converted_results(results, return_cls)
 
-            out.append(return_cls(**transformed_json))
+        if batch_size is not None:
+            return batch_iterate_converted_results(results, batch_size, return_cls)
 
-        return out
+        return [return_cls(**result) for result in results]
 
     def find_one(
         self,
@@ -114,57 +129,232 @@ class JSONCollection(Collection):
         key: str,
         filter: OptionalJson = None,
     ) -> list[Any]:
-        docs = self.find(
-            cls,
-            return_cls=dict,
-            filter=filter,
-        )
-        computed_values = set()
-        for doc in docs:
-            if doc[key] in computed_values:
-                continue
-
-            computed_values.add(doc[key])
+        values = {}
+        docs = self.__matching(filter, limit=0, keys={key.split(".")[0]})
+        with closing(docs):
+            for doc in docs:
+                for value in resolve_path(doc, key):
+                    for item in value if isinstance(value, list) else [value]:
+                        values.setdefault(sort_value(item), item)
 
-        return list(computed_values)
+        return list(values.values())
 
     def count_documents(
         self,
         cls: Type[Document],
         filter: OptionalJson = None,
     ) -> int:
-        return len(self.find(cls, return_cls=dict, filter=filter))
+        if not filter:
+            return len(self.__storage)
 
-    def bulk_write(self, _: list[PyMongoOperations]) -> BulkWriteResult:
-        raise NotImplementedError
+        docs = self.__matching(filter, limit=0, keys=set())
+        with closing(docs):
+            return sum(1 for _ in docs)
 
-    def insert_one(
+    def aggregate(
         self,
         cls: Type[Document],
-        data: Json,
-    ) -> InsertOneResult:
-        self.__collection.mkdir(parents=True, exist_ok=True)
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[ReturnType]:
+        """
+        Run the pipeline in process. A leading `$match` is answered like a
+        find, with the help of the indexes, the other stages stream through
+        `run_pipeline`. There is no server to fetch batches from, so
+        `batch_size` is ignored.
+        """
+        filter = None
+        if pipeline and list(pipeline[0]) == ["$match"]:
+            filter, pipeline = pipeline[0]["$match"], pipeline[1:]
+        results = run_pipeline(
+            self.__matching(filter, limit=0),
+            pipeline,
+            self.__serializer,
+            lookup=self.__lookup,
+            # Sorts spill to disk unless told otherwise, as newer Mongo servers do
+            sort_buffer_size=(
+                None if allow_disk_use is False else self.__sort_buffer_size
+            ),
+        )
+        if return_cls is dict:
+            return results
+        return iterate_converted_results(results, return_cls)
 
-        id = data["_id"]
-        json_path = self.__collection / Path(f"{id}.json")
-        if json_path.is_file():
-            raise ValueError(f"Document with {id} already exists")
+    def bulk_write(
+        self,
+        cls: Type[Document],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        """
+        Apply `operations` in order over an in-memory view of the documents
+        they target, then write the outcome in one batch.
+
+        Ordered writes are all or nothing, unordered ones skip the operations
+        that fail and write the rest.
+        """
+        self.__check_writable()
+        unpacked = [unpack_operation(operation) for operation in operations]
+        # Ids are made once, as hashes of default timestamps change between passes
+        for i, (name, filter, doc, upsert) in enumerate(unpacked):
+            if name == "InsertOne" and "_id" not in doc:
+                unpacked[i] = (name, filter, cls(**doc).dict(), upsert)
+        queries = [
+            None if filter is None else Query(filter) for _, filter, _, _ in unpacked
+        ]
+        upserts: dict[int, tuple[dict, dict]] = {}
+        locked: set[Any] = set()
+        while True:
+            with self.__locks.documents(locked):
+                self.__indexes.sync(self.__load)
+                current, originals, result, errors = self.__run_operations(
+                    cls, unpacked, queries, ordered, upserts
+                )
+                # Documents may only be written if they were locked while read
+                if current.keys() <= locked:
+                    deletes = [
+                        id
+                        for id, doc in current.items()
+                        if doc is None and id in originals
+                    ]
+                    writes = [
+                        doc
+                        for id, doc in current.items()
+                        if doc is not None and doc != originals.get(id)
+                    ]
+                    self.__publish(writes, removed=deletes)
+                    if errors:
+                        raise BulkWriteError(
+                            errors=errors,
+                            result=result,
+                            collection_name=cls.collection_name(),
+                        )
+                    return result
+            locked |= current.keys()
+
+    def __run_operations(
+        self,
+        cls: Type[Document],
+        unpacked: list[tuple[str, OptionalJson, OptionalJson, bool]],
+        queries: list[Query | None],
+        ordered: bool,
+        upserts: dict[int, tuple[dict, dict]],
+    ) -> tuple[
+        dict[Any, dict | None], dict[Any, dict], BulkWriteResult, dict[int, Exception]
+    ]:
+        order, originals = self.__load_targets(
+            [query for query in queries if query is not None]
+        )
+        # Latest version of every touched document, None once deleted
+        current: dict[Any, dict | None] = {}
+
+        def get(id: Any) -> dict | None:
+            return current[id] if id in current else originals.get(id)
+
+        def matching(query: Query, first_only: bool) -> list[Any]:
+            ids = []
+            for id in order:
+                doc = get(id)
+                if doc is not None and query(doc):
+                    ids.append(id)
+                    if first_only:
+                        break
+            return ids
 
-        with open(json_path, "w") as f:
-            json.dump(data, f, indent=4)
+        def put(doc: dict) -> None:
+            if doc["_id"] not in current and doc["_id"] not in originals:
+                order.append(doc["_id"])
+            current[doc["_id"]] = doc
 
-        return InsertOneResult(inserted_id=id)
+        # Checked in one go, some storages reload the collection on every check
+        stored = set(
+            self.__storage.exists_many(
+                [doc["_id"] for name, _, doc, _ in unpacked if name == "InsertOne"]
+            )
+        )
+        inserted = deleted = matched = modified = 0
+        upserted_ids = {}
+        errors: dict[int, Exception] = {}
+        for i, (name, filter, doc, upsert) in enumerate(unpacked):
+            try:
+                if name == "InsertOne":
+                    id = doc["_id"]
+                    exists = get(id) is not None if id in current else id in stored
+                    if exists:
+                        raise ValueError(f"Document with {id} already exists")
+                    put(doc)
+                    inserted += 1
+                    continue
+
+                if name in ("DeleteOne", "DeleteMany"):
+                    for id in matching(queries[i], first_only=name == "DeleteOne"):
+                        current[id] = None
+                        deleted += 1
+                    continue
+
+                is_update = name in ("UpdateOne", "UpdateMany")
+                ids = matching(queries[i], first_only=name != "UpdateMany")
+                if not ids and upsert:
+                    new_doc = _equality_fields(filter)
+                    new_doc = (
+                        _apply_update(new_doc, doc, upsert=True)
+                        if is_update
+                        else new_doc | doc
+                    )
+                    if "_id" not in new_doc:
+                        # Reused while the passes agree on what gets upserted
+                        if i not in upserts or upserts[i][0] != new_doc:
+                            upserts[i] = (new_doc, cls(**new_doc).dict())
+                        new_doc = upserts[i][1]
+                    put(new_doc)
+                    upserted_ids[i] = new_doc["_id"]
+                    continue
+
+                # Computed up front, a failing operation leaves nothing half applied
+                updates = []
+                for id in ids:
+                    old_doc = get(id)
+                    new_doc = (
+                        _apply_update(old_doc, doc) if is_update else {"_id": id, **doc}
+                    )
+                    updates.append((id, old_doc, new_doc))
+                matched += len(ids)
+                for id, old_doc, new_doc in updates:
+                    if new_doc != old_doc:
+                        modified += 1
+                    if new_doc["_id"] != id:
+                        current[id] = None
+                    put(new_doc)
+            except Exception as e:
+                if ordered:
+                    raise
+                errors[i] = e
+
+        result = BulkWriteResult(
+            deleted_count=deleted,
+            inserted_count=inserted,
+            matched_count=matched,
+            modified_count=modified,
+            upserted_count=len(upserted_ids),
+            upserted_ids=upserted_ids,
+        )
+        return current, originals, result, errors
+
+    def insert_one(
+        self,
+        cls: Type[Document],
+        data: Json,
+    ) -> InsertOneResult:
+        return InsertOneResult(inserted_id=self.__insert([data])[0])
 
     def insert_many(
         self,
         cls: Type[Document],
         data: list[Json],
     ) -> InsertManyResult:
-        ids = []
-        for item in data:
-            ids.append(self.insert_one(cls, data=item).inserted_id)
-
-        return InsertManyResult(inserted_ids=ids)
+        return InsertManyResult(inserted_ids=self.__insert(data))
 
     def replace_one(
         self,
@@ -173,33 +363,25 @@ class JSONCollection(Collection):
         replacement: Json,
         upsert: bool = False,
     ) -> ReplaceOneResult:
-        doc = self.find_one(cls, return_cls=dict, filter=filter)
-        if doc is None:
-            if not upsert:
-                raise ValueError(f"Document not found")
-
-            self.insert_one(cls, data=replacement)
-            return ReplaceOneResult(
-                matched_count=1,
-                modified_count=1,
-                upserted_id=replacement["_id"],
-            )
-
-        original_path = self.__collection / Path(f"{doc['_id']}.json")
-        upserted = False
-        if replacement["_id"] != doc["_id"]:
-            # Since the ID has changed, we need to remove the old one
-            original_path.unlink()
-            upserted = True
-
-        new_path = self.__collection / Path(f"{replacement['_id']}.json")
-        with open(new_path, "w") as f:
-            json.dump(replacement, f, indent=4)
+        with self.__locked_matches(filter, 1, [replacement["_id"]]) as docs:
+            if docs:
+                # Since the ID may have changed, the old one is removed on write
+                doc = docs[0]
+                self.__publish([replacement], previous_ids=[doc["_id"]])
+                upserted = replacement["_id"] != doc["_id"]
+                return ReplaceOneResult(
+                    matched_count=1,
+                    modified_count=1,
+                    upserted_id=replacement["_id"] if upserted else None,
+                )
 
+        if not upsert:
+            raise ValueError(f"Document not found")
+        self.insert_one(cls, data=replacement)
         return ReplaceOneResult(
             matched_count=1,
             modified_count=1,
-            upserted_id=replacement["_id"] if upserted else None,
+            upserted_id=replacement["_id"],
         )
 
     def update_one(
@@ -209,25 +391,23 @@ class JSONCollection(Collection):
         update: Json,
         upsert: bool = False,
     ) -> UpdateOneResult:
-        doc: dict = self.find_one(cls, return_cls=dict, filter=filter)
-        update = update.pop(next(iter(update.keys())))  # { $set: {...} }
-        if doc is None:
-            if not upsert:
-                raise DocumentNotFound(collection_name=cls.collection_name())
-            result = self.insert_one(cls, data=update)
-            return UpdateOneResult(
-                matched_count=1,
-                modified_count=1,
-                upserted_id=result.inserted_id,
-            )
-        doc_path = self.__collection / Path(f"{doc['_id']}.json")
-        updated_content = doc | update
-        with open(doc_path, "w") as f:
-            json.dump(updated_content, f, indent=2)
+        with self.__locked_matches(filter, 1) as docs:
+            if docs:
+                doc = docs[0]
+                self.__publish([_apply_update(doc, update)], previous_ids=[doc["_id"]])
+                return UpdateOneResult(
+                    matched_count=1,
+                    modified_count=1,
+                    upserted_id=None,
+                )
+
+        if not upsert:
+            raise DocumentNotFound(collection_name=cls.collection_name())
+        result = self.insert_one(cls, data=_upserted_document(cls, filter, update))
         return UpdateOneResult(
             matched_count=1,
             modified_count=1,
-            upserted_id=None,
+            upserted_id=result.inserted_id,
         )
 
     def update_many(
@@ -237,48 +417,23 @@ class JSONCollection(Collection):
         update: Json,
         upsert: bool = False,
     ) -> UpdateManyResult:
-        upserted_ids = []
-        docs = self.find(cls, return_cls=dict, filter=filter)
-        if not docs:
-            if not upsert:
-                raise ValueError(f"Document not found")
-
-            self.insert_one(cls, data=update)
-            return UpdateManyResult(
-                matched_count=1,
-                modified_count=1,
-                upserted_id=update["_id"],
-            )
-
-        for doc in docs:
-            original_path = self.__collection / Path(f"{doc['_id']}.json")
-            with open(original_path, "r") as f:
-                original_content: dict = json.load(f)
-
-            original_content.update(update)
-            if "_id" in update:
-                new_id = update["_id"]
-            elif cls is dict:
-                new_id = BaseDocument().get_dict_hash(
-                    data=original_content, use_data_fields=True
+        with self.__locked_matches(filter, 0) as docs:
+            if docs:
+                updated = [_apply_update(doc, update) for doc in docs]
+                self.__publish(updated, previous_ids=[doc["_id"] for doc in docs])
+                return UpdateManyResult(
+                    matched_count=len(docs),
+                    modified_count=len(docs),
+                    upserted_id=None,
                 )
-            else:
-                new_id = cls.get_hash(data=original_content)
-
-            if doc["_id"] != new_id:
-                # Since the ID has changed, we need to remove the old one
-                original_path.unlink()
-                upserted_ids.append(new_id)
-
-            original_content["_id"] = new_id
-            new_path = self.__collection / Path(f"{new_id}.json")
-            with open(new_path, "w") as f:
-                json.dump(original_content, f, indent=4)
 
+        if not upsert:
+            raise ValueError(f"Document not found")
+        result = self.insert_one(cls, data=_upserted_document(cls, filter, update))
         return UpdateManyResult(
-            matched_count=len(filter),
-            modified_count=len(upserted_ids),
-            upserted_id=upserted_ids,
+            matched_count=1,
+            modified_count=1,
+            upserted_id=result.inserted_id,
         )
 
     def delete_one(
@@ -286,12 +441,10 @@ class JSONCollection(Collection):
         cls: Type[Document],
         filter: Json,
     ) -> DeleteOneResult:
-        doc = self.find_one(cls, return_cls=dict, filter=filter)
-        if doc is None:
-            raise ValueError(f"Document not found")
-
-        file = self.__collection / f"{doc['_id']}.json"
-        file.unlink()
+        with self.__locked_matches(filter, 1) as docs:
+            if not docs:
+                raise ValueError(f"Document not found")
+            self.__publish([], removed=[docs[0]["_id"]])
         return DeleteOneResult(deleted_count=1)
 
     def delete_many(
@@ -299,9 +452,431 @@ class JSONCollection(Collection):
         cls: Type[Document],
         filter: Json,
     ) -> DeleteManyResult:
-        docs = self.find(cls, return_cls=dict, filter=filter)
-        for doc in docs:
-            file = self.__collection / f"{doc['_id']}.json"
-            file.unlink()
-
+        with self.__locked_matches(filter, 0) as docs:
+            self.__publish([], removed=[doc["_id"] for doc in docs])
         return DeleteManyResult(deleted_count=len(docs))
+
+    def __lookup(self, collection_name: str) -> Callable[[dict], Iterator[dict]]:
+        other = JSONCollection(
+            self.__collection.parent / collection_name, self.__config
+        )
+        return lambda filter: other.__matching(filter, limit=0)
+
+    def __candidate_ids(self, query: Query) -> list[str]:
+        if "_id" in query.equalities:
+            return [query.equalities["_id"]]
+        if "_id" in query.memberships:
+            return list(dict.fromkeys(query.memberships["_id"]))
+
+        if query.keys and self.__indexes:
+            self.__indexes.sync(self.__load)
+            scan = self.__indexes.choose(query)
+            if scan is not None:
+                return scan.ids
+
+        return self.__storage.ids()
+
+    def __iterate(
+        self,
+        filter: OptionalJson,
+        fields: dict[str, bool] | None,
+        sort: list[tuple[str, str | int]] | None,
+        skip: int,
+        limit: int,
+    ) -> Generator[Json, None, None]:
+        """Filter, then sort, then skip and limit, like a Mongo server would."""
+        end = skip + limit if limit else None
+        keys = _projected_keys(fields)
+        if keys is not None and sort:
+            keys |= {field.split(".")[0] for field, _ in sort}
+
+        # Without a sort, matching stops as soon as `end` documents are found
+        docs = self.__matching(filter, limit=0 if sort else end or 0, keys=keys)
+        if sort:
+            docs = sort_documents(
+                docs,
+                sort,
+                self.__serializer,
+                limit=end or 0,
+                buffer_size=self.__sort_buffer_size,
+            )
+
+        with closing(docs):
+            for doc in islice(docs, skip, end):
+                if fields is not None:
+                    doc = _project(doc, fields)
+                yield doc
+
+    def __matching(
+        self,
+        filter: OptionalJson,
+        limit: int,
+        keys: set[str] | None = None,
+    ) -> Generator[Json, None, None]:
+        """
+        Documents matching `filter`, holding at least their `keys` (None for
+        every key) and the keys the filter looks at.
+        """
+        matched = 0
+        query = Query(filter)
+        if keys is not None:
+            keys = keys | query.keys
+
+        def load(id: Any) -> dict | None:
+            return self.__load_matching(id, query, keys)
+
+        def window() -> int:
+            # Never read ahead more documents than `limit` may still need
+            if limit:
+                return min(self.__read_workers, limit - matched)
+            return self.__read_workers
+
+        docs = self.__load_many(self.__candidate_ids(query), load, window)
+        with closing(docs):
+            for doc in docs:
+                if doc is None:
+                    continue
+
+                matched += 1
+                yield doc
+                if limit and matched >= limit:
+                    return
+
+    def __load_targets(self, queries: list[Query]) -> tuple[list[Any], dict[Any, dict]]:
+        """Documents matching any of `queries`, read in a single pass."""
+        candidates = {}
+        for query in queries:
+            candidates.update(dict.fromkeys(self.__candidate_ids(query)))
+
+        docs = self.__load_many(
+            list(candidates), self.__load, lambda: self.__read_workers
+        )
+        targets = {}
+        with closing(docs):
+            for id, doc in zip(candidates, docs):
+                if doc is not None and any(query(doc) for query in queries):
+                    targets[id] = doc
+        return list(targets), targets
+
+    def __load(self, id: Any) -> dict | None:
+        return self.__storage.read(id)
+
+    def __load_matching(
+        self,
+        id: Any,
+        query: Query,
+        keys: set[str] | None,
+    ) -> dict | None:
+        if self.__storage.caches_documents:
+            doc = self.__storage.read(id)
+            return doc if doc is not None and query(doc) else None
+
+        data = self.__storage.read_raw(id)
+        if data is None:
+            return None
+
+        loads = self.__serializer.loads
+        try:
+            if keys is not None:
+                doc = extract_fields(data, keys, loads)
+                return doc if query(doc) else None
+
+            # Rule the document out before decoding all of it
+            if query.keys:
+                if not query(extract_fields(data, query.keys, loads)):
+                    return None
+                return loads(data)
+        except ValueError:
+            pass
+
+        doc = loads(data)
+        return doc if query(doc) else None
+
+    def __load_many(
+        self,
+        ids: list[Any],
+        load: Callable[[Any], dict | None],
+        window: Callable[[], int],
+    ) -> Generator[dict | None, None, None]:
+        if self.__read_workers <= 1:
+            return (load(id) for id in ids)
+        executor = _get_executor(self.__read_workers)
+        return _prefetch(executor, load, ids, window)
+
+    def __insert(self, data: list[Json]) -> list[Any]:
+        self.__check_writable()
+        ids = [item["_id"] for item in data]
+        with self.__locks.documents(ids):
+            self.__indexes.sync(self.__load)
+            seen = set()
+            for id in ids:
+                if id in seen:
+                    raise ValueError(f"Document with {id} already exists")
+                seen.add(id)
+            existing = self.__storage.exists_many(ids)
+            if existing:
+                raise ValueError(f"Document with {existing[0]} already exists")
+            self.__publish(data)
+        return ids
+
+    @contextmanager
+    def __locked_matches(
+        self,
+        filter: OptionalJson,
+        limit: int,
+        extra_ids: list[Any] | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Documents matching `filter`, read again once locked (along with
+        `extra_ids`) so nobody changes them before they are written.
+        """
+        self.__check_writable()
+        query = Query(filter)
+        while True:
+            docs = self.__matching(filter, limit)
+            with closing(docs):
+                ids = [doc["_id"] for doc in docs]
+            with self.__locks.documents(ids + (extra_ids or [])):
+                current = [self.__load(id) for id in ids]
+                if all(doc is not None and query(doc) for doc in current):
+                    yield current  # type: ignore
+                    return
+            # Changed by someone else in between, look again
+
+    def __publish(
+        self,
+        docs: list[Json],
+        previous_ids: list[Any] | None = None,
+        removed: list[Any] | None = None,
+    ) -> None:
+        """
+        Write `docs` (stored until now under `previous_ids`, if any) and remove
+        the `removed` ids. Callers hold the locks of all those documents.
+        """
+        previous_ids = previous_ids or [None] * len(docs)
+        # Unique keys must not be claimed by someone else between check and write
+        guard = self.__locks.collection() if self.__indexes.unique else nullcontext()
+        with guard:
+            self.__indexes.sync(self.__load)
+            if removed:
+                self.__remove(*removed)
+            if not docs:
+                return
+
+            ids = [
+                doc["_id"] if previous_id is None else previous_id
+                for doc, previous_id in zip(docs, previous_ids)
+            ]
+            self.__indexes.check_unique_many(docs, ids)
+            self.__storage.write(docs)
+            renamed = [
+                previous_id
+                for doc, previous_id in zip(docs, previous_ids)
+                if previous_id is not None and previous_id != doc["_id"]
+            ]
+            if renamed:
+                self.__remove(*renamed)
+            self.__indexes.put_many(docs)
+
+    def __check_writable(self) -> None:
+        if self.__storage.read_only:
+            raise UnsupportedOperation(
+                f"Collection {self.__collection.name} is a read-only snapshot"
+            )
+
+    def __remove(self, *ids: Any) -> None:
+        self.__storage.delete(list(ids))
+        self.__indexes.remove(*ids)
+
+
+_END = object()
+_executors: dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="redb-json-reader",
+            )
+        return _executors[workers]
+
+
+def _prefetch(
+    executor: ThreadPoolExecutor,
+    load: Callable[[Any], dict | None],
+    ids: Iterable[Any],
+    window: Callable[[], int],
+) -> Generator[dict | None, None, None]:
+    """
+    Load `ids` concurrently, yielding the documents in the order of `ids`.
+
+    At most `window()` loads are in flight at a time, and the ones still
+    pending when the consumer stops are cancelled.
+    """
+    ids = iter(ids)
+    pending: deque[Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max(window(), 1):
+                id = next(ids, _END)
+                if id is _END:
+                    exhausted = True
+                else:
+                    pending.append(executor.submit(load, id))
+            if not pending:
+                return
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _projected_keys(fields: dict[str, bool] | None) -> set[str] | None:
+    """Top-level keys a projection keeps, None if it keeps all but some."""
+    if fields is None:
+        return None
+    keys = {key.split(".")[0] for key, include in fields.items() if include}
+    if not keys:
+        return None
+    if fields.get("_id", True):
+        keys.add("_id")
+    return keys
+
+
+def _project(doc: dict, fields: dict[str, bool]) -> dict:
+    keys = _projected_keys(fields)
+    if keys is not None:
+        return {key: value for key, value in doc.items() if key in keys}
+    return {key: value for key, value in doc.items() if fields.get(key, True)}
+
+
+def _equality_fields(filter: Json) -> dict:
+    """Fields an upsert takes from its filter."""
+    return {
+        key: value
+        for key, value in filter.items()
+        if not key.startswith("$") and "." not in key and is_equality_value(value)
+    }
+
+
+def _upserted_document(cls: Type[Document], filter: Json, update: Json) -> dict:
+    """Document inserted by an update that matched nothing, seeded from its filter."""
+    doc = _apply_update(_equality_fields(filter), update, upsert=True)
+    if "_id" not in doc:
+        doc = cls(**doc).dict()
+    return doc
+
+
+def _apply_update(doc: dict, update: Json, upsert: bool = False) -> dict:
+    """
+    Copy of `doc` with a Mongo update document (or plain fields) applied,
+    `upsert` when `doc` is the document an upsert is about to insert.
+    """
+    if not any(key.startswith("$") for key in update):
+        return doc | update
+
+    updated = dict(doc)
+    for operator, fields in update.items():
+        if operator == "$set":
+            updated.update(fields)
+        elif operator == "$setOnInsert":
+            if upsert:
+                updated.update(fields)
+        elif operator == "$unset":
+            for key in fields:
+                updated.pop(key, None)
+        elif operator in _ARRAY_OPERATORS or operator == "$inc":
+            for path, operand in fields.items():
+                if operator == "$pull" and not resolve_path(updated, path):
+                    # Nothing to pull from, the field stays missing
+                    continue
+                parent, key = _update_target(updated, path)
+                if operator == "$inc":
+                    parent[key] = _increment(parent.get(key, 0), operand, path)
+                else:
+                    parent[key] = _ARRAY_OPERATORS[operator](
+                        _array_at(parent, key, path), operand
+                    )
+        else:
+            raise UnsupportedOperation(f"Update operator {operator} is not supported")
+    return updated
+
+
+def _update_target(doc: dict, path: str) -> tuple[dict, str]:
+    """Dict holding the last key of a dotted `path`, copied so `doc` owns it."""
+    *parents, key = path.split(".")
+    for attr in parents:
+        child = doc.get(attr)
+        if child is None:
+            child = {}
+        elif not isinstance(child, dict):
+            raise ValueError(f"Cannot update {path}, {attr} is not a document")
+        doc[attr] = child = dict(child)
+        doc = child
+    return doc, key
+
+
+def _increment(value: Any, amount: Any, path: str) -> Any:
+    numbers = (int, float)
+    if isinstance(value, bool) or not isinstance(value, numbers):
+        raise ValueError(f"Cannot apply $inc to {path}, it is not a number")
+    if isinstance(amount, bool) or not isinstance(amount, numbers):
+        raise ValueError(f"Cannot $inc {path} by a value that is not a number")
+    return value + amount
+
+
+def _array_at(doc: dict, key: str, path: str) -> list:
+    value = doc.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"Cannot update {path} as an array, it is not one")
+    return list(value)
+
+
+def _each(operand: Any) -> list:
+    """Values pushed or added by `operand`, many when given with $each."""
+    if not isinstance(operand, dict) or "$each" not in operand:
+        return [operand]
+    modifiers = set(operand) - {"$each"}
+    if modifiers:
+        raise UnsupportedOperation(
+            f"Update modifiers {sorted(modifiers)} are not supported"
+        )
+    return list(operand["$each"])
+
+
+def _push(array: list, operand: Any) -> list:
+    return array + _each(operand)
+
+
+def _add_to_set(array: list, operand: Any) -> list:
+    for value in _each(operand):
+        if value not in array:
+            array.append(value)
+    return array
+
+
+def _pull(array: list, condition: Any) -> list:
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        # Operators test the elements themselves, like {"$gte": 5}
+        matches = Query({"value": condition})
+        return [value for value in array if not matches({"value": value})]
+    if isinstance(condition, dict):
+        # Documents matching the condition as a query
+        matches = Query(condition)
+        return [
+            value for value in array if not (isinstance(value, dict) and matches(value))
+        ]
+    return [value for value in array if value != condition]
+
+
+_ARRAY_OPERATORS: dict[str, Callable[[list, Any], list]] = {
+    "$push": _push,
+    "$addToSet": _add_to_set,
+    "$pull": _pull,
+}
@@ -1,44 +1,60 @@
 import shutil
 from pathlib import Path
 
+from redb.interface.configs import JSONConfig
 from redb.interface.database import Database
 
+from .catalog import FolderCatalog
 from .collection import JSONCollection
 
 
 class JSONDatabase(Database):
-    def __init__(self, database_path: Path) -> None:
+    def __init__(
+        self, database_path: Path, config: JSONConfig | dict | None = None
+    ) -> None:
         self.__database_folder_path = database_path
+        self.__config = config
+        self.__folders = FolderCatalog(database_path)
+        # Handles are reused so that resolving a collection is a dict lookup
+        self.__collections: dict[str, JSONCollection] = {}
 
     def _get_driver_database(self) -> "JSONDatabase":
         return self
 
     def get_collections(self) -> list[JSONCollection]:
-        return [
-            JSONCollection(folder)
-            for folder in self.__database_folder_path.glob("*")
-            if folder.is_dir()
-        ]
+        names = self.__folders.names()
+        for name in self.__collections.keys() - set(names):
+            self.__collections.pop(name, None)
+        return [self[name] for name in names]
 
     def get_collection(self, name: str) -> JSONCollection:
-        for folder in self.__database_folder_path.glob("*"):
-            if folder.is_dir() and folder.name == name:
-                return JSONCollection(folder)
+        # Checked against the folder listing, refreshed when its mtime changes,
+        # so a collection deleted from outside is not served from the cache
+        if name in self.__folders:
+            return self[name]
 
-        raise ValueError(f"Database {name} not found")
+        self.__collections.pop(name, None)
+        raise ValueError(f"Collection {name} not found")
 
     def create_collection(self, name: str) -> None:
         (self.__database_folder_path / name).mkdir(exist_ok=True)
 
     def delete_collection(self, name: str) -> None:
-        shutil.rmtree(self.get_collection(name).__class__.__name__)
+        self.__collections.pop(name, None)
+        shutil.rmtree(self.__database_folder_path / name)
 
     @property
     def name(self) -> str:
         return self.__database_folder_path.name
 
-    def __getitem__(self, name: str) -> "JSONDatabase":
-        return JSONCollection(self.__database_folder_path / name)
+    def __getitem__(self, name: str) -> JSONCollection:
+        collection = self.__collections.get(name)
+        if collection is None:
+            collection = JSONCollection(
+                self.__database_folder_path / name, self.__config
+            )
+            self.__collections[name] = collection
+        return collection
 
     def __truediv__(self, other: Path):
         return self.__database_folder_path / other
@@ -0,0 +1,598 @@
+import itertools
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+
+from pymongo.errors import DuplicateKeyError
+
+from redb.interface.fields import CompoundIndex, Direction
+
+from .catalog import METADATA_FOLDER
+from .locks import get_locks
+from .storage import Storage
+
+if TYPE_CHECKING:
+    from .query import Query
+
+INDEXES_FOLDER = "indexes"
+INDEX_SUFFIX = ".idx"
+
+_COMPACTION_MIN_ENTRIES = 1024
+
+Loader = Callable[[str], dict | None]
+
+
+def build_index_name(index: CompoundIndex) -> str:
+    if index.name is not None:
+        return index.name
+
+    name = "_".join([field.join_attrs("_") for field in index.fields])
+    name = f"unique_{name}" if index.unique else name
+    return f"{index.direction.name.lower()}_{name}_index"
+
+
+class FieldIndex:
+    """
+    Secondary index over one or more (possibly dotted) document paths.
+
+    Maps each key to the ids holding it, and each id back to its keys so
+    entries can be dropped without re-reading the document. Array values
+    produce one key per element, like Mongo multikey indexes. `sorted`
+    indexes additionally keep their keys ordered for range scans.
+
+    The index is persisted as an append-only log under `.redb/indexes`,
+    which every process tails to pick up the changes of the others.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        name: str,
+        fields: list[str],
+        unique: bool = False,
+        kind: str = "sorted",
+    ) -> None:
+        self.name = name
+        self.fields = fields
+        self.unique = unique
+        self.kind = kind
+        self.__log_path = log_path
+        self.__entries: dict[str, dict[str, None]] = {}
+        self.__keys_by_id: dict[str, list[str]] = {}
+        self.__sorted_keys: list[tuple] | None = None
+        self.__log_inode: int | None = None
+        self.__log_offset = 0
+        self.__log_entries = 0
+        self.__lock = threading.RLock()
+
+    @classmethod
+    def from_log(cls, log_path: Path) -> "FieldIndex":
+        with open(log_path, "r") as f:
+            spec = json.loads(f.readline()[1:])
+        index = cls(log_path, **spec)
+        index.sync()
+        return index
+
+    @property
+    def spec(self) -> dict[str, Any]:
+        return dict(
+            name=self.name,
+            fields=self.fields,
+            unique=self.unique,
+            kind=self.kind,
+        )
+
+    def __contains__(self, id: object) -> bool:
+        return str(id) in self.__keys_by_id
+
+    def ids(self) -> set[str]:
+        with self.__lock:
+            return set(self.__keys_by_id)
+
+    def get_keys(self, doc: dict) -> list[str]:
+        values = [_resolve_index_values(doc, field) for field in self.fields]
+        return list(
+            dict.fromkeys(_encode_key(list(key)) for key in itertools.product(*values))
+        )
+
+    def lookup(self, values: list[Any]) -> list[str]:
+        """Ids that may hold `values` (one per field); callers still filter."""
+        key_values = []
+        for value in values:
+            if isinstance(value, list) and value:
+                # Arrays are indexed by element, any of them narrows the search
+                value = value[0]
+            key_values.append(value)
+
+        with self.__lock:
+            return list(self.__entries.get(_encode_key(key_values), {}))
+
+    def ordered_ids(self, reverse: bool = False) -> Iterator[str]:
+        """Ids in key order; documents with array values show up once per key."""
+        with self.__lock:
+            ordered = self.__get_sorted_keys()
+            ids = [
+                id
+                for _, key in (reversed(ordered) if reverse else ordered)
+                for id in self.__entries.get(key, {})
+            ]
+        return iter(ids)
+
+    def range_ids(self, lower: Any = None, upper: Any = None) -> list[str]:
+        """Ids of single field keys in [lower, upper], None meaning unbounded."""
+        with self.__lock:
+            ordered = self.__get_sorted_keys()
+            start = 0
+            end = len(ordered)
+            if lower is not None:
+                start = bisect_left(ordered, (_sort_key([lower]),))
+            if upper is not None:
+                end = bisect_right(ordered, (_sort_key([upper]), "\uffff"))
+            return list(
+                dict.fromkeys(
+                    id for _, key in ordered[start:end] for id in self.__entries[key]
+                )
+            )
+
+    def check_unique(self, doc: dict, id: object = None) -> None:
+        if not self.unique:
+            return
+
+        with self.__lock:
+            for key in self.get_keys(doc):
+                owners = self.__entries.get(key, {})
+                if any(owner != str(id) for owner in owners):
+                    self.__raise_duplicate(key)
+
+    def check_unique_many(
+        self, docs: list[dict], ids: list[object] | None = None
+    ) -> None:
+        """Check a batch against the index and against itself."""
+        if not self.unique:
+            return
+
+        if ids is None:
+            ids = [doc["_id"] for doc in docs]
+        seen: set[str] = set()
+        for doc, id in zip(docs, ids):
+            self.check_unique(doc, id)
+            for key in self.get_keys(doc):
+                if key in seen:
+                    self.__raise_duplicate(key)
+                seen.add(key)
+
+    def put(self, id: object, doc: dict) -> None:
+        self.put_many([doc], ids=[id])
+
+    def put_many(self, docs: list[dict], ids: list[object] | None = None) -> None:
+        if ids is None:
+            ids = [doc["_id"] for doc in docs]
+        entries = [(str(id), self.get_keys(doc)) for id, doc in zip(ids, docs)]
+        if not entries:
+            return
+
+        with self.__lock:
+            for id, keys in entries:
+                self.__apply_put(id, keys)
+            self.__append(
+                "\n".join(f"+{id}\t{json.dumps(keys)}" for id, keys in entries)
+            )
+
+    def remove(self, *ids: object) -> None:
+        with self.__lock:
+            ids_to_remove = [str(id) for id in ids if str(id) in self.__keys_by_id]
+            for id in ids_to_remove:
+                self.__apply_remove(id)
+            if ids_to_remove:
+                self.__append("\n".join(f"-{id}" for id in ids_to_remove))
+
+    def build(self, docs: Iterable[tuple[str, dict]]) -> None:
+        with self.__lock:
+            self.__entries = {}
+            self.__keys_by_id = {}
+            self.__sorted_keys = None
+            for id, doc in docs:
+                self.check_unique(doc, id)
+                self.__apply_put(id, self.get_keys(doc))
+            self.__compact()
+
+    def reconcile(self, ids: Iterable[str], load: Loader) -> None:
+        """Bring the index in line with the ids currently in the collection."""
+        ids = set(ids)
+        with self.__lock:
+            known_ids = set(self.__keys_by_id)
+            self.remove(*(known_ids - ids))
+            for id in ids - known_ids:
+                doc = load(id)
+                if doc is not None:
+                    self.put(id, doc)
+
+    def sync(self) -> bool:
+        """Replay the entries other processes appended to the log."""
+        with self.__lock:
+            try:
+                stat = os.stat(self.__log_path)
+            except FileNotFoundError:
+                # Dropped along with the collection
+                return False
+
+            if stat.st_ino != self.__log_inode:
+                # Compacted (or first read), start over
+                self.__entries = {}
+                self.__keys_by_id = {}
+                self.__sorted_keys = None
+                self.__log_inode = stat.st_ino
+                self.__log_offset = 0
+                self.__log_entries = 0
+
+            if stat.st_size <= self.__log_offset:
+                return True
+
+            with open(self.__log_path, "rb") as f:
+                f.seek(self.__log_offset)
+                data = f.read()
+            # Only consume complete lines, the rest may still be being written
+            data = data[: data.rfind(b"\n") + 1]
+            self.__log_offset += len(data)
+            for line in data.decode().splitlines():
+                self.__log_entries += 1
+                if line.startswith("+"):
+                    id, keys = line[1:].split("\t", 1)
+                    self.__apply_put(id, json.loads(keys))
+                elif line.startswith("-"):
+                    self.__apply_remove(line[1:])
+            return True
+
+    def drop(self) -> None:
+        with self.__lock:
+            self.__log_path.unlink(missing_ok=True)
+            self.__entries = {}
+            self.__keys_by_id = {}
+            self.__sorted_keys = None
+
+    def __raise_duplicate(self, key: str) -> None:
+        key_value = dict(zip(self.fields, json.loads(key)))
+        raise DuplicateKeyError(
+            f"E11000 duplicate key error index: {self.name} dup key: {key_value}",
+            11000,
+            {"keyValue": key_value},
+        )
+
+    def __apply_put(self, id: str, keys: list[str]) -> None:
+        if id in self.__keys_by_id:
+            self.__apply_remove(id)
+        self.__keys_by_id[id] = keys
+        for key in keys:
+            if key not in self.__entries:
+                self.__entries[key] = {}
+                self.__sorted_keys = None
+            self.__entries[key][id] = None
+
+    def __apply_remove(self, id: str) -> None:
+        for key in self.__keys_by_id.pop(id, []):
+            owners = self.__entries.get(key)
+            if owners is None:
+                continue
+            owners.pop(id, None)
+            if not owners:
+                del self.__entries[key]
+                self.__sorted_keys = None
+
+    def __get_sorted_keys(self) -> list[tuple]:
+        if self.__sorted_keys is None:
+            self.__sorted_keys = sorted(
+                (_sort_key(json.loads(key)), key) for key in self.__entries
+            )
+        return self.__sorted_keys
+
+    def __append(self, line: str) -> None:
+        if self.__log_entries > 2 * len(self.__keys_by_id) + _COMPACTION_MIN_ENTRIES:
+            self.__compact()
+            return
+
+        fd = os.open(self.__log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, f"{line}\n".encode())
+        finally:
+            os.close(fd)
+        self.__log_entries += line.count("\n") + 1
+
+    def __compact(self) -> None:
+        self.__log_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"#{json.dumps(self.spec)}"]
+        lines.extend(
+            f"+{id}\t{json.dumps(keys)}" for id, keys in self.__keys_by_id.items()
+        )
+        data = ("\n".join(lines) + "\n").encode()
+        tmp_path = self.__log_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.__log_path)
+
+        stat = os.stat(self.__log_path)
+        self.__log_inode = stat.st_ino
+        self.__log_offset = len(data)
+        self.__log_entries = len(lines)
+
+
+@dataclass
+class IndexScan:
+    """Ids an index narrowed a query down to; they still need filtering."""
+
+    index: FieldIndex
+    ids: list[str]
+    # Fields of the query the index satisfied
+    clauses: list[str]
+
+
+class CollectionIndexes:
+    """Secondary indexes of one JSON collection, shared by all of its handles."""
+
+    def __init__(self, collection_path: Path, storage: Storage) -> None:
+        self.__folder = collection_path / METADATA_FOLDER / INDEXES_FOLDER
+        self.__storage = storage
+        self.__indexes: dict[str, FieldIndex] = {}
+        self.__added: set[str] = set()
+        self.__removed: set[str] = set()
+        self.__reconciled = False
+        self.__lock = threading.RLock()
+        self.__locks = get_locks(collection_path)
+        self.__load()
+        storage.subscribe(self.__on_storage_change)
+
+    def __bool__(self) -> bool:
+        return bool(self.__indexes)
+
+    def __iter__(self) -> Iterator[FieldIndex]:
+        return iter(list(self.__indexes.values()))
+
+    @property
+    def unique(self) -> bool:
+        """Whether writes must check some unique index."""
+        return any(index.unique for index in self.__indexes.values())
+
+    def get(self, name: str) -> FieldIndex | None:
+        return self.__indexes.get(name)
+
+    def create(self, index: CompoundIndex, load: Loader) -> FieldIndex:
+        name = build_index_name(index)
+        fields = [field.join_attrs() for field in index.fields]
+        kind = "hash" if index.direction == Direction.HASHED else "sorted"
+        with self.__locks.collection(), self.__lock:
+            existing = self.__indexes.get(name)
+            if existing is not None and existing.spec == dict(
+                name=name, fields=fields, unique=index.unique, kind=kind
+            ):
+                return existing
+
+            field_index = FieldIndex(
+                self.__folder / f"{name}{INDEX_SUFFIX}",
+                name=name,
+                fields=fields,
+                unique=index.unique,
+                kind=kind,
+            )
+            field_index.build(
+                (id, doc)
+                for id, doc in ((id, load(id)) for id in self.__storage.ids())
+                if doc is not None
+            )
+            if existing is not None:
+                existing.drop()
+            self.__indexes[name] = field_index
+            return field_index
+
+    def sync(self, load: Loader) -> None:
+        """Catch up with changes made by other processes."""
+        with self.__lock:
+            if not self.__indexes:
+                return
+
+            self.__storage.refresh()
+            for name, index in list(self.__indexes.items()):
+                if not index.sync():
+                    del self.__indexes[name]
+
+            if not self.__reconciled:
+                self.__reconciled = True
+                self.__added.clear()
+                self.__removed.clear()
+                ids = self.__storage.ids()
+                for index in self.__indexes.values():
+                    index.reconcile(ids, load)
+                return
+
+            added, self.__added = self.__added, set()
+            removed, self.__removed = self.__removed, set()
+            for index in self.__indexes.values():
+                index.remove(*removed)
+                for id in added:
+                    doc = load(id)
+                    if doc is not None:
+                        index.put(id, doc)
+
+    def choose(self, query: "Query") -> "IndexScan | None":
+        """Pick the index narrowing `query` the most: equality, then $in, then range."""
+        best = None
+        best_rank = (0, 0)
+        for index in self.__indexes.values():
+            field = index.fields[0]
+            if all(field in query.equalities for field in index.fields):
+                rank = (3, len(index.fields))
+            elif len(index.fields) > 1:
+                continue
+            elif field in query.memberships:
+                rank = (2, 1)
+            elif field in query.ranges and index.kind == "sorted":
+                rank = (1, 1)
+            else:
+                continue
+            if rank > best_rank:
+                best, best_rank = index, rank
+
+        if best is None:
+            return None
+
+        field = best.fields[0]
+        if best_rank[0] == 3:
+            ids = best.lookup([query.equalities[field] for field in best.fields])
+        elif best_rank[0] == 2:
+            ids = list(
+                dict.fromkeys(
+                    id
+                    for value in query.memberships[field]
+                    for id in best.lookup([value])
+                )
+            )
+        else:
+            lower, upper = query.ranges[field]
+            ids = best.range_ids(lower=lower)
+            if upper is not None:
+                # Array elements may meet each bound separately, so the two
+                # bounds are scanned apart rather than as one range
+                below = set(best.range_ids(upper=upper))
+                ids = [id for id in ids if id in below]
+        return IndexScan(index=best, ids=ids, clauses=list(best.fields))
+
+    def check_unique(self, doc: dict, id: object = None) -> None:
+        for index in self.__indexes.values():
+            index.check_unique(doc, id)
+
+    def check_unique_many(
+        self, docs: list[dict], ids: list[object] | None = None
+    ) -> None:
+        for index in self.__indexes.values():
+            index.check_unique_many(docs, ids)
+
+    def put(self, id: object, doc: dict) -> None:
+        with self.__updated_indexes() as indexes:
+            for index in indexes:
+                index.put(id, doc)
+
+    def put_many(self, docs: list[dict]) -> None:
+        with self.__updated_indexes() as indexes:
+            for index in indexes:
+                index.put_many(docs)
+
+    def remove(self, *ids: object) -> None:
+        with self.__updated_indexes() as indexes:
+            for index in indexes:
+                index.remove(*ids)
+
+    @contextmanager
+    def __updated_indexes(self) -> Iterator[list[FieldIndex]]:
+        """
+        Indexes caught up with the other processes, which cannot append to
+        (or compact) their logs until we are done.
+        """
+        if not self.__indexes:
+            yield []
+            return
+        with self.__locks.collection():
+            indexes = [index for index in self.__indexes.values() if index.sync()]
+            yield indexes
+
+    def __load(self) -> None:
+        if not self.__folder.is_dir():
+            return
+
+        for log_path in sorted(self.__folder.glob(f"*{INDEX_SUFFIX}")):
+            try:
+                index = FieldIndex.from_log(log_path)
+            except (OSError, ValueError):
+                continue
+            self.__indexes[index.name] = index
+
+    def __on_storage_change(self, added: set[str], removed: set[str]) -> None:
+        with self.__lock:
+            self.__added = (self.__added | added) - removed
+            self.__removed = (self.__removed | removed) - added
+
+
+_indexes: dict[Path, CollectionIndexes] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_indexes(collection_path: Path, storage: Storage) -> CollectionIndexes:
+    key = Path(os.path.abspath(collection_path))
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = CollectionIndexes(key, storage)
+        return _indexes[key]
+
+
+def resolve_path(doc: Any, path: str) -> list[Any]:
+    """Values found at a dotted path, descending into arrays along the way."""
+    values = [doc]
+    for attr in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                if attr.isdigit() and int(attr) < len(value):
+                    next_values.append(value[int(attr)])
+                    continue
+                value_items = value
+            else:
+                value_items = [value]
+            for item in value_items:
+                if isinstance(item, dict) and attr in item:
+                    next_values.append(item[attr])
+        values = next_values
+    return values
+
+
+def _resolve_index_values(doc: dict, path: str) -> list[Any]:
+    values = resolve_path(doc, path)
+    if not values:
+        return [None]
+
+    keys = []
+    for value in values:
+        if isinstance(value, list) and value:
+            keys.extend(value)
+        else:
+            keys.append(value)
+    return keys
+
+
+def is_equality_value(value: Any) -> bool:
+    return not (
+        isinstance(value, dict) and any(str(key).startswith("$") for key in value)
+    )
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def _encode_key(values: list[Any]) -> str:
+    return json.dumps(_normalize(values), sort_keys=True, default=str)
+
+
+# Same relative order Mongo uses when comparing values of different types
+_TYPE_ORDER = {type(None): 0, int: 1, float: 1, str: 2, dict: 3, list: 4, bool: 5}
+
+
+def _sort_key(values: list[Any]) -> tuple:
+    return tuple(sort_value(value) for value in values)
+
+
+def sort_value(value: Any) -> tuple:
+    """Comparable form of `value`, ordering types the way Mongo does."""
+    rank = _TYPE_ORDER.get(type(value), 6)
+    if rank == 0:
+        return (rank, 0)
+    if rank in (1, 2, 5):
+        return (rank, value)
+    return (rank, json.dumps(value, sort_keys=True, default=str))
@@ -0,0 +1,125 @@
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Without fcntl (Windows) the locks only guard the threads of a process
+    fcntl = None  # type: ignore
+
+from .catalog import METADATA_FOLDER
+
+LOCK_FILE = "lock"
+# Documents are locked by stripe, so that a lock file never needs more than
+# this many byte ranges however large the collection grows
+DOCUMENT_STRIPES = 4096
+
+
+class CollectionLocks:
+    """
+    Advisory locks shared by every thread and process writing a collection.
+
+    Each document hashes to one of `DOCUMENT_STRIPES` byte ranges of the
+    `.redb/lock` file, held with fcntl while the document is read, modified
+    and written. Byte 0 is the collection lock, held only for the short
+    changes to the catalog, indexes and segment files. Readers take no lock at all, since
+    documents are published with atomic renames.
+    """
+
+    def __init__(self, collection_path: Path) -> None:
+        self.__path = collection_path / METADATA_FOLDER / LOCK_FILE
+        self.__fd: int | None = None
+        self.__fd_lock = threading.Lock()
+        # fcntl locks belong to the process, so its threads queue up here first
+        self.__stripes = [threading.Lock() for _ in range(DOCUMENT_STRIPES)]
+        self.__collection = threading.RLock()
+        self.__depth = 0
+        self.__held = 0
+
+    @contextmanager
+    def collection(self) -> Iterator[None]:
+        """Reentrant lock over the collection metadata."""
+        with self.__collection:
+            self.__depth += 1
+            try:
+                if self.__depth == 1:
+                    self.__lock_range(0)
+                yield
+            finally:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    self.__unlock_range(0)
+
+    @contextmanager
+    def documents(self, ids: Iterable[Any]) -> Iterator[None]:
+        """Lock the documents with `ids`, waiting for whoever holds them."""
+        # Always taken in the same order, so two writers never deadlock
+        stripes = sorted({_stripe(id) for id in ids})
+        held = []
+        try:
+            for stripe in stripes:
+                self.__stripes[stripe].acquire()
+                held.append(stripe)
+                try:
+                    self.__lock_range(stripe + 1)
+                except BaseException:
+                    self.__stripes[held.pop()].release()
+                    raise
+            yield
+        finally:
+            for stripe in reversed(held):
+                self.__unlock_range(stripe + 1)
+                self.__stripes[stripe].release()
+
+    def __lock_range(self, offset: int) -> None:
+        if fcntl is None:
+            return
+        with self.__fd_lock:
+            fd = self.__get_fd()
+            self.__held += 1
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX, 1, offset)
+        except BaseException:
+            with self.__fd_lock:
+                self.__held -= 1
+            raise
+
+    def __unlock_range(self, offset: int) -> None:
+        if fcntl is None:
+            return
+        with self.__fd_lock:
+            fcntl.lockf(self.__fd, fcntl.LOCK_UN, 1, offset)
+            self.__held -= 1
+
+    def __get_fd(self) -> int:
+        # Kept open while any lock is held: closing a descriptor of the file
+        # drops every fcntl lock the process holds on it
+        if self.__fd is not None and not self.__held:
+            if os.fstat(self.__fd).st_nlink == 0:
+                # The collection was deleted, follow the file now in its place
+                os.close(self.__fd)
+                self.__fd = None
+        if self.__fd is None:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            self.__fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self.__fd
+
+
+def _stripe(id: Any) -> int:
+    return zlib.crc32(str(id).encode()) % DOCUMENT_STRIPES
+
+
+_locks: dict[Path, CollectionLocks] = {}
+_locks_lock = threading.Lock()
+
+
+def get_locks(collection_path: Path) -> CollectionLocks:
+    key = Path(os.path.abspath(collection_path))
+    with _locks_lock:
+        if key not in _locks:
+            _locks[key] = CollectionLocks(key)
+        return _locks[key]
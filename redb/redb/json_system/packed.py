@@ -0,0 +1,170 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any
+
+from redb.core.serializers import Serializer, get_serializer
+from redb.interface.errors import UnsupportedOperation
+
+from .catalog import Listener
+from .storage import FileStorage, Storage
+
+PACK_FILE = "documents.pack"
+PACK_MAGIC = b"REDBPACK"
+PACK_VERSION = 1
+
+# magic, version, document count, offset of the entry table
+_HEADER = struct.Struct("<8sIQQ")
+# id offset, id length, document offset, document length
+_ENTRY = struct.Struct("<QIQI")
+
+
+class PackedStorage(Storage):
+    """
+    Read-only snapshot of a JSON collection packed into a single file.
+
+    The file holds the serialized documents back to back, then their ids,
+    then a table of fixed-size entries sorted by id that points into both.
+    It is memory-mapped on open, which reads nothing but the header, and
+    documents are found with a binary search over the table.
+    """
+
+    def __init__(
+        self,
+        collection_path: Path,
+        serializer: Serializer | None = None,
+    ) -> None:
+        self.__path = collection_path / PACK_FILE
+        self.__serializer = serializer or get_serializer()
+        with open(self.__path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.__count, self.__table = _HEADER.unpack_from(self.__map)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.__map.close()
+            raise ValueError(f"{self.__path} is not a packed collection")
+        self.__ids: list[str] | None = None
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    def ids(self) -> list[str]:
+        # Decoded on first use, the snapshot never changes afterwards
+        if self.__ids is None:
+            self.__ids = [
+                self.__entry_id(self.__entry(i)).decode() for i in range(self.__count)
+            ]
+        return self.__ids
+
+    def refresh(self) -> None:
+        pass
+
+    def subscribe(self, listener: Listener) -> None:
+        pass
+
+    def exists(self, id: Any) -> bool:
+        return self.__find(id) is not None
+
+    def read(self, id: Any) -> dict | None:
+        data = self.read_raw(id)
+        if data is None:
+            return None
+        return self.__serializer.loads(data)
+
+    def read_raw(self, id: Any) -> bytes | None:
+        entry = self.__find(id)
+        if entry is None:
+            return None
+        _, _, offset, length = entry
+        return self.__map[offset : offset + length]
+
+    def write(self, docs: list[dict]) -> None:
+        raise UnsupportedOperation(f"{self.__path} is a read-only snapshot")
+
+    def delete(self, ids: list[Any]) -> None:
+        raise UnsupportedOperation(f"{self.__path} is a read-only snapshot")
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def close(self) -> None:
+        self.__map.close()
+
+    def __find(self, id: Any) -> tuple[int, int, int, int] | None:
+        key = str(id).encode()
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self.__entry(middle)
+            current = self.__entry_id(entry)
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return entry
+        return None
+
+    def __entry(self, i: int) -> tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self.__map, self.__table + i * _ENTRY.size)
+
+    def __entry_id(self, entry: tuple[int, int, int, int]) -> bytes:
+        offset, length, _, _ = entry
+        return self.__map[offset : offset + length]
+
+
+def pack_collection(
+    collection_path: Path,
+    destination: Path | None = None,
+    storage: Storage | None = None,
+    serializer: Serializer | None = None,
+) -> int:
+    """
+    Pack the documents of a collection into `destination/documents.pack`
+    (the collection folder by default), returning how many were packed.
+
+    The snapshot is written to a temporary file and renamed into place, so
+    replicas opening it never see it half written.
+    """
+    serializer = serializer or get_serializer()
+    storage = storage or FileStorage(collection_path, serializer)
+    destination = destination or collection_path
+    destination.mkdir(parents=True, exist_ok=True)
+
+    ids = sorted(str(id).encode() for id in storage.ids())
+    path = destination / PACK_FILE
+    tmp_path = destination / f".{PACK_FILE}.{os.getpid()}.tmp"
+    entries = []
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            offset = _HEADER.size
+            for id in ids:
+                doc = storage.read(id.decode())
+                if doc is None:
+                    # Removed while packing
+                    continue
+                data = serializer.dumps(doc)
+                f.write(data)
+                entries.append([id, 0, offset, len(data)])
+                offset += len(data)
+
+            for entry in entries:
+                f.write(entry[0])
+                entry[1] = offset
+                offset += len(entry[0])
+
+            table = offset
+            for id, id_offset, doc_offset, doc_length in entries:
+                f.write(_ENTRY.pack(id_offset, len(id), doc_offset, doc_length))
+
+            f.seek(0)
+            f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries), table))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(entries)
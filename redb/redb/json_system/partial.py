@@ -0,0 +1,116 @@
+import re
+from typing import Any, Callable, Collection
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+_STRUCTURE = (b'"', b"[", b"]", b"{", b"}")
+
+
+def extract_fields(
+    data: bytes,
+    keys: Collection[str],
+    loads: Callable[[bytes], Any],
+) -> dict[str, Any]:
+    """
+    Decode only the top-level `keys` of the JSON object in `data`.
+
+    Every other value is skipped over without being decoded, which spares
+    building large strings and arrays nobody asked for. Raises ValueError if
+    `data` is not a well-formed JSON object.
+    """
+    scanner = _Scanner(data)
+    out: dict[str, Any] = {}
+    remaining = set(keys)
+    pos = scanner.skip_whitespace(0)
+    scanner.expect(pos, b"{")
+    pos = scanner.skip_whitespace(pos + 1)
+    if data[pos : pos + 1] == b"}":
+        return out
+
+    while remaining:
+        scanner.expect(pos, b'"')
+        end = scanner.skip_string(pos)
+        key = loads(data[pos:end])
+        pos = scanner.skip_whitespace(end)
+        scanner.expect(pos, b":")
+        pos = scanner.skip_whitespace(pos + 1)
+
+        end = scanner.skip_value(pos)
+        if key in remaining:
+            out[key] = loads(data[pos:end])
+            remaining.discard(key)
+
+        pos = scanner.skip_whitespace(end)
+        if data[pos : pos + 1] == b"}":
+            break
+        scanner.expect(pos, b",")
+        pos = scanner.skip_whitespace(pos + 1)
+
+    return out
+
+
+class _Scanner:
+    """Skips JSON values by jumping between structural characters."""
+
+    def __init__(self, data: bytes) -> None:
+        self.__data = data
+        # Next known position of each structural character, -1 once exhausted
+        self.__next: dict[bytes, int] = {}
+
+    def find(self, char: bytes, pos: int) -> int:
+        # bytes.find is a memchr, far faster than any regex over long values
+        found = self.__next.get(char)
+        if found is None or (found != -1 and found < pos):
+            found = self.__data.find(char, pos)
+            self.__next[char] = found
+        return found
+
+    def skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self.__data, pos).end()  # type: ignore
+
+    def expect(self, pos: int, char: bytes) -> None:
+        if self.__data[pos : pos + 1] != char:
+            raise ValueError(f"Expected {char.decode()!r} at position {pos}")
+
+    def skip_string(self, pos: int) -> int:
+        end = pos + 1
+        while True:
+            end = self.find(b'"', end)
+            if end == -1:
+                raise ValueError(f"Unterminated string at position {pos}")
+            backslashes = 0
+            while self.__data[end - 1 - backslashes] == 0x5C:
+                backslashes += 1
+            end += 1
+            if backslashes % 2 == 0:
+                return end
+
+    def skip_value(self, pos: int) -> int:
+        char = self.__data[pos : pos + 1]
+        if char == b'"':
+            return self.skip_string(pos)
+
+        if char not in (b"[", b"{"):
+            match = _SCALAR_END.search(self.__data, pos)
+            end = match.start() if match else len(self.__data)
+            if end == pos:
+                raise ValueError(f"Expected a value at position {pos}")
+            return end
+
+        depth = 0
+        while True:
+            positions = [self.find(char, pos) for char in _STRUCTURE]
+            found = [position for position in positions if position != -1]
+            if not found:
+                raise ValueError("Unterminated array or object")
+
+            pos = min(found)
+            char = self.__data[pos : pos + 1]
+            if char == b'"':
+                pos = self.skip_string(pos)
+                continue
+
+            depth += 1 if char in (b"[", b"{") else -1
+            pos += 1
+            if depth == 0:
+                return pos
@@ -0,0 +1,346 @@
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+from redb.interface.errors import UnsupportedOperation
+
+from .indexes import resolve_path, sort_value
+
+Predicate = Callable[[Any], bool]
+# Builds a predicate once handed the filter's values, in the order `_shape` met them
+Binder = Callable[[Iterator[Any]], Predicate]
+
+_LOGICAL = ("$and", "$or", "$nor")
+_COMPARISONS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+
+class Query:
+    """
+    A Mongo filter compiled into a predicate over documents.
+
+    Filters with the same shape, i.e. the same fields and operators whatever
+    their values, share one compiled predicate.
+    """
+
+    def __init__(self, filter: dict | None) -> None:
+        filter = filter or {}
+        params: list[Any] = []
+        shape = _shape(filter, params)
+        self.__predicate = _compile(shape)(iter(params))
+        self.__keys = _top_level_keys(shape)
+        self.__clauses = _indexable_clauses(filter)
+
+    def __call__(self, doc: dict) -> bool:
+        return self.__predicate(doc)
+
+    @property
+    def keys(self) -> set[str]:
+        """Top-level fields the filter reads."""
+        return self.__keys
+
+    @property
+    def equalities(self) -> dict[str, Any]:
+        """Fields the filter requires to equal a value."""
+        return self.__clauses["$eq"]
+
+    @property
+    def memberships(self) -> dict[str, list[Any]]:
+        """Fields the filter requires to equal one of several values."""
+        return self.__clauses["$in"]
+
+    @property
+    def ranges(self) -> dict[str, tuple[Any, Any]]:
+        """Inclusive (lower, upper) bounds the filter puts on fields, None if open."""
+        return self.__clauses["range"]
+
+
+def _shape(filter: dict, params: list[Any]) -> tuple:
+    """Hashable outline of `filter`, moving its values into `params`."""
+    clauses = []
+    for key, value in filter.items():
+        if key in _LOGICAL:
+            clauses.append((key, tuple(_shape(sub, params) for sub in value)))
+        elif key.startswith("$"):
+            raise UnsupportedOperation(f"Query operator {key} is not supported")
+        elif _is_operator_dict(value):
+            clauses.append((key, _operators_shape(value, params)))
+        else:
+            params.append(value)
+            clauses.append((key, (("$eq",),)))
+    return tuple(clauses)
+
+
+def _operators_shape(operators: dict, params: list[Any]) -> tuple:
+    shape = []
+    for op, operand in operators.items():
+        if op == "$options":
+            continue
+        if op == "$regex":
+            params.append((operand, operators.get("$options", "")))
+            shape.append((op,))
+        elif op == "$not":
+            if not _is_operator_dict(operand):
+                raise UnsupportedOperation("$not only supports operator expressions")
+            shape.append((op, _operators_shape(operand, params)))
+        elif op == "$elemMatch":
+            if _is_operator_dict(operand):
+                shape.append((op, "$value", _operators_shape(operand, params)))
+            else:
+                shape.append((op, "$doc", _shape(operand, params)))
+        else:
+            params.append(operand)
+            shape.append((op,))
+    return tuple(shape)
+
+
+@lru_cache(maxsize=1024)
+def _compile(shape: tuple) -> Binder:
+    clauses = []
+    for key, spec in shape:
+        if key in _LOGICAL:
+            clauses.append(_compile_logical(key, [_compile(sub) for sub in spec]))
+        else:
+            clauses.append(_compile_field(key, _compile_operators(spec)))
+
+    def bind(params: Iterator[Any]) -> Predicate:
+        predicates = [clause(params) for clause in clauses]
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda doc: all(predicate(doc) for predicate in predicates)
+
+    return bind
+
+
+def _compile_logical(op: str, binders: list[Binder]) -> Binder:
+    def bind(params: Iterator[Any]) -> Predicate:
+        predicates = [binder(params) for binder in binders]
+        if op == "$and":
+            return lambda doc: all(predicate(doc) for predicate in predicates)
+        if op == "$or":
+            return lambda doc: any(predicate(doc) for predicate in predicates)
+        return lambda doc: not any(predicate(doc) for predicate in predicates)
+
+    return bind
+
+
+def _compile_field(key: str, binder: Binder) -> Binder:
+    """Applies an operators predicate to the values found at `key`."""
+    if "." in key:
+
+        def values(doc: Any) -> list[Any]:
+            return resolve_path(doc, key)
+
+    else:
+
+        def values(doc: Any) -> list[Any]:
+            if isinstance(doc, dict) and key in doc:
+                return [doc[key]]
+            return []
+
+    def bind(params: Iterator[Any]) -> Predicate:
+        predicate = binder(params)
+        return lambda doc: predicate(values(doc))
+
+    return bind
+
+
+def _compile_operators(shape: tuple) -> Binder:
+    """Predicate over the list of values a field resolved to."""
+    binders = [_compile_operator(op, spec) for op, *spec in shape]
+
+    def bind(params: Iterator[Any]) -> Predicate:
+        predicates = [binder(params) for binder in binders]
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda values: all(predicate(values) for predicate in predicates)
+
+    return bind
+
+
+def _compile_operator(op: str, spec: list) -> Binder:
+    if op == "$not":
+        binder = _compile_operators(spec[0])
+        return lambda params: _negate(binder(params))
+
+    if op == "$elemMatch":
+        kind, sub_shape = spec
+        if kind == "$doc":
+            return _elem_match(_compile(sub_shape), wrap=False)
+        return _elem_match(_compile_operators(sub_shape), wrap=True)
+
+    build = _OPERATORS.get(op)
+    if build is None:
+        raise UnsupportedOperation(f"Query operator {op} is not supported")
+    return lambda params: build(next(params))
+
+
+def _negate(predicate: Predicate) -> Predicate:
+    return lambda values: not predicate(values)
+
+
+def _elem_match(binder: Binder, wrap: bool) -> Binder:
+    def bind(params: Iterator[Any]) -> Predicate:
+        predicate = binder(params)
+
+        def matches(values: list[Any]) -> bool:
+            for value in values:
+                if isinstance(value, list):
+                    for item in value:
+                        # Operators apply to the element itself, not its contents
+                        if predicate([item] if wrap else item):
+                            return True
+            return False
+
+        return matches
+
+    return bind
+
+
+def _candidates(values: list[Any]) -> Iterator[Any]:
+    """Values an operator compares against: each value and each array element."""
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _equals(a: Any, b: Any) -> bool:
+    # True == 1 in Python, but not in Mongo
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def _eq(operand: Any) -> Predicate:
+    if operand is None:
+        return lambda values: not values or any(
+            value is None for value in _candidates(values)
+        )
+    return lambda values: any(_equals(value, operand) for value in _candidates(values))
+
+
+def _ne(operand: Any) -> Predicate:
+    return _negate(_eq(operand))
+
+
+def _in(operand: list[Any]) -> Predicate:
+    if any(item is None for item in operand):
+        predicates = [_eq(item) for item in operand]
+        return lambda values: any(predicate(values) for predicate in predicates)
+
+    if all(isinstance(item, str) for item in operand):
+        members = frozenset(operand)
+        return lambda values: any(
+            isinstance(value, str) and value in members for value in _candidates(values)
+        )
+
+    return lambda values: any(
+        _equals(value, item) for value in _candidates(values) for item in operand
+    )
+
+
+def _nin(operand: list[Any]) -> Predicate:
+    return _negate(_in(operand))
+
+
+def _all(operand: list[Any]) -> Predicate:
+    predicates = [_eq(item) for item in operand]
+    return lambda values: bool(predicates) and all(
+        predicate(values) for predicate in predicates
+    )
+
+
+def _comparison(compare: Callable[[Any, Any], bool]) -> Callable[[Any], Predicate]:
+    def build(operand: Any) -> Predicate:
+        key = sort_value(operand)
+
+        def matches(values: list[Any]) -> bool:
+            for value in _candidates(values):
+                value_key = sort_value(value)
+                # Like Mongo, only values of the same type are compared
+                if value_key[0] == key[0] and compare(value_key, key):
+                    return True
+            return False
+
+        return matches
+
+    return build
+
+
+def _exists(operand: Any) -> Predicate:
+    expected = bool(operand)
+    return lambda values: bool(values) == expected
+
+
+def _regex(operand: tuple[str, str]) -> Predicate:
+    pattern, options = operand
+    flags = 0
+    for option in options:
+        flags |= {"i": re.I, "m": re.M, "s": re.S, "x": re.X}.get(option, 0)
+    regex = re.compile(pattern, flags)
+    return lambda values: any(
+        isinstance(value, str) and regex.search(value) is not None
+        for value in _candidates(values)
+    )
+
+
+def _size(operand: int) -> Predicate:
+    return lambda values: any(
+        isinstance(value, list) and len(value) == operand for value in values
+    )
+
+
+_OPERATORS: dict[str, Callable[[Any], Predicate]] = {
+    "$eq": _eq,
+    "$ne": _ne,
+    "$in": _in,
+    "$nin": _nin,
+    "$all": _all,
+    "$exists": _exists,
+    "$regex": _regex,
+    "$size": _size,
+    **{op: _comparison(compare) for op, compare in _COMPARISONS.items()},
+}
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, dict) and any(str(key).startswith("$") for key in value)
+
+
+def _top_level_keys(shape: tuple) -> set[str]:
+    keys = set()
+    for key, spec in shape:
+        if key in _LOGICAL:
+            for sub in spec:
+                keys |= _top_level_keys(sub)
+        else:
+            keys.add(key.split(".")[0])
+    return keys
+
+
+def _indexable_clauses(filter: dict) -> dict[str, dict]:
+    """Clauses of `filter` every matching document satisfies, by kind."""
+    clauses: dict[str, dict] = {"$eq": {}, "$in": {}, "range": {}}
+    for key, value in filter.items():
+        if key == "$and":
+            for sub in value:
+                for kind, found in _indexable_clauses(sub).items():
+                    clauses[kind].update(found)
+        elif key.startswith("$"):
+            continue
+        elif not _is_operator_dict(value):
+            clauses["$eq"][key] = value
+        elif "$eq" in value:
+            clauses["$eq"][key] = value["$eq"]
+        elif isinstance(value.get("$in"), list):
+            clauses["$in"][key] = value["$in"]
+        else:
+            lower = value.get("$gte", value.get("$gt"))
+            upper = value.get("$lte", value.get("$lt"))
+            if lower is not None or upper is not None:
+                clauses["range"][key] = (lower, upper)
+    return clauses
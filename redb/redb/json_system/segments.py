@@ -0,0 +1,487 @@
+import itertools
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from redb.core.serializers import Serializer, get_serializer
+
+from .catalog import Listener
+from .locks import get_locks
+from .storage import TMP_SUFFIX, Storage, _is_writer_alive
+
+SEGMENTS_FOLDER = "segments"
+SEGMENT_SUFFIX = ".jsonl"
+HINT_SUFFIX = ".hint"
+COMPACTING_SUFFIX = ".compacting"
+TOMBSTONE_KEY = "$deleted"
+
+PUT = "+"
+DELETE = "-"
+
+
+@dataclass
+class _Segment:
+    number: int
+    path: Path
+    inode: int
+    consumed: int = 0
+    garbage: int = 0
+    # (kind, offset, length, id) of every record, kept until a hint is written
+    records: list[tuple[str, int, int, str]] | None = field(default_factory=list)
+    fd: int | None = None
+
+    @property
+    def hint_path(self) -> Path:
+        return self.path.with_suffix(HINT_SUFFIX)
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class SegmentStorage(Storage):
+    """
+    Log-structured layout of a JSON collection.
+
+    Documents are appended as JSON lines to numbered segment files under
+    `segments/`, and an in-memory offset index maps each id to its latest
+    record. Updates append a new version and deletes append a tombstone, so
+    every write is a single sequential append. Once the active segment grows
+    past `max_segment_bytes` it is sealed next to a hint file (its offset
+    index) so loading it later does not require parsing it. A background
+    compactor merges the sealed segments, dropping overwritten versions and
+    tombstones, whenever they hold too much garbage.
+    """
+
+    def __init__(
+        self,
+        collection_path: Path,
+        serializer: Serializer | None = None,
+        fsync: bool = False,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compaction_interval: float | None = 60.0,
+        compaction_garbage_ratio: float = 0.5,
+    ) -> None:
+        self.__folder = collection_path / SEGMENTS_FOLDER
+        self.__locks = get_locks(collection_path)
+        self.__serializer = serializer or get_serializer()
+        self.__fsync = fsync
+        self.__max_segment_bytes = max_segment_bytes
+        self.__compaction_interval = compaction_interval
+        self.__compaction_garbage_ratio = compaction_garbage_ratio
+        self.__offsets: dict[str, tuple[int, int, int]] = {}
+        self.__tombstones: dict[str, tuple[int, int]] = {}
+        self.__segments: dict[int, _Segment] = {}
+        self.__listeners: list[Listener] = []
+        self.__lock = threading.RLock()
+        self.__compactor: threading.Thread | None = None
+        self.__stop_compactor = threading.Event()
+
+    def ids(self) -> list[str]:
+        with self.__lock:
+            self.__refresh()
+            return list(self.__offsets)
+
+    def refresh(self) -> None:
+        with self.__lock:
+            self.__refresh()
+
+    def subscribe(self, listener: Listener) -> None:
+        self.__listeners.append(listener)
+
+    def exists(self, id: Any) -> bool:
+        with self.__lock:
+            self.__refresh()
+            return str(id) in self.__offsets
+
+    def exists_many(self, ids: list[Any]) -> list[Any]:
+        with self.__lock:
+            self.__refresh()
+            return [id for id in ids if str(id) in self.__offsets]
+
+    def read(self, id: Any) -> dict | None:
+        data = self.read_raw(id)
+        if data is None:
+            return None
+        return self.__serializer.loads(data)
+
+    def read_raw(self, id: Any) -> bytes | None:
+        id = str(id)
+        with self.__lock:
+            for attempt in range(2):
+                if id not in self.__offsets:
+                    return None
+                number, offset, length = self.__offsets[id]
+                try:
+                    data = self.__pread(number, offset, length)
+                except OSError:
+                    data = b""
+                if len(data) == length:
+                    return data
+                # Compacted by another process, reload and retry once
+                self.__refresh()
+        return None
+
+    def write(self, docs: list[dict]) -> None:
+        records = [
+            (PUT, str(doc["_id"]), self.__serializer.dumps(doc) + b"\n") for doc in docs
+        ]
+        self.__append(records)
+
+    def delete(self, ids: list[Any]) -> None:
+        dumps = self.__serializer.dumps
+        records = [
+            (DELETE, str(id), dumps({TOMBSTONE_KEY: str(id)}) + b"\n") for id in ids
+        ]
+        self.__append(records)
+
+    def __len__(self) -> int:
+        with self.__lock:
+            self.__refresh()
+            return len(self.__offsets)
+
+    def compact(self, force: bool = False) -> bool:
+        """Merge all sealed segments into one holding only live documents."""
+        # Other processes compact the same segments, one at a time
+        with self.__locks.collection(), self.__lock:
+            self.__remove_abandoned_files()
+            self.__refresh()
+            numbers = sorted(self.__segments)
+            sealed = numbers[:-1]
+            if not sealed:
+                return False
+
+            total = sum(self.__segments[number].consumed for number in sealed)
+            garbage = sum(self.__segments[number].garbage for number in sealed)
+            if not total or (
+                not force and garbage / total < self.__compaction_garbage_ratio
+            ):
+                return False
+
+            sealed_set = set(sealed)
+            live = sorted(
+                (position, id)
+                for id, position in self.__offsets.items()
+                if position[0] in sealed_set
+            )
+
+            target = self.__segments[sealed[-1]]
+            tmp_path = _tmp_path(target.path, COMPACTING_SUFFIX)
+            records = []
+            with open(tmp_path, "wb") as f:
+                for (number, offset, length), id in live:
+                    records.append((PUT, f.tell(), length, id))
+                    f.write(self.__pread(number, offset, length))
+                f.flush()
+                os.fsync(f.fileno())
+                stat = os.fstat(f.fileno())
+
+            compacted = _Segment(
+                number=target.number,
+                path=target.path,
+                inode=stat.st_ino,
+                consumed=stat.st_size,
+                records=records,
+            )
+            hint_tmp_path = _write_hint(
+                compacted, _tmp_path(compacted.hint_path, TMP_SUFFIX)
+            )
+            os.replace(tmp_path, target.path)
+            os.replace(hint_tmp_path, compacted.hint_path)
+            compacted.records = None
+
+            for number in sealed:
+                segment = self.__segments.pop(number)
+                segment.close()
+                if number != target.number:
+                    segment.path.unlink(missing_ok=True)
+                    segment.hint_path.unlink(missing_ok=True)
+            self.__segments[target.number] = compacted
+
+            for _, offset, length, id in records:
+                self.__offsets[id] = (target.number, offset, length)
+            # Nothing older than the compacted segment is left to shadow
+            self.__tombstones = {
+                id: position
+                for id, position in self.__tombstones.items()
+                if position[0] not in sealed_set
+            }
+            return True
+
+    def close(self) -> None:
+        self.__stop_compactor.set()
+        with self.__lock:
+            for segment in self.__segments.values():
+                segment.close()
+
+    def __refresh(self) -> None:
+        """Load segments (or parts of them) appended by other processes."""
+        numbers = _list_segments(self.__folder)
+        changes: dict[str, bool] = {}
+        for number in list(self.__segments):
+            if number not in numbers:
+                self.__drop_segment(number, changes)
+
+        for number in numbers:
+            path = self.__folder / f"{number:06d}{SEGMENT_SUFFIX}"
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
+            segment = self.__segments.get(number)
+            if segment is None or segment.inode != stat.st_ino:
+                if segment is not None:
+                    # Rewritten by a compaction
+                    self.__drop_segment(number, changes)
+                segment = _Segment(number=number, path=path, inode=stat.st_ino)
+                self.__segments[number] = segment
+                self.__load_hint(segment, changes)
+
+            if stat.st_size > segment.consumed:
+                self.__scan(segment, changes)
+
+        self.__notify(changes)
+
+    def __drop_segment(self, number: int, changes: dict[str, bool]) -> None:
+        segment = self.__segments.pop(number)
+        segment.close()
+        for id, position in list(self.__offsets.items()):
+            if position[0] == number:
+                changes.setdefault(id, True)
+                del self.__offsets[id]
+        for id, position in list(self.__tombstones.items()):
+            if position[0] == number:
+                del self.__tombstones[id]
+
+    def __load_hint(self, segment: _Segment, changes: dict[str, bool]) -> None:
+        try:
+            with open(segment.hint_path, "r") as f:
+                header = f.readline()
+                inode, size = [int(value) for value in header[1:].split()]
+                if inode != segment.inode:
+                    return
+                lines = f.read().splitlines()
+        except (OSError, ValueError):
+            return
+
+        for line in lines:
+            kind, offset, length, id = line.split("\t", 3)
+            self.__apply(segment, kind, int(offset), int(length), id, changes)
+        segment.consumed = size
+        segment.records = None
+
+    def __scan(self, segment: _Segment, changes: dict[str, bool]) -> None:
+        with open(segment.path, "rb") as f:
+            f.seek(segment.consumed)
+            data = f.read()
+
+        offset = segment.consumed
+        # Only consume complete lines, the rest may still be being written
+        for line in data[: data.rfind(b"\n") + 1].splitlines(keepends=True):
+            try:
+                record = self.__serializer.loads(line)
+            except ValueError:
+                # Torn by a crash mid-append
+                segment.garbage += len(line)
+                offset += len(line)
+                continue
+            if TOMBSTONE_KEY in record:
+                kind, id = DELETE, str(record[TOMBSTONE_KEY])
+            else:
+                kind, id = PUT, str(record["_id"])
+            self.__apply(segment, kind, offset, len(line), id, changes)
+            offset += len(line)
+        segment.consumed = offset
+
+    def __apply(
+        self,
+        segment: _Segment,
+        kind: str,
+        offset: int,
+        length: int,
+        id: str,
+        changes: dict[str, bool],
+    ) -> None:
+        if segment.records is not None:
+            segment.records.append((kind, offset, length, id))
+
+        position = (segment.number, offset)
+        current = self.__offsets.get(id)
+        shadowing = current[:2] if current else self.__tombstones.get(id)
+        if shadowing is not None and shadowing >= position:
+            # An older version read after a newer one
+            segment.garbage += length
+            return
+
+        changes.setdefault(id, current is not None)
+        if current is not None and current[0] in self.__segments:
+            self.__segments[current[0]].garbage += current[2]
+
+        if kind == DELETE:
+            self.__offsets.pop(id, None)
+            self.__tombstones[id] = position
+            segment.garbage += length
+        else:
+            self.__offsets[id] = (segment.number, offset, length)
+            self.__tombstones.pop(id, None)
+
+    def __append(self, records: list[tuple[str, str, bytes]]) -> None:
+        if not records:
+            return
+
+        # Compactions rewrite sealed segments under the collection lock, an
+        # append must not pick its segment and write it meanwhile
+        with self.__locks.collection(), self.__lock:
+            self.__refresh()
+            segment = self.__get_active_segment()
+            data = b"".join(line for _, _, line in records)
+            fd = os.open(segment.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                if os.fstat(fd).st_size > segment.consumed:
+                    # Close a line torn by a crashed writer, or it would swallow
+                    # the first record of this batch
+                    data = b"\n" + data
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+                if self.__fsync:
+                    os.fsync(fd)
+                end = os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+
+            start = end - len(data)
+            if segment.consumed != start:
+                # Someone else appended in between, read it all in order
+                self.__refresh()
+            else:
+                changes: dict[str, bool] = {}
+                offset = start
+                for kind, id, line in records:
+                    self.__apply(segment, kind, offset, len(line), id, changes)
+                    offset += len(line)
+                segment.consumed = end
+
+        self.__start_compactor()
+
+    def __get_active_segment(self) -> _Segment:
+        self.__folder.mkdir(parents=True, exist_ok=True)
+        if self.__segments:
+            segment = self.__segments[max(self.__segments)]
+            if segment.consumed < self.__max_segment_bytes:
+                return segment
+            self.__seal(segment)
+            number = segment.number + 1
+        else:
+            number = 1
+
+        path = self.__folder / f"{number:06d}{SEGMENT_SUFFIX}"
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+        try:
+            stat = os.fstat(fd)
+        finally:
+            os.close(fd)
+        segment = _Segment(number=number, path=path, inode=stat.st_ino)
+        self.__segments[number] = segment
+        if stat.st_size:
+            # Created by another process first
+            self.__scan(segment, {})
+        return segment
+
+    def __seal(self, segment: _Segment) -> None:
+        if segment.records is None:
+            return
+        try:
+            tmp_path = _write_hint(segment, _tmp_path(segment.hint_path, TMP_SUFFIX))
+            os.replace(tmp_path, segment.hint_path)
+        except OSError:
+            # Without a hint the segment is just scanned on load
+            return
+        segment.records = None
+
+    def __remove_abandoned_files(self) -> None:
+        """Remove what compactions and seals of dead processes left behind."""
+        if not self.__folder.is_dir():
+            return
+        for suffix in (COMPACTING_SUFFIX, TMP_SUFFIX):
+            for path in self.__folder.glob(f".*{suffix}"):
+                token = path.name[: -len(suffix)].rsplit(".", 1)[-1]
+                if not _is_writer_alive(token):
+                    path.unlink(missing_ok=True)
+
+    def __pread(self, number: int, offset: int, length: int) -> bytes:
+        segment = self.__segments[number]
+        if segment.fd is None:
+            segment.fd = os.open(segment.path, os.O_RDONLY)
+        return os.pread(segment.fd, length, offset)
+
+    def __notify(self, changes: dict[str, bool]) -> None:
+        added = {
+            id
+            for id, existed in changes.items()
+            if not existed and id in self.__offsets
+        }
+        removed = {
+            id
+            for id, existed in changes.items()
+            if existed and id not in self.__offsets
+        }
+        if not added and not removed:
+            return
+        for listener in self.__listeners:
+            listener(added, removed)
+
+    def __start_compactor(self) -> None:
+        if self.__compaction_interval is None or self.__compactor is not None:
+            return
+
+        self.__compactor = threading.Thread(
+            target=self.__compaction_loop,
+            name=f"redb-compactor-{self.__folder.parent.name}",
+            daemon=True,
+        )
+        self.__compactor.start()
+
+    def __compaction_loop(self) -> None:
+        while not self.__stop_compactor.wait(self.__compaction_interval):
+            try:
+                self.compact()
+            except OSError:
+                pass
+
+
+def _list_segments(folder: Path) -> list[int]:
+    if not folder.is_dir():
+        return []
+
+    with os.scandir(folder) as entries:
+        return sorted(
+            int(entry.name[: -len(SEGMENT_SUFFIX)])
+            for entry in entries
+            if entry.name.endswith(SEGMENT_SUFFIX)
+            and entry.name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+
+def _tmp_path(path: Path, suffix: str) -> Path:
+    """Temporary sibling of `path` no other writer or process picks."""
+    token = f"{os.getpid()}-{next(_tokens)}"
+    return path.with_name(f".{path.name}.{token}{suffix}")
+
+
+_tokens = itertools.count()
+
+
+def _write_hint(segment: _Segment, path: Path) -> Path:
+    lines = [f"#{segment.inode} {segment.consumed}"]
+    lines.extend(
+        f"{kind}\t{offset}\t{length}\t{id}"
+        for kind, offset, length, id in segment.records or []
+    )
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
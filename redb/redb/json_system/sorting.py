@@ -0,0 +1,131 @@
+import heapq
+import tempfile
+from contextlib import closing
+from typing import IO, Any, Callable, Generator, Iterable, Iterator
+
+from redb.core.serializers import Serializer
+
+from .indexes import resolve_path, sort_value
+
+SortSpec = list[tuple[str, str | int]]
+Entry = tuple[int, dict]
+
+
+def sort_documents(
+    docs: Iterable[dict],
+    sort: SortSpec,
+    serializer: Serializer,
+    limit: int = 0,
+    buffer_size: int = 10_000,
+) -> Generator[dict, None, None]:
+    """
+    Sort `docs` the way a Mongo server would.
+
+    With a `limit` only the first `limit` documents are kept in memory. Without
+    one, every `buffer_size` documents are sorted and spilled to a temporary
+    file, and the sorted runs are merged back when reading.
+    """
+    # Documents that compare equal keep the order they came in
+    entries = enumerate(docs)
+    key = _build_key(sort)
+    if limit:
+        for _, doc in heapq.nsmallest(limit, entries, key=key):
+            yield doc
+        return
+
+    sorted_entries = _external_sort(entries, key, serializer, buffer_size)
+    with closing(sorted_entries):
+        for _, doc in sorted_entries:
+            yield doc
+
+
+def _external_sort(
+    entries: Iterator[Entry],
+    key: Callable[[Entry], tuple],
+    serializer: Serializer,
+    buffer_size: int,
+) -> Generator[Entry, None, None]:
+    runs: list[IO[bytes]] = []
+    try:
+        buffer = []
+        for entry in entries:
+            buffer.append(entry)
+            if len(buffer) >= buffer_size:
+                buffer.sort(key=key)
+                runs.append(_write_run(buffer, serializer))
+                buffer = []
+
+        buffer.sort(key=key)
+        if not runs:
+            yield from buffer
+            return
+
+        yield from heapq.merge(
+            *(_read_run(run, serializer) for run in runs),
+            buffer,
+            key=key,
+        )
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _write_run(entries: list[Entry], serializer: Serializer) -> IO[bytes]:
+    run = tempfile.TemporaryFile(prefix="redb-sort-")
+    for entry in entries:
+        run.write(serializer.dumps(entry) + b"\n")
+    run.seek(0)
+    return run
+
+
+def _read_run(run: IO[bytes], serializer: Serializer) -> Iterator[Entry]:
+    for line in run:
+        ordinal, doc = serializer.loads(line)
+        yield ordinal, doc
+
+
+def _build_key(sort: SortSpec) -> Callable[[Entry], tuple]:
+    fields = [(field, _is_descending(direction)) for field, direction in sort]
+
+    def key(entry: Entry) -> tuple:
+        ordinal, doc = entry
+        values = tuple(
+            _field_key(doc, field, descending) for field, descending in fields
+        )
+        return values, ordinal
+
+    return key
+
+
+def _field_key(doc: dict, field: str, descending: bool) -> Any:
+    values = []
+    for value in resolve_path(doc, field):
+        if isinstance(value, list):
+            values.extend(value)
+        else:
+            values.append(value)
+
+    # Arrays sort by their smallest element ascending and largest descending
+    keys = [sort_value(value) for value in values] or [sort_value(None)]
+    if descending:
+        return _Descending(max(keys))
+    return min(keys)
+
+
+def _is_descending(direction: str | int) -> bool:
+    if isinstance(direction, str):
+        return direction.lower() in ("desc", "descending", "-1")
+    return direction < 0
+
+
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value: tuple) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
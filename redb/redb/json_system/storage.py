@@ -0,0 +1,525 @@
+import itertools
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Literal
+
+from redb.core.serializers import Serializer, get_serializer
+from redb.interface.configs import JSONConfig
+
+from .cache import DocumentCache, cache_key, get_document_cache
+from .catalog import (
+    METADATA_FOLDER,
+    Listener,
+    get_catalog,
+    read_layout,
+    shard_folder,
+    write_layout,
+)
+from .codecs import Codec, PlainCodec, document_id, get_codec, get_codec_by_suffix
+from .locks import get_locks
+
+WAL_FOLDER = "wal"
+TMP_SUFFIX = ".tmp"
+# Suffixes of the codecs documents of the collection were ever written with
+CODECS_FILE = "codecs"
+
+FsyncPolicy = Literal["document", "batch", "none"]
+
+
+class Storage(ABC):
+    """Physical layout of the documents of a JSON collection."""
+
+    @abstractmethod
+    def ids(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def refresh(self) -> None:
+        pass
+
+    @abstractmethod
+    def subscribe(self, listener: Listener) -> None:
+        pass
+
+    @abstractmethod
+    def exists(self, id: Any) -> bool:
+        pass
+
+    def exists_many(self, ids: list[Any]) -> list[Any]:
+        """Those of `ids` that exist, in order."""
+        return [id for id in ids if self.exists(id)]
+
+    @abstractmethod
+    def read(self, id: Any) -> dict | None:
+        pass
+
+    @abstractmethod
+    def read_raw(self, id: Any) -> bytes | None:
+        """Serialized document, for callers that only decode parts of it."""
+        pass
+
+    @abstractmethod
+    def write(self, docs: list[dict]) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, ids: list[Any]) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @property
+    def read_only(self) -> bool:
+        return False
+
+    @property
+    def caches_documents(self) -> bool:
+        """Whether `read` usually answers without parsing, making `read_raw` moot."""
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class FileStorage(Storage):
+    """
+    One `<_id>.json` file per document, either right in the collection folder
+    or, for sharded collections, under `ab/cd/` subfolders. Compressed
+    documents carry the suffix of their codec instead (`.json.zst`...), and
+    documents written with different codecs may live side by side.
+
+    Batches are written to hidden temporary files first and then published
+    with atomic renames, so readers never see a torn document. With a
+    write-ahead log, the renames of a batch are listed in a manifest before
+    any of them happens, and a batch interrupted by a crash is rolled forward
+    the next time the collection is opened. Given a `DocumentCache`, documents
+    whose files did not change since they were last parsed are served from it.
+    """
+
+    def __init__(
+        self,
+        collection_path: Path,
+        serializer: Serializer | None = None,
+        pretty: bool = True,
+        fsync: FsyncPolicy = "none",
+        write_ahead_log: bool = False,
+        sharded: bool = False,
+        codec: Codec | None = None,
+        cache: DocumentCache | None = None,
+    ) -> None:
+        self.__collection_path = collection_path
+        self.__serializer = serializer or get_serializer()
+        self.__codec = codec or get_codec()
+        self.__cache = cache
+        self.__pretty = pretty
+        self.__fsync = fsync
+        self.__wal_folder = collection_path / METADATA_FOLDER / WAL_FOLDER
+        self.__write_ahead_log = write_ahead_log
+        self.__catalog = get_catalog(collection_path)
+        self.__locks = get_locks(collection_path)
+        # The layout on disk wins, flat collections are sharded by `shard`
+        self.__layout = read_layout(collection_path)
+        self.__shard_new = sharded and self.__layout == "flat"
+        # Suffixes to look documents up by, the one this storage writes first
+        self.__suffixes = self.__load_suffixes()
+        self.__recover()
+
+    @property
+    def caches_documents(self) -> bool:
+        return self.__cache is not None
+
+    def ids(self) -> list[str]:
+        return self.__catalog.ids()
+
+    def refresh(self) -> None:
+        self.__catalog.refresh()
+
+    def subscribe(self, listener: Listener) -> None:
+        self.__catalog.subscribe(listener)
+
+    def exists(self, id: Any) -> bool:
+        return any(self.__path(id, suffix).is_file() for suffix in self.__suffixes)
+
+    def read(self, id: Any) -> dict | None:
+        if self.__cache is not None:
+            return self.__read_cached(id, self.__cache)
+        data = self.read_raw(id)
+        if data is None:
+            return None
+        return self.__serializer.loads(data)
+
+    def read_raw(self, id: Any) -> bytes | None:
+        for suffix in self.__suffixes:
+            try:
+                with open(self.__path(id, suffix), "rb") as f:
+                    return get_codec_by_suffix(suffix).read(f)
+            except FileNotFoundError:
+                continue
+
+        # Either removed behind our back, which the catalog catches up with on
+        # its own, or written by someone using another codec
+        suffixes = self.__load_suffixes()
+        if suffixes != self.__suffixes:
+            self.__suffixes = suffixes
+            return self.read_raw(id)
+        return None
+
+    def write(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+
+        self.__collection_path.mkdir(parents=True, exist_ok=True)
+        if self.__shard_new and not len(self.__catalog):
+            write_layout(self.__collection_path, "sharded")
+            self.__layout = "sharded"
+        self.__shard_new = False
+        with self.__locks.collection():
+            stale_suffixes = self.__register_codec()
+
+        token = f"{os.getpid()}-{next(_tokens)}"
+        renames = []
+        folders = {self.__collection_path}
+        try:
+            for doc in docs:
+                path = self.__path(doc["_id"])
+                if path.parent not in folders:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    folders.add(path.parent)
+                # Temporary files stay in the collection folder, which also
+                # moves its mtime for the catalogs of sharded collections
+                tmp_path = self.__collection_path / f".{path.name}.{token}{TMP_SUFFIX}"
+                renames.append((tmp_path, path))
+                with open(tmp_path, "wb") as f:
+                    data = self.__serializer.dumps(doc, pretty=self.__pretty)
+                    f.write(self.__codec.compress(data))
+                    if self.__fsync != "none":
+                        f.flush()
+                        os.fsync(f.fileno())
+
+            manifest = None
+            if self.__write_ahead_log:
+                manifest = self.__write_manifest(token, renames)
+        except BaseException:
+            for tmp_path, _ in renames:
+                tmp_path.unlink(missing_ok=True)
+            raise
+
+        # From here on, an interrupted batch is finished by `__recover`
+        with self.__locks.collection():
+            for tmp_path, path in renames:
+                os.replace(tmp_path, path)
+                # The same document stored with another codec is now outdated
+                for suffix in stale_suffixes:
+                    self.__path(path.name[: -len(self.__codec.suffix)], suffix).unlink(
+                        missing_ok=True
+                    )
+                if self.__cache is not None:
+                    self.__cache.discard(path)
+                if self.__fsync == "document":
+                    _fsync_folders({self.__collection_path, path.parent})
+            if self.__fsync == "batch":
+                _fsync_folders(folders)
+            if manifest is not None:
+                manifest.unlink()
+
+            self.__catalog.add(*[doc["_id"] for doc in docs])
+
+    def delete(self, ids: list[Any]) -> None:
+        if not ids:
+            return
+
+        folders = set()
+        with self.__locks.collection():
+            for id in ids:
+                for suffix in self.__suffixes:
+                    path = self.__path(id, suffix)
+                    path.unlink(missing_ok=True)
+                    if self.__cache is not None:
+                        self.__cache.discard(path)
+                folders.add(path.parent)
+                if self.__fsync == "document":
+                    _fsync_folder(path.parent)
+            if self.__layout == "sharded":
+                os.utime(self.__collection_path)
+            if self.__fsync == "batch":
+                _fsync_folders(folders)
+            self.__catalog.discard(*ids)
+
+    def shard(self) -> int:
+        """Move the documents of a flat collection under shard folders."""
+        if not self.__collection_path.is_dir():
+            return 0
+        with self.__locks.collection():
+            # Recorded first, so that an interrupted migration resumes on open
+            write_layout(self.__collection_path, "sharded")
+            self.__layout = "sharded"
+            moved = self.__move_flat_documents()
+            self.__catalog.rebuild()
+            if self.__cache is not None:
+                self.__cache.clear()
+        return moved
+
+    def __len__(self) -> int:
+        return len(self.__catalog)
+
+    def __read_cached(self, id: Any, cache: DocumentCache) -> dict | None:
+        for suffix in self.__suffixes:
+            path = self.__path(id, suffix)
+            try:
+                # A stat is all it takes to tell whether the cached copy is current
+                doc = cache.get(cache_key(path, os.stat(path)))
+                if doc is not None:
+                    return doc
+                with open(path, "rb") as f:
+                    # Keyed by the version actually read, whatever happens meanwhile
+                    key = cache_key(path, os.fstat(f.fileno()))
+                    data = get_codec_by_suffix(suffix).read(f)
+            except FileNotFoundError:
+                continue
+            doc = self.__serializer.loads(data)
+            cache.put(key, doc)
+            return doc
+
+        suffixes = self.__load_suffixes()
+        if suffixes != self.__suffixes:
+            self.__suffixes = suffixes
+            return self.__read_cached(id, cache)
+        return None
+
+    def __path(self, id: Any, suffix: str | None = None) -> Path:
+        name = f"{id}{suffix or self.__codec.suffix}"
+        if self.__layout == "sharded":
+            return self.__collection_path / shard_folder(str(id)) / name
+        return self.__collection_path / name
+
+    def __move_flat_documents(self) -> int:
+        with os.scandir(self.__collection_path) as entries:
+            names = [entry.name for entry in entries if entry.is_file()]
+
+        moved = 0
+        folders = {self.__collection_path}
+        for name in names:
+            id = document_id(name)
+            if id is None:
+                continue
+            path = self.__path(id).with_name(name)
+            if path.parent not in folders:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                folders.add(path.parent)
+            os.replace(self.__collection_path / name, path)
+            moved += 1
+        if moved and self.__fsync != "none":
+            _fsync_folders(folders)
+        return moved
+
+    def __load_suffixes(self) -> list[str]:
+        suffixes = _read_codec_suffixes(self.__collection_path) or [PlainCodec.suffix]
+        own = self.__codec.suffix
+        return [own] + [suffix for suffix in suffixes if suffix != own]
+
+    def __register_codec(self) -> list[str]:
+        """Record the codec about to be written with, returning the others in use."""
+        own = self.__codec.suffix
+        suffixes = _read_codec_suffixes(self.__collection_path)
+        if suffixes is None and own == PlainCodec.suffix:
+            # Collections from before compression only hold plain documents
+            self.__suffixes = [own]
+            return []
+
+        if suffixes is None:
+            suffixes = [PlainCodec.suffix] if len(self.__catalog) else []
+        if own not in suffixes:
+            suffixes.append(own)
+            _write_codec_suffixes(self.__collection_path, suffixes)
+        self.__suffixes = [own] + [suffix for suffix in suffixes if suffix != own]
+        return self.__suffixes[1:]
+
+    def __write_manifest(self, token: str, renames: list[tuple[Path, Path]]) -> Path:
+        self.__wal_folder.mkdir(parents=True, exist_ok=True)
+        manifest = self.__wal_folder / f"{token}.json"
+        tmp_manifest = manifest.with_suffix(TMP_SUFFIX)
+        with open(tmp_manifest, "w") as f:
+            json.dump(
+                [
+                    [tmp.name, str(path.relative_to(self.__collection_path))]
+                    for tmp, path in renames
+                ],
+                f,
+            )
+            if self.__fsync != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_manifest, manifest)
+        if self.__fsync != "none":
+            _fsync_folder(self.__wal_folder)
+        return manifest
+
+    def __recover(self) -> None:
+        """Finish the batches and drop the temporary files of dead writers."""
+        if self.__wal_folder.is_dir():
+            for manifest in sorted(self.__wal_folder.glob("*.json")):
+                if _is_writer_alive(manifest.stem):
+                    continue
+                try:
+                    with open(manifest, "r") as f:
+                        renames = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                for tmp_name, name in renames:
+                    try:
+                        os.replace(
+                            self.__collection_path / tmp_name,
+                            self.__collection_path / name,
+                        )
+                    except FileNotFoundError:
+                        pass
+                manifest.unlink(missing_ok=True)
+
+        if not self.__collection_path.is_dir():
+            return
+        if self.__layout == "sharded":
+            self.__move_flat_documents()
+        for tmp_path in self.__collection_path.glob(f".*{TMP_SUFFIX}"):
+            token = tmp_path.name[: -len(TMP_SUFFIX)].rsplit(".", 1)[-1]
+            if not _is_writer_alive(token):
+                tmp_path.unlink(missing_ok=True)
+
+
+_tokens = itertools.count()
+
+
+def _is_writer_alive(token: str) -> bool:
+    """Whether the process that wrote a batch `token` may still be running."""
+    try:
+        pid = int(token.split("-")[0])
+    except ValueError:
+        return False
+
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _fsync_folder(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_codec_suffixes(collection_path: Path) -> list[str] | None:
+    try:
+        with open(collection_path / METADATA_FOLDER / CODECS_FILE, "r") as f:
+            return f.read().split()
+    except FileNotFoundError:
+        return None
+
+
+def _write_codec_suffixes(collection_path: Path, suffixes: list[str]) -> None:
+    path = collection_path / METADATA_FOLDER / CODECS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(TMP_SUFFIX)
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(suffixes))
+    os.replace(tmp_path, path)
+
+
+def _fsync_folders(paths: set[Path]) -> None:
+    for path in paths:
+        _fsync_folder(path)
+
+
+def shard_collection(collection_path: Path) -> int:
+    """
+    Convert a flat JSON collection to the sharded layout in place, returning
+    how many documents were moved. Other processes should not be using the
+    collection meanwhile.
+    """
+    path = Path(os.path.abspath(collection_path))
+    with _storages_lock:
+        storages = [storage for (key, _), storage in _storages.items() if key == path]
+    if any(not isinstance(storage, FileStorage) for storage in storages):
+        raise ValueError("Only collections with one file per document can be sharded")
+    # Every open storage of the folder switches layout, the first one moves
+    return sum(storage.shard() for storage in storages or [FileStorage(path)])
+
+
+_storages: dict[tuple[Path, tuple], Storage] = {}
+_storages_lock = threading.Lock()
+
+
+def get_storage(collection_path: Path, config: JSONConfig) -> Storage:
+    """
+    Storage of a collection folder, shared by all of its handles opened with
+    the same storage settings.
+    """
+    key = (Path(os.path.abspath(collection_path)), _storage_settings(config))
+    with _storages_lock:
+        if key not in _storages:
+            _storages[key] = _build_storage(key[0], config)
+        return _storages[key]
+
+
+def _storage_settings(config: JSONConfig) -> tuple:
+    return (
+        config.storage,
+        config.serializer,
+        config.pretty,
+        config.fsync,
+        config.write_ahead_log,
+        config.shard_documents,
+        config.compression,
+        config.document_cache_bytes,
+        config.segment_max_bytes,
+        config.compaction_interval,
+        config.compaction_garbage_ratio,
+    )
+
+
+def _build_storage(collection_path: Path, config: JSONConfig) -> Storage:
+    serializer = get_serializer(config.serializer)
+    if config.storage == "files":
+        return FileStorage(
+            collection_path,
+            serializer,
+            pretty=config.pretty,
+            fsync=config.fsync,
+            write_ahead_log=config.write_ahead_log,
+            sharded=config.shard_documents,
+            codec=get_codec(config.compression),
+            cache=(
+                get_document_cache(collection_path, config.document_cache_bytes)
+                if config.document_cache_bytes
+                else None
+            ),
+        )
+    elif config.storage == "segments":
+        from .segments import SegmentStorage
+
+        return SegmentStorage(
+            collection_path,
+            serializer,
+            fsync=config.fsync != "none",
+            max_segment_bytes=config.segment_max_bytes,
+            compaction_interval=config.compaction_interval,
+            compaction_garbage_ratio=config.compaction_garbage_ratio,
+        )
+
+    elif config.storage == "packed":
+        from .packed import PackedStorage
+
+        return PackedStorage(collection_path, serializer)
+
+    raise ValueError(f"Unknown JSON storage: {config.storage!r}")
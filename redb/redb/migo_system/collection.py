@@ -1,5 +1,6 @@
 from functools import lru_cache
-from typing import Any, Type, TypeVar
+from itertools import groupby
+from typing import Any, Iterator, Type, TypeVar
 
 from migo.collection import BatchDocument
 from migo.collection import Collection as MigoDriverCollection
@@ -26,7 +27,16 @@ from migo.utils import (
 )
 
 from redb.core import Document
-from redb.interface.collection import Collection, Json, OptionalJson, ReturnType
+from redb.interface.collection import (
+    Collection,
+    Json,
+    OptionalJson,
+    ReturnType,
+    batch_iterate_converted_results,
+    iterate_converted_results,
+    unpack_operation,
+)
+from redb.interface.errors import BulkWriteError
 from redb.interface.fields import (
     ClassField,
     CompoundIndex,
@@ -203,6 +213,59 @@ def _build_milvus_indexes(
     return milvus_indexes
 
 
+def _batch_key(
+    cls: Type[Document],
+    name: str,
+    filter: Json | None,
+    doc: Json | None,
+    upsert: bool,
+) -> tuple | None:
+    """
+    Key shared by consecutive operations that make one Migo call: inserts,
+    and deletes or updates of many matching a single Mongo field by
+    equality, which select disjoint documents and merge into an $in filter.
+    None for operations that run on their own.
+    """
+    if name == "InsertOne":
+        return (name,)
+    if name not in ("DeleteMany", "UpdateMany") or upsert or not filter:
+        return None
+    if len(filter) != 1:
+        return None
+    [(field, value)] = filter.items()
+    model_field = cls.__fields__.get(field)
+    if model_field is None:
+        return None
+    if _is_milvus_field(ClassField(model_field=model_field, base_class=cls)):
+        return None
+    if isinstance(value, (dict, list)):
+        return None
+    if name == "DeleteMany":
+        return (name, field)
+    if _touches(doc, field):
+        # Later filters would see the documents earlier updates changed
+        return None
+    return (name, field, repr(doc))
+
+
+def _touches(update: Json | None, field: str) -> bool:
+    if not update:
+        return False
+    return field in update or any(
+        isinstance(fields, dict) and field in fields
+        for key, fields in update.items()
+        if key.startswith("$")
+    )
+
+
+def _distinct_values(run: list[tuple[int, tuple]], field: str) -> bool:
+    values = [filter[field] for _, (_, filter, _, _) in run]
+    try:
+        return len(set(values)) == len(values)
+    except TypeError:
+        return False
+
+
 class MigoCollection(Collection):
     __client_name__: str = "migo"
 
@@ -237,7 +300,9 @@ class MigoCollection(Collection):
         sort: list[tuple[str, str | int]] | None = None,
         skip: int = 0,
         limit: int = 0,
-    ) -> list[ReturnType]:
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | Iterator[list[ReturnType]] | Iterator[ReturnType]:
         migo_filter = _build_migo_data(cls, data=filter, out=MigoFilter)
         migo_fields = _build_migo_fields(cls, fields)
         results = self.__collection.find_many(
@@ -246,6 +311,14 @@ class MigoCollection(Collection):
             sort=sort,
             limit=limit,
         )
+        # The driver fetches every result at once, only the conversion to
+        # `return_cls` is left to be done as the caller goes
+        if iterate:
+            return iterate_converted_results(results, return_cls)
+
+        if batch_size is not None:
+            return batch_iterate_converted_results(results, batch_size, return_cls)
+
         return [return_cls(**result) for result in results]
 
     def find_one(
@@ -277,8 +350,96 @@ class MigoCollection(Collection):
     ) -> int:
         return self.__collection.count(filter=filter)
 
-    def bulk_write(self, _: list[PyMongoOperations]) -> BulkWriteResult:
-        raise NotImplementedError
+    def bulk_write(
+        self,
+        cls: Type[Document],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        counts = dict.fromkeys(("deleted", "inserted", "matched", "modified"), 0)
+        upserted_ids = {}
+        errors: dict[int, Exception] = {}
+
+        unpacked = enumerate(unpack_operation(operation) for operation in operations)
+        # Runs of consecutive operations Migo can take as a single call
+        for key, run in groupby(unpacked, key=lambda item: _batch_key(cls, *item[1])):
+            run = list(run)
+            if key is None:
+                batches = [[item] for item in run]
+            elif key[0] == "UpdateMany" and not _distinct_values(run, key[1]):
+                # Updating the same documents twice is not one update
+                batches = [[item] for item in run]
+            else:
+                batches = [run]
+
+            for batch in batches:
+                try:
+                    if len(batch) > 1 or key == ("InsertOne",):
+                        self.__write_batch(cls, key, batch, counts)
+                        continue
+                    [(i, (name, filter, doc, upsert))] = batch
+                    if name in ("DeleteOne", "DeleteMany"):
+                        delete = (
+                            self.delete_one if name == "DeleteOne" else self.delete_many
+                        )
+                        counts["deleted"] += delete(cls, filter).deleted_count
+                        continue
+
+                    write = {
+                        "ReplaceOne": self.replace_one,
+                        "UpdateOne": self.update_one,
+                        "UpdateMany": self.update_many,
+                    }[name]
+                    result = write(cls, filter, doc, upsert)
+                except Exception as e:
+                    if ordered:
+                        raise
+                    # Migo does not tell which operations of a batch failed
+                    errors.update(dict.fromkeys((i for i, _ in batch), e))
+                    continue
+                counts["matched"] += result.matched_count
+                counts["modified"] += result.modified_count
+                if result.upserted_id is not None:
+                    upserted_ids[i] = result.upserted_id
+
+        result = BulkWriteResult(
+            deleted_count=counts["deleted"],
+            inserted_count=counts["inserted"],
+            matched_count=counts["matched"],
+            modified_count=counts["modified"],
+            upserted_count=len(upserted_ids),
+            upserted_ids=upserted_ids,
+        )
+        if errors:
+            raise BulkWriteError(
+                errors=errors, result=result, collection_name=cls.collection_name()
+            )
+        return result
+
+    def __write_batch(
+        self,
+        cls: Type[Document],
+        key: tuple,
+        batch: list[tuple[int, tuple[str, Json, Json, bool]]],
+        counts: dict[str, int],
+    ) -> None:
+        """Run operations grouped by `_batch_key` as one Migo call."""
+        if key[0] == "InsertOne":
+            result = self.insert_many(cls, [doc for _, (_, _, doc, _) in batch])
+            counts["inserted"] += len(result.inserted_ids)
+            return
+
+        field = key[1]
+        values = list(dict.fromkeys(filter[field] for _, (_, filter, _, _) in batch))
+        filter = {field: {"$in": values}}
+        if key[0] == "DeleteMany":
+            counts["deleted"] += self.delete_many(cls, filter).deleted_count
+            return
+
+        _, (_, _, update, _) = batch[0]
+        result = self.update_many(cls, filter, update)
+        counts["matched"] += result.matched_count
+        counts["modified"] += result.modified_count
 
     def insert_one(
         self,
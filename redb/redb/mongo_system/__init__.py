@@ -1,3 +1,5 @@
-from .client import MongoClient
+from .async_collection import AsyncMongoCollection
+from .client import MongoClient, get_async_collection
 from .collection import MongoCollection
 from .database import MongoDatabase
+from .read_policy import with_read_policy
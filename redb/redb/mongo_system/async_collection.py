@@ -0,0 +1,263 @@
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Type, TypeVar
+
+from pymongo.errors import BulkWriteError as PymongoBulkWriteError
+from pymongo.errors import PyMongoError
+
+from redb.core import Document
+from redb.interface.collection import (
+    AsyncCollection,
+    Json,
+    OptionalJson,
+    ReturnType,
+)
+from redb.interface.errors import DocumentNotFound
+from redb.interface.fields import CompoundIndex, PyMongoOperations
+from redb.interface.results import (
+    BulkWriteResult,
+    DeleteManyResult,
+    DeleteOneResult,
+    InsertManyResult,
+    InsertOneResult,
+    ReplaceOneResult,
+    UpdateManyResult,
+    UpdateOneResult,
+)
+
+from .collection import _aggregate_options, _bulk_write_error, _index_options
+
+if TYPE_CHECKING:
+    # Only in recent pymongo versions, older ones still serve the sync API
+    from pymongo.asynchronous.collection import (
+        AsyncCollection as PymongoAsyncCollection,
+    )
+
+T = TypeVar("T")
+
+
+class AsyncMongoCollection(AsyncCollection):
+    """`MongoCollection` over the asyncio driver of pymongo."""
+
+    __client_name__: str = "mongo"
+
+    def __init__(self, collection: "PymongoAsyncCollection") -> None:
+        super().__init__()
+
+        self.__collection = collection
+
+    def _get_driver_collection(self) -> "PymongoAsyncCollection":
+        return self.__collection
+
+    async def create_index(
+        self,
+        index: CompoundIndex,
+    ) -> bool:
+        try:
+            await self.__collection.create_index(**_index_options(index))
+            return True
+        except PyMongoError:
+            return False
+
+    async def find(
+        self,
+        cls: Type[Document],
+        return_cls: ReturnType,
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        sort: list[tuple[str, str | int]] | None = None,
+        skip: int = 0,
+        limit: int = 0,
+        iterate: bool = False,
+        batch_size: int | None = None,
+    ) -> list[ReturnType] | AsyncIterator[list[ReturnType]] | AsyncIterator[ReturnType]:
+        cursor = self.__collection.find(
+            filter=filter,
+            projection=fields,
+            sort=sort,
+            skip=skip,
+            limit=limit,
+        )
+        if iterate:
+            return _iterate_converted_results(cursor, return_cls)  # type: ignore
+
+        if batch_size is not None:
+            return _batch_iterate_converted_results(cursor, batch_size, return_cls)  # type: ignore
+
+        return [return_cls(**result) async for result in cursor]
+
+    async def find_one(
+        self,
+        cls: Type[Document],
+        return_cls: ReturnType,
+        filter: OptionalJson = None,
+        fields: dict[str, bool] | None = None,
+        skip: int = 0,
+    ) -> ReturnType:
+        result = await self.__collection.find_one(
+            filter=filter,
+            projection=fields,
+            skip=skip,
+        )
+        if not result:
+            m = f"Document not found with filters {filter} in collection {self.__collection.name}."
+            raise DocumentNotFound(m, collection_name=self.__collection.name)
+        return return_cls(**result)
+
+    async def distinct(
+        self,
+        cls: ReturnType,
+        key: str,
+        filter: OptionalJson = None,
+    ) -> list[Any]:
+        results = await self.__collection.distinct(key=key, filter=filter)
+        return results
+
+    async def count_documents(
+        self,
+        cls: Type[Document],
+        filter: OptionalJson = None,
+    ) -> int:
+        return await self.__collection.count_documents(filter=filter)
+
+    async def aggregate(
+        self,
+        cls: Type[Document],
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[ReturnType]:
+        cursor = await self.__collection.aggregate(
+            pipeline, **_aggregate_options(allow_disk_use, batch_size)
+        )
+        if return_cls is dict:
+            return cursor
+        return _iterate_converted_results(cursor, return_cls)
+
+    async def bulk_write(
+        self,
+        cls: Type[Document],
+        operations: list[PyMongoOperations],
+        ordered: bool = True,
+    ) -> BulkWriteResult:
+        try:
+            result = await self.__collection.bulk_write(
+                requests=operations, ordered=ordered
+            )
+        except PymongoBulkWriteError as e:
+            if ordered:
+                raise
+            raise _bulk_write_error(e, self.__collection.name)
+        return BulkWriteResult(
+            deleted_count=result.deleted_count,
+            inserted_count=result.inserted_count,
+            matched_count=result.matched_count,
+            modified_count=result.modified_count,
+            upserted_count=result.upserted_count,
+            upserted_ids=result.upserted_ids,
+        )
+
+    async def insert_one(
+        self,
+        cls: Type[Document],
+        data: dict,
+    ) -> InsertOneResult:
+        result = await self.__collection.insert_one(document=data)
+        return InsertOneResult(inserted_id=result.inserted_id)
+
+    async def insert_many(
+        self,
+        cls: Type[Document],
+        data: list[Json],
+    ) -> InsertManyResult:
+        result = await self.__collection.insert_many(documents=data)
+        return InsertManyResult(inserted_ids=result.inserted_ids)
+
+    async def replace_one(
+        self,
+        cls: Type[Document],
+        filter: Json,
+        replacement: Json,
+        upsert: bool = False,
+    ) -> ReplaceOneResult:
+        result = await self.__collection.replace_one(
+            filter=filter,
+            replacement=replacement,
+            upsert=upsert,
+        )
+        return ReplaceOneResult(
+            matched_count=result.matched_count,
+            modified_count=result.modified_count,
+            upserted_id=result.upserted_id,
+        )
+
+    async def update_one(
+        self,
+        cls: Type[Document],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateOneResult:
+        result = await self.__collection.update_one(
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+        return UpdateOneResult(
+            matched_count=result.matched_count,
+            modified_count=result.modified_count,
+            upserted_id=result.upserted_id,
+        )
+
+    async def update_many(
+        self,
+        cls: Type[Document],
+        filter: Json,
+        update: Json,
+        upsert: bool = False,
+    ) -> UpdateManyResult:
+        result = await self.__collection.update_many(
+            filter=filter,
+            update=update,
+            upsert=upsert,
+        )
+        return UpdateManyResult(
+            matched_count=result.matched_count,
+            modified_count=result.modified_count,
+            upserted_id=result.upserted_id,
+        )
+
+    async def delete_one(
+        self,
+        cls: Type[Document],
+        filter: Json,
+    ) -> DeleteOneResult:
+        res = await self.__collection.delete_one(filter=filter)
+        return DeleteOneResult(deleted_count=res.deleted_count)
+
+    async def delete_many(
+        self,
+        cls: Type[Document],
+        filter: Json,
+    ) -> DeleteManyResult:
+        result = await self.__collection.delete_many(filter=filter)
+        return DeleteManyResult(deleted_count=result.deleted_count)
+
+
+async def _iterate_converted_results(
+    iterator: AsyncIterable[Json], clazz: Type[T]
+) -> AsyncIterator[T]:
+    async for result in iterator:
+        yield clazz(**result)  # type: ignore
+
+
+async def _batch_iterate_converted_results(
+    iterator: AsyncIterable[Json], batch_size: int, clazz: Type[T]
+) -> AsyncIterator[list[T]]:
+    output = []
+    async for result in iterator:
+        output.append(clazz(**result))  # type: ignore
+        if len(output) == batch_size:
+            yield output
+            output = []
+    if output:
+        yield output
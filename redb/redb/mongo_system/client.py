@@ -1,23 +1,43 @@
-from typing import Sequence
+import threading
+import weakref
+from typing import TYPE_CHECKING, Sequence
 
 from pymongo import MongoClient as PymongoClient
+from pymongo.collection import Collection as PymongoCollection
 
 from redb.interface.client import Client
-from redb.interface.configs import MongoConfig
+from redb.interface.configs import MongoConfig, ReadPolicy
 
+from .async_collection import AsyncMongoCollection
 from .database import MongoDatabase
+from .read_policy import with_read_policy
+
+if TYPE_CHECKING:
+    from pymongo import AsyncMongoClient
 
 
 class MongoClient(Client):
-    def __init__(self, mongo_config: MongoConfig | dict):
+    def __init__(
+        self,
+        mongo_config: MongoConfig | dict,
+        async_config: MongoConfig | dict | None = None,
+    ):
         if isinstance(mongo_config, dict):
             mongo_config = MongoConfig(**mongo_config)
+        if isinstance(async_config, dict):
+            async_config = MongoConfig(**async_config)
         self.__client = PymongoClient(
             mongo_config.database_uri, **mongo_config.driver_kwargs
         )
+        # The asyncio client reaches the same databases, connecting on first use
+        self.__async_config = async_config or mongo_config
+        self.__async_client: "AsyncMongoClient | None" = None
+        self.__async_lock = threading.Lock()
+        _clients[self.__client] = self
+        self.__lazy_documents = mongo_config.lazy_documents
         if mongo_config.default_database is None:
             self.__default_database = MongoDatabase(
-                self.__client.get_default_database()
+                self.__client.get_default_database(), self.__lazy_documents
             )
         else:
             self.__default_database = self.get_database(mongo_config.default_database)
@@ -27,16 +47,34 @@ class MongoClient(Client):
 
     def get_databases(self) -> Sequence[MongoDatabase]:
         return [
-            MongoDatabase(self.__client.get_database(database["name"]))
+            MongoDatabase(
+                self.__client.get_database(database["name"]), self.__lazy_documents
+            )
             for database in self.__client.list_databases()
         ]
 
     def get_database(self, name: str) -> MongoDatabase:
-        return MongoDatabase(self.__client.get_database(name))
+        return MongoDatabase(self.__client.get_database(name), self.__lazy_documents)
 
     def get_default_database(self) -> MongoDatabase:
         return self.__default_database
 
+    def get_async_client(self) -> "AsyncMongoClient":
+        with self.__async_lock:
+            if self.__async_client is None:
+                try:
+                    from pymongo import AsyncMongoClient
+                except ImportError:
+                    raise ImportError(
+                        "The asyncio API needs pymongo>=4.9, "
+                        "maybe you forgot to `pip install -U pymongo`"
+                    )
+                self.__async_client = AsyncMongoClient(
+                    self.__async_config.database_uri,
+                    **self.__async_config.driver_kwargs,
+                )
+            return self.__async_client
+
     def drop_database(self, name: str) -> bool:
         try:
             self.__client.drop_database(name)
@@ -50,3 +88,23 @@ class MongoClient(Client):
             return True
         except Exception:
             return False
+
+
+# redb clients by pymongo client, for collections to find their asyncio twin
+_clients: "weakref.WeakKeyDictionary[PymongoClient, MongoClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_collection(
+    collection: PymongoCollection,
+    read_policy: ReadPolicy | None = None,
+) -> AsyncMongoCollection:
+    """Asyncio handle of the same collection, through the client that opened it."""
+    database = collection.database
+    client = _clients[database.client]
+    async_database = client.get_async_client()[database.name]
+    async_collection = async_database[collection.name]
+    if read_policy is not None:
+        async_collection = with_read_policy(async_collection, read_policy)
+    return AsyncMongoCollection(async_collection)
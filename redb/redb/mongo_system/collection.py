@@ -1,10 +1,26 @@
+from itertools import islice
 from typing import Any, Iterator, Type, TypeVar
 
+from bson.raw_bson import RawBSONDocument
 from pymongo.collection import Collection as PymongoCollection
+from pymongo.errors import BulkWriteError as PymongoBulkWriteError
+from pymongo.errors import PyMongoError
 
-from redb.core import Document
-from redb.interface.collection import Collection, Json, OptionalJson, ReturnType
-from redb.interface.errors import DocumentNotFound
+from redb.core import BaseDocument, Document
+from redb.interface.collection import (
+    Collection,
+    Json,
+    OptionalJson,
+    ReturnType,
+    batch_iterate_converted_results,
+    iterate_converted_results,
+)
+from redb.interface.errors import (
+    BulkWriteError,
+    DocumentNotFound,
+    REDBError,
+    UniqueConstraintViolation,
+)
 from redb.interface.fields import CompoundIndex, PyMongoOperations
 from redb.interface.results import (
     BulkWriteResult,
@@ -17,16 +33,28 @@ from redb.interface.results import (
     UpdateOneResult,
 )
 
+from .lazy import LazyDocument
+
 T = TypeVar("T")
 
 
 class MongoCollection(Collection):
     __client_name__: str = "mongo"
 
-    def __init__(self, collection: PymongoCollection) -> None:
+    def __init__(
+        self, collection: PymongoCollection, lazy_documents: bool = False
+    ) -> None:
         super().__init__()
 
         self.__collection = collection
+        self.__raw_collection = None
+        if lazy_documents:
+            # Same collection, handing documents out undecoded
+            self.__raw_collection = collection.with_options(
+                codec_options=collection.codec_options.with_options(
+                    document_class=RawBSONDocument
+                )
+            )
 
     def _get_driver_collection(self) -> PymongoCollection:
         return self.__collection
@@ -35,22 +63,10 @@ class MongoCollection(Collection):
         self,
         index: CompoundIndex,
     ) -> bool:
-        name = index.name
-        if name is None:
-            name = "_".join([field.join_attrs("_") for field in index.fields])
-            name = f"unique_{name}" if index.unique else name
-            name = f"{index.direction.name.lower()}_{name}_index"
         try:
-            keys = [
-                (field.join_attrs(), index.direction.value) for field in index.fields
-            ]
-            self.__collection.create_index(
-                keys=keys,
-                name=name,
-                unique=index.unique,
-            )
+            self.__collection.create_index(**_index_options(index))
             return True
-        except:
+        except PyMongoError:
             return False
 
     def find(
@@ -65,13 +81,23 @@ class MongoCollection(Collection):
         iterate: bool = False,
         batch_size: int | None = None,
     ) -> list[ReturnType] | Iterator[list[ReturnType]] | Iterator[ReturnType]:
-        cursor = self.__collection.find(
+        lazy = self.__is_lazy(return_cls)
+        collection = self.__raw_collection if lazy else self.__collection
+        cursor = collection.find(  # type: ignore
             filter=filter,
             projection=fields,
             sort=sort,
             skip=skip,
             limit=limit,
         )
+        if lazy:
+            documents = (self.__lazy(return_cls, result) for result in cursor)
+            if iterate:
+                return documents
+            if batch_size is not None:
+                return _batches(documents, batch_size)
+            return list(documents)
+
         if iterate:
             return iter(iterate_converted_results(cursor, return_cls))  # type: ignore
 
@@ -88,7 +114,9 @@ class MongoCollection(Collection):
         fields: dict[str, bool] | None = None,
         skip: int = 0,
     ) -> ReturnType:
-        result = self.__collection.find_one(
+        lazy = self.__is_lazy(return_cls)
+        collection = self.__raw_collection if lazy else self.__collection
+        result = collection.find_one(  # type: ignore
             filter=filter,
             projection=fields,
             skip=skip,
@@ -96,6 +124,8 @@ class MongoCollection(Collection):
         if not result:
             m = f"Document not found with filters {filter} in collection {self.__collection.name}."
             raise DocumentNotFound(m, collection_name=self.__collection.name)
+        if lazy:
+            return self.__lazy(return_cls, result)
         return return_cls(**result)
 
     def distinct(
@@ -114,11 +144,33 @@ class MongoCollection(Collection):
     ) -> int:
         return self.__collection.count_documents(filter=filter)
 
+    def aggregate(
+        self,
+        cls: Type[Document],
+        pipeline: list[Json],
+        return_cls: Type[ReturnType] = dict,
+        allow_disk_use: bool | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[ReturnType]:
+        cursor = self.__collection.aggregate(
+            pipeline, **_aggregate_options(allow_disk_use, batch_size)
+        )
+        if return_cls is dict:
+            return cursor
+        return iterate_converted_results(cursor, return_cls)
+
     def bulk_write(
         self,
+        cls: Type[Document],
         operations: list[PyMongoOperations],
+        ordered: bool = True,
     ) -> BulkWriteResult:
-        result = self.__collection.bulk_write(requests=operations)
+        try:
+            result = self.__collection.bulk_write(requests=operations, ordered=ordered)
+        except PymongoBulkWriteError as e:
+            if ordered:
+                raise
+            raise _bulk_write_error(e, self.__collection.name)
         return BulkWriteResult(
             deleted_count=result.deleted_count,
             inserted_count=result.inserted_count,
@@ -214,22 +266,67 @@ class MongoCollection(Collection):
         result = self.__collection.delete_many(filter=filter)
         return DeleteManyResult(deleted_count=result.deleted_count)
 
+    def __is_lazy(self, return_cls: Any) -> bool:
+        # Projections that leave required fields out come back as plain dicts
+        return (
+            self.__raw_collection is not None
+            and isinstance(return_cls, type)
+            and issubclass(return_cls, BaseDocument)
+        )
 
-def iterate_converted_results(iterator, clazz: Type[T]) -> T:
-    for result in iterator:
-        yield clazz(**result)  # type: ignore
+    def __lazy(
+        self, return_cls: Type[BaseDocument], result: RawBSONDocument
+    ) -> LazyDocument:
+        return LazyDocument(return_cls, result.raw, self.__collection.codec_options)
 
 
-def batch_iterate_converted_results(
-    iterator, batch_size: int, clazz: Type[T]
-) -> list[T]:
-    while True:
-        output = []
-        try:
-            for _ in range(batch_size):
-                output.append(clazz(**next(iterator)))
-        except StopIteration:
-            break
-        finally:
-            if output:
-                yield output
+def _batches(iterator: Iterator[T], batch_size: int) -> Iterator[list[T]]:
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def _index_options(index: CompoundIndex) -> dict:
+    name = index.name
+    if name is None:
+        name = "_".join([field.join_attrs("_") for field in index.fields])
+        name = f"unique_{name}" if index.unique else name
+        name = f"{index.direction.name.lower()}_{name}_index"
+    keys = [(field.join_attrs(), index.direction.value) for field in index.fields]
+    return {"keys": keys, "name": name, "unique": index.unique}
+
+
+def _aggregate_options(allow_disk_use: bool | None, batch_size: int | None) -> dict:
+    options: dict[str, Any] = {}
+    if allow_disk_use is not None:
+        options["allowDiskUse"] = allow_disk_use
+    if batch_size is not None:
+        options["batchSize"] = batch_size
+    return options
+
+
+def _bulk_write_error(
+    error: PymongoBulkWriteError, collection_name: str
+) -> BulkWriteError:
+    """Our BulkWriteError for the failed writes of an unordered bulk write."""
+    details = error.details
+    errors: dict[int, Exception] = {}
+    for write_error in details.get("writeErrors", []):
+        if write_error.get("code") == 11000:
+            errors[write_error["index"]] = UniqueConstraintViolation(
+                dup_keys=write_error.get("keyValue", {}),
+                collection_name=collection_name,
+            )
+        else:
+            errors[write_error["index"]] = REDBError(
+                write_error.get("errmsg", ""), collection_name=collection_name
+            )
+    upserted_ids = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+    result = BulkWriteResult(
+        deleted_count=details.get("nRemoved", 0),
+        inserted_count=details.get("nInserted", 0),
+        matched_count=details.get("nMatched", 0),
+        modified_count=details.get("nModified", 0),
+        upserted_count=len(upserted_ids),
+        upserted_ids=upserted_ids,
+    )
+    return BulkWriteError(errors=errors, result=result, collection_name=collection_name)
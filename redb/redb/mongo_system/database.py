@@ -1,26 +1,34 @@
 from pymongo.database import Database as PymongoDatabase
 from pymongo.errors import CollectionInvalid
 
+from redb.interface.configs import ReadPolicy
 from redb.interface.database import Database
 
 from .collection import MongoCollection
+from .read_policy import with_read_policy
 
 
 class MongoDatabase(Database):
-    def __init__(self, database: PymongoDatabase) -> None:
+    def __init__(self, database: PymongoDatabase, lazy_documents: bool = False) -> None:
         self.__database = database
+        self.__lazy_documents = lazy_documents
 
     def _get_driver_database(self) -> PymongoDatabase:
         return self.__database
 
     def get_collections(self) -> list[MongoCollection]:
         return [
-            MongoCollection(self.__database[col["name"]])
+            MongoCollection(self.__database[col["name"]], self.__lazy_documents)
             for col in self.__database.list_collections()
         ]
 
-    def get_collection(self, name: str) -> MongoCollection:
-        return MongoCollection(self.__database[name])
+    def get_collection(
+        self, name: str, read_policy: ReadPolicy | None = None
+    ) -> MongoCollection:
+        collection = self.__database[name]
+        if read_policy is not None:
+            collection = with_read_policy(collection, read_policy)
+        return MongoCollection(collection, self.__lazy_documents)
 
     def create_collection(self, name: str) -> bool:
         try:
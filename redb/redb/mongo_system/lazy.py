@@ -0,0 +1,146 @@
+import struct
+from typing import Any, Type
+
+import bson
+from bson.codec_options import DEFAULT_CODEC_OPTIONS, CodecOptions
+from pydantic.error_wrappers import ErrorWrapper, ValidationError
+from pydantic.errors import MissingError
+
+from redb.core import BaseDocument
+
+_INT32 = struct.Struct("<i")
+
+# Size of the fixed-width BSON values, by element type
+_FIXED_SIZES = {
+    0x01: 8,  # double
+    0x06: 0,  # undefined
+    0x07: 12,  # ObjectId
+    0x08: 1,  # bool
+    0x09: 8,  # datetime
+    0x0A: 0,  # null
+    0x10: 4,  # int32
+    0x11: 8,  # timestamp
+    0x12: 8,  # int64
+    0x13: 16,  # decimal128
+    0x7F: 0,  # max key
+    0xFF: 0,  # min key
+}
+# Values starting with their int32 size, plus how many bytes it leaves out
+_SIZED_VALUES = {
+    0x02: 4,  # string
+    0x03: 0,  # document
+    0x04: 0,  # array
+    0x05: 5,  # binary
+    0x0D: 4,  # javascript
+    0x0E: 4,  # symbol
+    0x0F: 0,  # javascript with scope
+}
+
+
+class LazyDocument:
+    """
+    Document read from Mongo as raw BSON, decoded and validated one field at
+    a time on attribute access.
+
+    Only the field offsets are computed up front, so reading a couple of
+    fields of a wide document never decodes the rest of it. `dict()` and
+    `materialize()` build the actual document.
+    """
+
+    __slots__ = ("_cls", "_raw", "_codec_options", "_offsets", "_values", "_document")
+
+    def __init__(
+        self,
+        cls: Type[BaseDocument],
+        raw: bytes,
+        codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS,
+    ) -> None:
+        self._cls = cls
+        self._raw = raw
+        self._codec_options = codec_options
+        self._offsets = _element_offsets(raw)
+        self._values: dict[str, Any] = {}
+        self._document: BaseDocument | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        field = self._cls.__fields__.get(name)
+        if field is None:
+            raise AttributeError(f"{self._cls.__name__!r} has no field {name!r}")
+        if self._document is not None:
+            return getattr(self._document, name)
+        if name not in self._values:
+            self._values[name] = self.__validate(field)
+        return self._values[name]
+
+    def __getitem__(self, key: str) -> Any:
+        """Raw value of `key` as stored, without validation."""
+        if key not in self._offsets:
+            raise KeyError(key)
+        return self.__decode(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyDocument):
+            other = other.materialize()
+        return self.materialize() == other
+
+    def __repr__(self) -> str:
+        id = self.__decode("_id") if "_id" in self._offsets else None
+        return f"Lazy{self._cls.__name__}(_id={id!r})"
+
+    def materialize(self) -> BaseDocument:
+        """Decode and validate the whole document."""
+        if self._document is None:
+            data = bson.decode(self._raw, codec_options=self._codec_options)
+            self._document = self._cls(**data)
+        return self._document
+
+    def dict(self, *args, **kwargs) -> dict:
+        return self.materialize().dict(*args, **kwargs)
+
+    def __validate(self, field: Any) -> Any:
+        if field.alias not in self._offsets:
+            if field.required:
+                error = ErrorWrapper(MissingError(), loc=field.alias)
+                raise ValidationError([error], self._cls)
+            return field.get_default()
+
+        value, errors = field.validate(
+            self.__decode(field.alias), {}, loc=field.alias, cls=self._cls
+        )
+        if errors:
+            raise ValidationError([errors], self._cls)
+        return value
+
+    def __decode(self, key: str) -> Any:
+        start, end = self._offsets[key]
+        # A document holding nothing but this element
+        data = _INT32.pack(end - start + 5) + self._raw[start:end] + b"\x00"
+        return bson.decode(data, codec_options=self._codec_options)[key]
+
+
+def _element_offsets(raw: bytes) -> dict[str, tuple[int, int]]:
+    """Where each top-level element of a BSON document starts and ends."""
+    offsets = {}
+    position = 4
+    end = len(raw) - 1
+    while position < end:
+        start = position
+        kind = raw[position]
+        name_end = raw.index(b"\x00", position + 1)
+        name = raw[position + 1 : name_end].decode()
+        position = name_end + 1
+        if kind in _FIXED_SIZES:
+            position += _FIXED_SIZES[kind]
+        elif kind in _SIZED_VALUES:
+            position += _INT32.unpack_from(raw, position)[0] + _SIZED_VALUES[kind]
+        elif kind == 0x0B:  # regex: pattern and flags cstrings
+            position = raw.index(b"\x00", raw.index(b"\x00", position) + 1) + 1
+        elif kind == 0x0C:  # DBPointer: string then ObjectId
+            position += 4 + _INT32.unpack_from(raw, position)[0] + 12
+        else:
+            raise bson.InvalidBSON(f"Unknown BSON element type {kind:#x}")
+        offsets[name] = (start, position)
+    return offsets
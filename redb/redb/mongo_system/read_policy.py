@@ -0,0 +1,77 @@
+import threading
+import weakref
+from typing import TypeVar
+
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+from redb.interface.configs import ReadPolicy
+
+C = TypeVar("C")
+
+_READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Collections with a read policy applied by driver client, then by database
+# name, collection name and policy, along with the options of the collection
+# they were made from. Building them copies those options, so they are made
+# once and reused.
+_read_collections: "weakref.WeakKeyDictionary[object, dict[tuple, list[tuple]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_read_collections_lock = threading.Lock()
+
+
+def with_read_policy(collection: C, read_policy: ReadPolicy) -> C:
+    """Handle of `collection` (sync or asyncio) reading as `read_policy` says."""
+    database = collection.database  # type: ignore
+    key = (database.name, collection.name, read_policy)  # type: ignore
+    # Driver options are not hashable, handles of a key are told apart by them
+    options = _collection_options(collection)
+    with _read_collections_lock:
+        handles = _read_collections.setdefault(database.client, {}).setdefault(key, [])
+        for handle_options, handle in handles:
+            if handle_options == options:
+                return handle
+        handle = collection.with_options(  # type: ignore
+            read_preference=_read_preference(read_policy),
+            read_concern=(
+                collection.read_concern  # type: ignore
+                if read_policy.read_concern is None
+                else ReadConcern(read_policy.read_concern)
+            ),
+        )
+        handles.append((options, handle))
+    return handle
+
+
+def _collection_options(collection: object) -> tuple:
+    return (
+        collection.codec_options,  # type: ignore
+        collection.read_preference,  # type: ignore
+        collection.write_concern,  # type: ignore
+        collection.read_concern,  # type: ignore
+    )
+
+
+def _read_preference(read_policy: ReadPolicy):
+    if read_policy.mode == "primary":
+        if read_policy.max_staleness is not None:
+            raise ValueError("max_staleness cannot be used with the primary read mode")
+        return Primary()
+    if read_policy.mode not in _READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference mode: {read_policy.mode}")
+    max_staleness = read_policy.max_staleness
+    return _READ_PREFERENCES[read_policy.mode](
+        max_staleness=-1 if max_staleness is None else max_staleness
+    )
@@ -0,0 +1,193 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from redb.core import Document
+from redb.core.serializers import get_serializer
+from redb.interface.errors import UnsupportedOperation
+from redb.json_system.aggregation import run_pipeline
+
+
+class Order(Document):
+    customer: str
+    total: float
+    items: list[str] = []
+    status: str = "open"
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.customer, cls.total]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_aggregated_orders"
+
+
+class Customer(Document):
+    name: str
+    city: str
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_aggregated_customers"
+
+
+class Spending(BaseModel):
+    id: str
+    total: float
+    orders: int
+
+
+@pytest.fixture
+def orders(json_client, db_path: Path):
+    paths = [db_path / Order.collection_name(), db_path / Customer.collection_name()]
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+    Order.insert_many(
+        [
+            Order(customer="ann", total=10, items=["pen", "ink"]),
+            Order(customer="ann", total=30, items=["pad"], status="closed"),
+            Order(customer="bob", total=5, items=[]),
+            Order(customer="cid", total=50, items=["pen"]),
+        ]
+    )
+    Customer.insert_many(
+        [Customer(name="ann", city="Rome"), Customer(name="bob", city="Oslo")]
+    )
+    yield
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def test_group_sort_limit(orders):
+    results = Order.aggregate(
+        [
+            {"$match": {"total": {"$gte": 10}}},
+            {
+                "$group": {
+                    "_id": "$customer",
+                    "total": {"$sum": "$total"},
+                    "orders": {"$sum": 1},
+                }
+            },
+            {"$sort": {"total": -1}},
+            {"$limit": 2},
+        ]
+    )
+    assert list(results) == [
+        {"_id": "cid", "total": 50, "orders": 1},
+        {"_id": "ann", "total": 40, "orders": 2},
+    ]
+
+
+def test_typed_results(orders):
+    results = Order.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": "$customer",
+                    "total": {"$sum": "$total"},
+                    "orders": {"$count": {}},
+                }
+            },
+            {"$project": {"id": "$_id", "total": 1, "orders": 1, "_id": 0}},
+            {"$sort": {"id": 1}},
+        ],
+        return_cls=Spending,
+    )
+    assert [(s.id, s.total, s.orders) for s in results] == [
+        ("ann", 40, 2),
+        ("bob", 5, 1),
+        ("cid", 50, 1),
+    ]
+
+
+def test_unwind_and_count(orders):
+    results = Order.aggregate(
+        [
+            {"$unwind": "$items"},
+            {"$group": {"_id": "$items", "customers": {"$addToSet": "$customer"}}},
+            {"$match": {"_id": "pen"}},
+            {"$project": {"customers": 1, "many": {"$size": "$customers"}}},
+        ]
+    )
+    [pen] = list(results)
+    assert sorted(pen["customers"]) == ["ann", "cid"] and pen["many"] == 2
+    closed = Order.aggregate([{"$match": {"status": "closed"}}, {"$count": "closed"}])
+    assert list(closed) == [{"closed": 1}]
+    lost = Order.aggregate([{"$match": {"status": "lost"}}, {"$count": "lost"}])
+    assert list(lost) == []
+
+
+def test_lookup(orders):
+    results = Order.aggregate(
+        [
+            {"$match": {"customer": {"$in": ["ann", "cid"]}, "status": "open"}},
+            {
+                "$lookup": {
+                    "from": Customer.collection_name(),
+                    "localField": "customer",
+                    "foreignField": "name",
+                    "as": "buyer",
+                }
+            },
+            {"$project": {"_id": 0, "customer": 1, "city": "$buyer.city"}},
+            {"$sort": {"customer": 1}},
+        ]
+    )
+    assert list(results) == [
+        {"customer": "ann", "city": ["Rome"]},
+        {"customer": "cid", "city": []},
+    ]
+
+
+def test_async_aggregate(orders):
+    async def run():
+        results = await Order.aaggregate(
+            [{"$group": {"_id": None, "total": {"$avg": "$total"}}}]
+        )
+        return [result async for result in results]
+
+    assert asyncio.run(run()) == [{"_id": None, "total": 23.75}]
+
+
+def test_pipeline_stages():
+    docs = [
+        {"_id": 1, "a": {"b": 2}, "tags": ["x", "y"]},
+        {"_id": 2, "a": {"b": 3}, "tags": []},
+        {"_id": 3},
+    ]
+    run = lambda pipeline: list(run_pipeline(iter(docs), pipeline, get_serializer()))
+
+    assert run([{"$project": {"a": 0, "tags": 0}}]) == [
+        {"_id": 1},
+        {"_id": 2},
+        {"_id": 3},
+    ]
+    assert run([{"$project": {"_id": 0, "b": "$a.b"}}]) == [{"b": 2}, {"b": 3}, {}]
+    assert run([{"$set": {"a.c": {"$multiply": ["$a.b", 2]}}}, {"$skip": 2}]) == [
+        {"_id": 3, "a": {"c": None}}
+    ]
+    assert run(
+        [
+            {"$unwind": {"path": "$tags", "preserveNullAndEmptyArrays": True}},
+            {"$unset": "a"},
+        ]
+    ) == [{"_id": 1, "tags": "x"}, {"_id": 1, "tags": "y"}, {"_id": 2}, {"_id": 3}]
+    assert run(
+        [{"$group": {"_id": None, "low": {"$min": "$a.b"}, "all": {"$push": "$a.b"}}}]
+    ) == [{"_id": None, "low": 2, "all": [2, 3]}]
+    # Left untouched
+    assert docs[0] == {"_id": 1, "a": {"b": 2}, "tags": ["x", "y"]}
+
+    with pytest.raises(UnsupportedOperation):
+        run([{"$facet": {}}])
+    with pytest.raises(UnsupportedOperation):
+        run([{"$group": {"_id": None, "top": {"$top": {}}}}])
@@ -0,0 +1,71 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.core.transaction import transaction
+
+
+class Task(Document):
+    name: str
+    done: bool = False
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_async_tasks"
+
+
+@pytest.fixture
+def tasks_path(json_client, db_path: Path):
+    path = db_path / Task.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_async_document_api(tasks_path: Path):
+    async def run():
+        tasks = [Task(name=f"Task {i}") for i in range(10)]
+        result = await Task.ainsert_many(tasks)
+        assert len(result.inserted_ids) == 10
+
+        found = await Task.afind_one({"name": "Task 3"})
+        assert found.id == tasks[3].id
+        await Task.aupdate_one({"_id": tasks[3].id}, {"done": True})
+        assert await Task.acount_documents({"done": True}) == 1
+
+        # Concurrent calls share the executor instead of blocking the loop
+        counts = await asyncio.gather(
+            *[Task.acount_documents({"name": task.name}) for task in tasks]
+        )
+        assert counts == [1] * 10
+
+        names = [task.name async for task in await Task.afind_many(iterate=True)]
+        assert sorted(names) == sorted(task.name for task in tasks)
+        batches = [len(batch) async for batch in await Task.afind_many(batch_size=4)]
+        assert batches == [4, 4, 2]
+
+        await Task.adelete_many({"done": False})
+        assert [task.name for task in await Task.afind_many()] == ["Task 3"]
+
+    asyncio.run(run())
+
+
+def test_async_collection_wrapper(tasks_path: Path):
+    async def run():
+        await Task(name="First").ainsert()
+        with transaction(Task) as tasks:
+            await tasks.ainsert_one(Task(name="Wrapped"))
+            found = await tasks.afind_one({"name": "Wrapped"})
+            assert found.done is False
+            assert len(await tasks.afind_many()) == 2
+            await tasks.adelete_one({"_id": found.id})
+            assert await tasks.acount_documents() == 1
+
+    asyncio.run(run())
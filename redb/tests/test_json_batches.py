@@ -0,0 +1,78 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from redb.core import RedB
+from redb.interface.configs import JSONConfig
+from redb.json_system.storage import FileStorage
+
+from .utils import Embedding, read_json
+
+
+@pytest.fixture
+def embeddings(client_path: Path, collection_path: Path):
+    RedB.setup(
+        JSONConfig(
+            client_folder_path=client_path,
+            default_database_folder_path="resources",
+            fsync="batch",
+        )
+    )
+    embeddings = [
+        Embedding(kb_name=f"KB{i}", model="ai", text=f"Data {i}", source_url="www")
+        for i in range(5)
+    ]
+    Embedding.insert_many(embeddings)
+    yield embeddings
+    Embedding.delete_many({"model": "ai"})
+
+
+@pytest.fixture
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_batches_leave_no_temporary_files(
+    collection_path: Path, embeddings: list[Embedding]
+):
+    assert not list(collection_path.glob(".*.tmp"))
+    assert Embedding.count_documents() == 5
+
+    result = Embedding.update_many({"model": "ai"}, {"vector": [1.0, 2.0]})
+    assert result.matched_count == 5
+    for embedding in embeddings:
+        doc = read_json(collection_path / f"{embedding.id}.json")
+        assert doc["vector"] == [1.0, 2.0]
+        assert "$set" not in doc
+    assert not list(collection_path.glob(".*.tmp"))
+
+
+def test_interrupted_batch_is_recovered(client_path: Path, dead_pid: int):
+    path = client_path / "wal_recovery"
+    shutil.rmtree(path, ignore_errors=True)
+    wal = path / ".redb" / "wal"
+    wal.mkdir(parents=True)
+
+    # A batch whose writer died after logging it but before publishing "b"
+    token = f"{dead_pid}-0"
+    (path / "a.json").write_text(json.dumps({"_id": "a"}))
+    (path / f".b.json.{token}.tmp").write_text(json.dumps({"_id": "b"}))
+    renames = [[f".{name}.{token}.tmp", name] for name in ("a.json", "b.json")]
+    (wal / f"{token}.json").write_text(json.dumps(renames))
+    # And one that died before logging it
+    (path / f".c.json.{dead_pid}-1.tmp").write_text(json.dumps({"_id": "c"}))
+
+    try:
+        storage = FileStorage(path, write_ahead_log=True)
+        assert sorted(storage.ids()) == ["a", "b"]
+        assert storage.read("b") == {"_id": "b"}
+        assert not list(wal.iterdir())
+        assert not list(path.glob(".*.tmp"))
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
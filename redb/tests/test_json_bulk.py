@@ -0,0 +1,131 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+from redb.core import Document
+from redb.interface.errors import BulkWriteError
+
+
+class Item(Document):
+    name: str
+    stock: int
+    shelf: str
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_items"
+
+
+@pytest.fixture
+def items(json_client, db_path: Path) -> list[Item]:
+    items = [
+        Item(name="bolt", stock=10, shelf="A"),
+        Item(name="nut", stock=0, shelf="A"),
+        Item(name="gear", stock=5, shelf="B"),
+    ]
+    Item.insert_many(items)
+    yield items
+    shutil.rmtree(db_path / "json_items", ignore_errors=True)
+
+
+def test_bulk_write(items: list[Item]):
+    bolt, nut, gear = items
+    washer = Item(name="washer", stock=7, shelf="C")
+    result = Item.bulk_write(
+        [
+            InsertOne(washer.dict()),
+            UpdateMany({"shelf": "A"}, {"$set": {"shelf": "D"}}),
+            # Sees the previous operation's changes
+            UpdateOne({"shelf": "D", "stock": 0}, {"$set": {"stock": 3}}),
+            UpdateOne({"_id": gear.id}, {"$set": {"stock": 5}}),
+            ReplaceOne(
+                {"name": "washer"}, {"name": "washer", "stock": 1, "shelf": "C"}
+            ),
+            DeleteOne({"_id": bolt.id}),
+            UpdateOne(
+                {"name": "spring"}, {"$set": {"stock": 2, "shelf": "E"}}, upsert=True
+            ),
+            DeleteMany({"stock": {"$gt": 100}}),
+        ]
+    )
+
+    assert result.inserted_count == 1
+    assert result.matched_count == 5
+    # Setting gear's stock to the value it already had is not a modification
+    assert result.modified_count == 4
+    assert result.deleted_count == 1
+    assert result.upserted_count == 1
+    assert list(result.upserted_ids) == [6]
+
+    stock = {item.name: (item.stock, item.shelf) for item in Item.find_many()}
+    assert stock == {
+        "nut": (3, "D"),
+        "gear": (5, "B"),
+        "washer": (1, "C"),
+        "spring": (2, "E"),
+    }
+    assert Item.find_one({"name": "washer"}).id == washer.id
+    spring = Item.find_one({"name": "spring"})
+    assert spring.id == result.upserted_ids[6]
+
+
+def test_bulk_write_rejects_existing_ids(items: list[Item]):
+    with pytest.raises(ValueError):
+        Item.bulk_write(
+            [
+                DeleteOne({"_id": items[1].id}),
+                InsertOne(items[0].dict()),
+            ]
+        )
+    # Nothing is written when an operation fails
+    assert Item.count_documents() == 3
+
+
+def test_unordered_bulk_write(items: list[Item]):
+    washer = Item(name="washer", stock=7, shelf="C")
+    with pytest.raises(BulkWriteError) as error:
+        Item.bulk_write(
+            [
+                DeleteOne({"_id": items[1].id}),
+                InsertOne(items[0].dict()),
+                InsertOne(washer.dict()),
+                UpdateOne({"_id": items[2].id}, {"$push": {"stock": 1}}),
+            ],
+            ordered=False,
+        )
+    # The operations that did not fail are written
+    assert sorted(error.value.errors) == [1, 3]
+    assert isinstance(error.value.errors[1], ValueError)
+    result = error.value.result
+    assert (result.deleted_count, result.inserted_count) == (1, 1)
+    assert sorted(item.name for item in Item.find_many()) == ["bolt", "gear", "washer"]
+
+
+class Note(Document):
+    text: str
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_notes"
+
+
+def test_bulk_write_generates_ids_once(json_client, db_path: Path):
+    shutil.rmtree(db_path / "json_notes", ignore_errors=True)
+    # Ids hash the timestamps too, so every new Note has a different one
+    result = Note.bulk_write(
+        [
+            InsertOne({"text": "a"}),
+            UpdateOne({"text": "b"}, {"$set": {"text": "b"}}, upsert=True),
+        ]
+    )
+    assert (result.inserted_count, result.upserted_count) == (1, 1)
+    notes = {note.text: note.id for note in Note.find_many()}
+    assert notes.keys() == {"a", "b"}
+    assert notes["b"] == result.upserted_ids[1]
+    shutil.rmtree(db_path / "json_notes", ignore_errors=True)
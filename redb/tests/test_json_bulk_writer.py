@@ -0,0 +1,94 @@
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.interface.errors import BulkWriteError, CannotUpdateIdentifyingField
+
+
+class Reading(Document):
+    sensor: str
+    value: float = 0.0
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.sensor]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_buffered_readings"
+
+
+@pytest.fixture
+def readings(json_client, db_path: Path):
+    path = db_path / Reading.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_flushes_on_max_ops(readings: Path):
+    with Reading.bulk_writer(max_ops=10) as writer:
+        futures = [writer.insert(Reading(sensor=f"s{i}")) for i in range(25)]
+        # Two full batches were sent, the rest waits for the exit
+        assert Reading.count_documents() == 20
+        assert futures[0].result() == Reading(sensor="s0").id
+        assert not futures[-1].done()
+    assert Reading.count_documents() == 25
+    assert writer.result.inserted_count == 25
+
+
+def test_generated_ids(readings: Path):
+    with Reading.bulk_writer() as writer:
+        future = writer.insert_one({"sensor": "s0"})
+    assert future.result() == Reading(sensor="s0").id
+    assert Reading.find_one({"_id": future.result()}).sensor == "s0"
+
+
+def test_flushes_on_max_bytes(readings: Path):
+    with Reading.bulk_writer(max_bytes=200) as writer:
+        for i in range(10):
+            writer.insert(Reading(sensor=f"s{i}"))
+        assert Reading.count_documents() > 0
+
+
+def test_flushes_on_interval(readings: Path):
+    with Reading.bulk_writer(flush_interval=0.05) as writer:
+        future = writer.insert(Reading(sensor="s0"))
+        future.result(timeout=5)
+        assert Reading.count_documents() == 1
+        time.sleep(0.1)
+
+
+def test_updates_and_deletes(readings: Path):
+    Reading.insert_many([Reading(sensor=f"s{i}") for i in range(3)])
+    with Reading.bulk_writer() as writer:
+        writer.update_one({"sensor": "s0"}, {"value": 1.5})
+        writer.update_many({"value": 0.0}, {"value": 2.5})
+        writer.delete_one({"sensor": "s2"})
+        upserted = writer.update_one(
+            {"_id": "s3", "sensor": "s3"}, {"value": 3.5}, upsert=True
+        )
+        with pytest.raises(CannotUpdateIdentifyingField):
+            writer.update_one({"sensor": "s0"}, {"sensor": "s9"})
+    assert upserted.result() == "s3"
+    values = {reading.sensor: reading.value for reading in Reading.find_many()}
+    assert values == {"s0": 1.5, "s1": 2.5, "s3": 3.5}
+
+
+def test_errors_map_to_operations(readings: Path):
+    existing = Reading(sensor="s0")
+    existing.insert()
+    with pytest.raises(BulkWriteError) as error:
+        with Reading.bulk_writer() as writer:
+            writer.insert(Reading(sensor="s1"))
+            duplicate = writer.insert(existing)
+            writer.insert(Reading(sensor="s2"))
+
+    assert list(error.value.errors) == [1]
+    with pytest.raises(ValueError):
+        duplicate.result()
+    assert error.value.result.inserted_count == 2
+    assert Reading.count_documents() == 3
@@ -0,0 +1,77 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document, RedB
+from redb.interface.configs import JSONConfig
+from redb.json_system.cache import DocumentCache, get_document_cache
+from redb.json_system.storage import FileStorage
+
+
+class Note(Document):
+    title: str
+    body: str = ""
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_cached_notes"
+
+
+@pytest.fixture
+def notes_path(client_path: Path, db_path: Path):
+    path = db_path / Note.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    RedB.setup(
+        JSONConfig(
+            client_folder_path=client_path,
+            default_database_folder_path="resources",
+            document_cache_bytes=1024 * 1024,
+        )
+    )
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_reads_are_cached(notes_path: Path):
+    notes = [Note(title=f"Note {i}") for i in range(3)]
+    Note.insert_many(notes)
+    # Built along with the storage of the collection
+    cache = get_document_cache(notes_path, 0)
+    cache.clear()
+    hits, misses = cache.hits, cache.misses
+
+    assert len(Note.find_many()) == 3
+    assert (cache.hits - hits, cache.misses - misses, len(cache)) == (0, 3, 3)
+    assert len(Note.find_many()) == 3
+    assert (cache.hits - hits, cache.misses - misses) == (3, 3)
+
+    # Written through redb: only that document is parsed again
+    Note.update_one({"_id": notes[1].id}, {"body": "changed"})
+    hits, misses = cache.hits, cache.misses
+    assert sorted(note.body for note in Note.find_many()) == ["", "", "changed"]
+    assert (cache.hits - hits, cache.misses - misses) == (2, 1)
+
+    # Rewritten by someone else: caught by its size and mtime
+    FileStorage(notes_path).write([{**notes[2].dict(by_alias=True), "body": "outside"}])
+    assert Note.find_one({"_id": notes[2].id}).body == "outside"
+
+
+def test_cache_is_bounded():
+    cache = DocumentCache(max_bytes=300)
+    docs = [{"_id": i, "text": "x" * 100} for i in range(4)]
+    for i, doc in enumerate(docs):
+        cache.put((f"/{i}.json", 1, 100), doc)
+    assert 0 < cache.size <= 300
+    assert len(cache) < 4
+    assert cache.get(("/0.json", 1, 100)) is None
+    assert cache.get(("/3.json", 1, 100)) == docs[3]
+
+    hit = cache.get(("/3.json", 1, 100))
+    hit["text"] = "changed"
+    assert cache.get(("/3.json", 1, 100)) == docs[3]
+    assert cache.get(("/3.json", 2, 100)) is None
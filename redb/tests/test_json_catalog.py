@@ -0,0 +1,66 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from redb.json_system.catalog import Catalog, get_catalog
+
+from .utils import Embedding, remove_document
+
+
+@pytest.fixture
+def embeddings():
+    return [
+        Embedding(
+            kb_name=f"KB{i}",
+            model="ai",
+            text=f"Some data {i}.",
+            source_url="www",
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def inserted(json_client, collection_path: Path, embeddings: list[Embedding]):
+    Embedding.insert_many(embeddings)
+    yield embeddings
+    for embedding in embeddings:
+        if (collection_path / f"{embedding.id}.json").is_file():
+            remove_document(collection_path, embedding.id)
+
+
+def test_catalog_tracks_writes(collection_path: Path, inserted: list[Embedding]):
+    catalog = get_catalog(collection_path)
+    assert set(catalog.ids()) == {e.id for e in inserted}
+
+    Embedding.delete_one(inserted[0])
+    assert inserted[0].id not in catalog
+    assert Embedding.count_documents() == 2
+    assert Embedding.find_one(filter={"kb_name": "KB1"}) == inserted[1]
+
+
+def test_catalog_is_persisted(collection_path: Path, inserted: list[Embedding]):
+    # A fresh catalog (as in another process) loads the log instead of scanning
+    fresh = Catalog(collection_path)
+    assert set(fresh.ids()) == {e.id for e in inserted}
+
+
+def test_catalog_detects_outside_changes(
+    collection_path: Path, inserted: list[Embedding]
+):
+    remove_document(collection_path, inserted[0].id)
+    assert Embedding.count_documents() == 2
+
+    outsider = inserted[0].dict()
+    outsider["_id"] = "outsider"
+    with open(collection_path / "outsider.json", "w") as f:
+        json.dump(outsider, f)
+    try:
+        assert Embedding.count_documents() == 3
+        found = Embedding.find_one(filter={"kb_name": "KB0"})
+        assert found.id == "outsider"
+    finally:
+        os.remove(collection_path / "outsider.json")
+    assert Embedding.count_documents() == 2
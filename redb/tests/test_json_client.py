@@ -1,8 +1,14 @@
 import json
+import os
+import shutil
 from pathlib import Path
 
 import pytest
 
+from redb.core import RedB
+from redb.json_system.catalog import get_catalog
+from redb.json_system.storage import FileStorage
+
 from .utils import Embedding, read_json, remove_document
 
 
@@ -116,3 +122,99 @@ def test_delete_one(json_client, collection_path: Path, embedding: Embedding):
     Embedding.delete_one(embedding)
     with pytest.raises(AssertionError):
         assert (collection_path / f"{embedding.id}.json").is_file()
+
+
+def test_find_reads_in_order_up_to_limit(
+    json_client, collection_path: Path, monkeypatch
+):
+    embeddings = [
+        Embedding(kb_name=f"KB{i}", model="ai", text=f"Data {i}", source_url="www")
+        for i in range(10)
+    ]
+    Embedding.insert_many(embeddings)
+
+    reads = []
+    read_raw = FileStorage.read_raw
+
+    def counting_read(self, id):
+        reads.append(id)
+        return read_raw(self, id)
+
+    monkeypatch.setattr(FileStorage, "read_raw", counting_read)
+    collection = Embedding._get_collection(Embedding)
+    try:
+        found = collection.find(Embedding, Embedding, limit=3)
+        assert len(reads) == 3
+        ids = get_catalog(collection_path).ids()
+        assert [e.id for e in found] == ids[:3]
+        assert [e.id for e in collection.find(Embedding, Embedding, skip=2)] == ids[2:]
+    finally:
+        for embedding in embeddings:
+            remove_document(collection_path, embedding.id)
+
+
+def test_find_many_streams(json_client, collection_path: Path):
+    embeddings = [
+        Embedding(kb_name=f"KB{i}", model="ai", text=f"Data {i}", source_url="www")
+        for i in range(5)
+    ]
+    Embedding.insert_many(embeddings)
+    try:
+        ids = {e.id for e in embeddings}
+        found = Embedding.find_many(iterate=True)
+        assert not isinstance(found, list)
+        assert {e.id for e in found} == ids
+
+        batches = list(Embedding.find_many(batch_size=2))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert {e.id for batch in batches for e in batch} == ids
+        assert len(Embedding.find_many(limit=4)) == 4
+    finally:
+        for embedding in embeddings:
+            remove_document(collection_path, embedding.id)
+
+
+def test_handles_are_reused(json_client, client_path: Path, monkeypatch):
+    client = RedB.get_client()
+    database = client.get_default_database()
+    assert Embedding._get_collection(Embedding) is database["embedding"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Folders should not be listed again")
+
+    (client_path / "other-database").mkdir(parents=True, exist_ok=True)
+    # Listings of folders changed just now are not trusted yet
+    os.utime(client_path, ns=(0, os.stat(client_path).st_mtime_ns - 10**9))
+    try:
+        assert client.get_database("other-database") is client.get_database(
+            "other-database"
+        )
+        monkeypatch.setattr(os, "scandir", fail)
+        assert client.get_database("other-database").name == "other-database"
+        assert Embedding._get_collection(Embedding) is database["embedding"]
+    finally:
+        monkeypatch.undo()
+        assert client.drop_database("other-database")
+
+    with pytest.raises(ValueError):
+        client.get_database("other-database")
+
+
+def test_handles_of_deleted_folders(json_client, client_path: Path):
+    client = RedB.get_client()
+    (client_path / "shared-database" / "shared").mkdir(parents=True, exist_ok=True)
+    try:
+        database = client.get_database("shared-database")
+        assert database.get_collection("shared") is database.get_collection("shared")
+
+        # Deleted by another process, bypassing this client
+        shutil.rmtree(client_path / "shared-database" / "shared")
+        assert database.get_collections() == []
+        with pytest.raises(ValueError):
+            database.get_collection("shared")
+
+        shutil.rmtree(client_path / "shared-database")
+        with pytest.raises(ValueError):
+            client.get_database("shared-database")
+    finally:
+        shutil.rmtree(client_path / "shared-database", ignore_errors=True)
@@ -0,0 +1,57 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.json_system.codecs import get_codec
+from redb.json_system.storage import FileStorage
+
+
+@pytest.fixture
+def storage_path(client_path: Path):
+    path = client_path / "compressed"
+    shutil.rmtree(path, ignore_errors=True)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_compressed_documents(storage_path: Path, codec: str):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+
+    docs = [
+        {"_id": f"doc{i}", "text": "lorem ipsum " * 200, "vector": [0.125] * 64}
+        for i in range(3)
+    ]
+    storage = FileStorage(storage_path, codec=get_codec(codec))
+    storage.write(docs)
+
+    suffix = get_codec(codec).suffix
+    assert sorted(path.name for path in storage_path.glob("doc*")) == [
+        f"doc{i}{suffix}" for i in range(3)
+    ]
+    assert (storage_path / f"doc0{suffix}").stat().st_size < len(docs[0]["text"]) / 5
+    assert storage.read("doc1") == docs[1]
+    assert sorted(storage.ids()) == ["doc0", "doc1", "doc2"]
+
+
+def test_mixed_codecs(storage_path: Path):
+    FileStorage(storage_path).write([{"_id": "a", "n": 1}, {"_id": "b", "n": 2}])
+
+    compressed = FileStorage(storage_path, codec=get_codec("zlib"))
+    assert compressed.read("a") == {"_id": "a", "n": 1}
+    compressed.write([{"_id": "a", "n": 3}, {"_id": "c", "n": 4}])
+    assert sorted(path.name for path in storage_path.iterdir() if path.is_file()) == [
+        "a.json.zlib",
+        "b.json",
+        "c.json.zlib",
+    ]
+
+    plain = FileStorage(storage_path)
+    assert [plain.read(id)["n"] for id in ("a", "b", "c")] == [3, 2, 4]
+    assert sorted(plain.ids()) == ["a", "b", "c"]
+
+    plain.delete(["a"])
+    assert not compressed.exists("a")
+    assert sorted(compressed.ids()) == ["b", "c"]
@@ -0,0 +1,144 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from redb.core import CompoundIndex, Document, Index
+from redb.interface.errors import UniqueConstraintViolation
+from redb.json_system.indexes import CollectionIndexes, get_indexes
+from redb.json_system.query import Query
+from redb.json_system.storage import FileStorage
+
+
+class Owner(BaseModel):
+    name: str
+    city: str
+
+
+class Cat(Document):
+    name: str
+    age: int
+    breed: str
+    owner: Owner
+
+    @classmethod
+    def get_indexes(cls) -> list[Index | CompoundIndex]:
+        return [
+            Index(cls.name, unique=True),  # type: ignore
+            CompoundIndex([cls.breed, cls.owner.city]),  # type: ignore
+        ]
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name, cls.age]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_cats"
+
+
+@pytest.fixture
+def cats_path(json_client, db_path: Path):
+    path = db_path / "json_cats"
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def cats(cats_path: Path) -> list[Cat]:
+    cats = [
+        Cat(
+            name="Tom", age=3, breed="Persian", owner=Owner(name="Ana", city="Goiania")
+        ),
+        Cat(
+            name="Kitty", age=2, breed="Persian", owner=Owner(name="Bia", city="Recife")
+        ),
+        Cat(
+            name="Frajola",
+            age=5,
+            breed="Siamese",
+            owner=Owner(name="Ana", city="Goiania"),
+        ),
+    ]
+    Cat.create_indexes()
+    Cat.insert_many(cats)
+    return cats
+
+
+def test_create_indexes(cats_path: Path, cats: list[Cat]):
+    indexes = get_indexes(cats_path, FileStorage(cats_path))
+    names = {index.name for index in indexes}
+    assert names == {
+        "ascending_unique_name_index",
+        "ascending_breed_owner_city_index",
+    }
+    for name in names:
+        assert (cats_path / ".redb" / "indexes" / f"{name}.idx").is_file()
+
+
+def test_find_uses_index(cats_path: Path, cats: list[Cat]):
+    indexes = get_indexes(cats_path, FileStorage(cats_path))
+    index = indexes.get("ascending_breed_owner_city_index")
+    assert index.lookup(["Persian", "Goiania"]) == [cats[0].id]
+
+    found = Cat.find_one({"breed": "Persian", "owner.city": "Goiania"})
+    assert found.id == cats[0].id
+    assert Cat.count_documents({"name": "Kitty"}) == 1
+    assert set(Cat.distinct("breed", {"owner.city": "Goiania"})) == {
+        "Persian",
+        "Siamese",
+    }
+
+
+def test_index_follows_writes(cats_path: Path, cats: list[Cat]):
+    indexes = get_indexes(cats_path, FileStorage(cats_path))
+    index = indexes.get("ascending_unique_name_index")
+
+    Cat.update_one({"_id": cats[0].id}, {"breed": "Siamese"})
+    assert Cat.count_documents({"breed": "Siamese", "owner.city": "Goiania"}) == 2
+
+    result = Cat.delete_many({"breed": "Siamese", "owner.city": "Goiania"})
+    assert result.deleted_count == 2
+    assert index.ids() == {cats[1].id}
+
+
+def test_unique_index(cats: list[Cat]):
+    tom_again = Cat(
+        name="Tom", age=1, breed="Sphynx", owner=Owner(name="Caio", city="Natal")
+    )
+    with pytest.raises(UniqueConstraintViolation) as e:
+        Cat.insert_one(tom_again)
+    assert e.value.collection_name == "json_cats"
+    assert e.value.dup_keys == [{"name": "Tom"}]
+
+
+def test_indexes_are_persisted(cats_path: Path, cats: list[Cat]):
+    # Fresh handles, as in another process
+    indexes = CollectionIndexes(cats_path, FileStorage(cats_path))
+    index = indexes.get("ascending_unique_name_index")
+    assert index.ids() == {cat.id for cat in cats}
+    assert index.lookup(["Frajola"]) == [cats[2].id]
+
+
+def test_indexes_narrow_operator_queries(cats_path: Path, cats: list[Cat]):
+    indexes = get_indexes(cats_path, FileStorage(cats_path))
+    tom, kitty, frajola = cats
+
+    scan = indexes.choose(Query({"name": {"$in": ["Tom", "Kitty"]}, "age": 3}))
+    assert scan.clauses == ["name"]
+    assert sorted(scan.ids) == sorted([tom.id, kitty.id])
+
+    scan = indexes.choose(Query({"breed": "Persian", "owner.city": "Recife"}))
+    assert scan.clauses == ["breed", "owner.city"]
+    assert scan.ids == [kitty.id]
+
+    # Range scans are inclusive, the query itself then drops "Kitty"
+    scan = indexes.choose(Query({"name": {"$gt": "Kitty", "$lte": "Tom"}}))
+    assert sorted(scan.ids) == sorted([tom.id, kitty.id])
+    assert indexes.choose(Query({"age": {"$gt": 1}})) is None
+
+    found = Cat.find_many({"name": {"$gte": "K"}, "age": {"$lt": 5}})
+    assert sorted(cat.name for cat in found) == ["Kitty", "Tom"]
+    found = Cat.find_many({"$or": [{"breed": "Siamese"}, {"owner.name": "Bia"}]})
+    assert sorted(cat.name for cat in found) == ["Frajola", "Kitty"]
@@ -0,0 +1,129 @@
+import multiprocessing
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document, Index, RedB
+from redb.interface.configs import JSONConfig
+from redb.interface.errors import DocumentNotFound, UniqueConstraintViolation
+from redb.json_system.catalog import get_catalog
+from redb.json_system.storage import FileStorage
+
+WORKERS = 4
+
+
+class Counter(Document):
+    name: str
+    hits: int = 0
+
+    @classmethod
+    def get_indexes(cls) -> list[Index]:
+        return [Index(cls.name, unique=True)]  # type: ignore
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_locked_counters"
+
+
+class Claim(Counter):
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name, cls.hits]
+
+
+def _setup(client_path: Path) -> None:
+    RedB.setup(
+        JSONConfig(
+            client_folder_path=client_path,
+            default_database_folder_path="resources",
+        )
+    )
+
+
+def _increment(client_path: Path, worker: int, times: int) -> None:
+    _setup(client_path)
+    # Straight to the collection, documents would narrow the filter to the _id
+    collection = Document._get_collection(Counter)
+    for _ in range(times):
+        # Compare and set: the filter is checked again once the document is locked
+        while True:
+            counter = Counter.find_one({"name": "shared"})
+            try:
+                collection.update_one(
+                    cls=Counter,
+                    filter={"_id": counter.id, "hits": counter.hits},
+                    update={"$set": {"hits": counter.hits + 1}},
+                )
+                break
+            except DocumentNotFound:
+                continue
+
+
+def _claim(client_path: Path, worker: int, results) -> None:
+    _setup(client_path)
+    try:
+        Claim(name="shared", hits=worker).insert()
+        results.put("inserted")
+    except UniqueConstraintViolation:
+        results.put("duplicate")
+
+
+def _insert(client_path: Path, worker: int, count: int) -> None:
+    _setup(client_path)
+    Counter.insert_many([Counter(name=f"{worker}-{i}") for i in range(count)])
+    Counter.delete_one({"name": f"{worker}-0"})
+
+
+def _run(target, *args) -> None:
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=target, args=(args[0], worker, *args[1:]))
+        for worker in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+
+@pytest.fixture
+def counters_path(client_path: Path, db_path: Path):
+    path = db_path / Counter.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    _setup(client_path)
+    Counter.create_indexes()
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_concurrent_updates(client_path: Path, counters_path: Path):
+    Counter(name="shared").insert()
+    _run(_increment, client_path, 25)
+    assert Counter.find_one({"name": "shared"}).hits == WORKERS * 25
+
+
+def test_concurrent_unique_inserts(client_path: Path, counters_path: Path):
+    results = multiprocessing.get_context("spawn").Queue()
+    _run(_claim, client_path, results)
+    outcomes = sorted(results.get(timeout=10) for _ in range(WORKERS))
+    assert outcomes == ["duplicate"] * (WORKERS - 1) + ["inserted"]
+    assert Counter.count_documents({"name": "shared"}) == 1
+
+
+def test_concurrent_inserts_keep_catalog(client_path: Path, counters_path: Path):
+    _run(_insert, client_path, 30)
+    names = sorted(counter.name for counter in Counter.find_many())
+    assert len(names) == WORKERS * 29
+    assert all(not name.endswith("-0") for name in names)
+    assert sorted(get_catalog(counters_path).ids()) == sorted(
+        FileStorage(counters_path).ids()
+    )
+    assert sorted(get_catalog(counters_path).ids()) == sorted(
+        counter.id for counter in Counter.find_many()
+    )
@@ -0,0 +1,83 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document, RedB
+from redb.interface.configs import JSONConfig
+from redb.interface.errors import UnsupportedOperation
+from redb.json_system.packed import PACK_FILE, PackedStorage, pack_collection
+
+
+class Article(Document):
+    title: str
+    words: int
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_articles"
+
+
+class PackedArticle(Article):
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_packed_articles"
+
+
+def setup_client(client_path: Path, storage: str) -> None:
+    RedB.setup(
+        JSONConfig(
+            client_folder_path=client_path,
+            default_database_folder_path="resources",
+            storage=storage,  # type: ignore
+        )
+    )
+
+
+@pytest.fixture
+def packed_path(client_path: Path, db_path: Path):
+    source = db_path / Article.collection_name()
+    packed = db_path / PackedArticle.collection_name()
+    for path in (source, packed):
+        shutil.rmtree(path, ignore_errors=True)
+    yield source, packed
+    for path in (source, packed):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def test_packed_snapshot(client_path: Path, packed_path: tuple[Path, Path]):
+    source, packed = packed_path
+    setup_client(client_path, "files")
+    articles = [Article(title=f"Article {i}", words=i * 100) for i in range(20)]
+    Article.insert_many(articles)
+
+    assert pack_collection(source, destination=packed) == 20
+    assert [path.name for path in packed.iterdir()] == [PACK_FILE]
+
+    setup_client(client_path, "packed")
+    for article in articles:
+        found = PackedArticle.find_one({"_id": article.id})
+        assert (found.title, found.words) == (article.title, article.words)
+    assert PackedArticle.count_documents() == 20
+    assert len(PackedArticle.find_many({"words": {"$gte": 1500}})) == 5
+    assert PackedArticle.count_documents({"_id": "missing"}) == 0
+
+    with pytest.raises(UnsupportedOperation):
+        PackedArticle(title="New", words=1).insert()
+    with pytest.raises(UnsupportedOperation):
+        PackedArticle.delete_one({"_id": articles[0].id})
+    assert PackedArticle.count_documents() == 20
+
+
+def test_empty_snapshot(db_path: Path, packed_path: tuple[Path, Path]):
+    source, packed = packed_path
+    assert pack_collection(source, destination=packed) == 0
+    storage = PackedStorage(packed)
+    assert len(storage) == 0
+    assert storage.ids() == []
+    assert storage.read("anything") is None
+    storage.close()
@@ -0,0 +1,97 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.core.pagination import _seek_filter, keyset_sort, page_query
+from redb.interface.fields import Direction, SortColumn
+
+
+class Event(Document):
+    name: str
+    day: int
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_paginated_events"
+
+
+@pytest.fixture
+def events(json_client, db_path: Path):
+    path = db_path / Event.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    # Days repeat, so pages break ties on _id
+    Event.insert_many([Event(name=f"event {i:02}", day=i // 3) for i in range(10)])
+    yield sorted(
+        Event.find_many(), key=lambda event: (event.day, event.id), reverse=True
+    )
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_forward_and_backward(events: list[Event]):
+    sort = SortColumn(name="day", direction=Direction.DESCENDING)
+    pages = [Event.paginate(sort=sort, page_size=4)]
+    while pages[-1].next is not None:
+        pages.append(Event.paginate(sort=sort, page_size=4, after=pages[-1].next))
+
+    assert [[event.id for event in page.items] for page in pages] == [
+        [event.id for event in events[:4]],
+        [event.id for event in events[4:8]],
+        [event.id for event in events[8:]],
+    ]
+    assert pages[0].previous is None and pages[1].previous is not None
+
+    back = Event.paginate(sort=sort, page_size=4, before=pages[2].previous)
+    assert back.items == pages[1].items
+    assert back.next == pages[1].next
+    back = Event.paginate(sort=sort, page_size=4, before=back.previous)
+    assert back.items == pages[0].items
+    assert back.previous is None
+
+
+def test_filter_and_default_sort(events: list[Event]):
+    by_id = sorted(
+        (event for event in events if event.day < 3), key=lambda event: event.id
+    )
+    first = Event.paginate({"day": {"$lt": 3}}, page_size=5)
+    second = Event.paginate({"day": {"$lt": 3}}, page_size=5, after=first.next)
+    assert first.items + second.items == by_id
+    assert (len(second.items), second.next) == (4, None)
+
+
+def test_async_paginate(events: list[Event]):
+    async def run():
+        first = await Event.apaginate(page_size=6)
+        return first, await Event.apaginate(page_size=6, after=first.next)
+
+    first, second = asyncio.run(run())
+    assert len(first.items + second.items) == len(events)
+
+
+def test_cursor_checks(events: list[Event]):
+    page = Event.paginate(page_size=2)
+    sort = SortColumn(name="day", direction=Direction.ASCENDING)
+    with pytest.raises(ValueError):
+        Event.paginate(sort=sort, after=page.next)
+    with pytest.raises(ValueError):
+        Event.paginate(after="not a cursor")
+    with pytest.raises(ValueError):
+        Event.paginate(after=page.next, before=page.next)
+
+
+def test_seek_filter():
+    sort = keyset_sort([("day", -1)])
+    assert sort == [("day", -1), ("_id", -1)]
+    assert _seek_filter(sort, [2, "b"]) == {
+        "day": {"$lte": 2},
+        "$or": [{"day": {"$lt": 2}}, {"day": 2, "_id": {"$lt": "b"}}],
+    }
+    assert _seek_filter([("_id", 1)], ["b"]) == {"_id": {"$gt": "b"}}
+    unchanged = page_query({"name": "x"}, [("_id", 1)], None, None)
+    assert unchanged == ({"name": "x"}, [("_id", 1)])
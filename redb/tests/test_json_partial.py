@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from redb.json_system.partial import extract_fields
+
+from .utils import Embedding, remove_document
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_extract_fields(indent: int | None):
+    doc = {
+        "_id": "a",
+        "text": 'A "quoted" {tricky} [text] \\ with, separators',
+        "vector": [0.5, -1e-3, [1, {"a": "]"}]],
+        "meta": {"nested": {"key": None}, "flag": True},
+        "count": 3,
+    }
+    data = json.dumps(doc, indent=indent).encode()
+
+    assert extract_fields(data, {"count", "_id"}, json.loads) == {
+        "_id": "a",
+        "count": 3,
+    }
+    assert extract_fields(data, {"meta", "missing"}, json.loads) == {
+        "meta": doc["meta"]
+    }
+    assert extract_fields(data, set(doc), json.loads) == doc
+    assert extract_fields(b"{}", {"a"}, json.loads) == {}
+
+    with pytest.raises(ValueError):
+        extract_fields(b"[1, 2]", {"a"}, json.loads)
+
+
+def test_count_and_distinct_skip_models(
+    json_client, collection_path: Path, monkeypatch
+):
+    embeddings = [
+        Embedding(kb_name=f"KB{i % 2}", model="ai", text=f"Data {i}", source_url="www")
+        for i in range(4)
+    ]
+    Embedding.insert_many(embeddings)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Documents should not be built")
+
+    monkeypatch.setattr(Embedding, "__init__", fail)
+    try:
+        assert Embedding.count_documents({"kb_name": "KB1"}) == 2
+        assert sorted(Embedding.distinct("kb_name")) == ["KB0", "KB1"]
+        assert sorted(Embedding.distinct("text", {"kb_name": "KB0"})) == [
+            "Data 0",
+            "Data 2",
+        ]
+    finally:
+        monkeypatch.undo()
+        for embedding in embeddings:
+            remove_document(collection_path, embedding.id)
@@ -0,0 +1,64 @@
+import pytest
+
+from redb.interface.errors import UnsupportedOperation
+from redb.json_system.query import Query, _compile
+
+DOCS = [
+    {"_id": 1, "name": "ana", "age": 30, "tags": ["a", "b"], "meta": {"level": 2}},
+    {"_id": 2, "name": "bia", "age": 20, "tags": ["b"], "meta": {"level": 5}},
+    {"_id": 3, "name": "caio", "age": None, "scores": [{"v": 1}, {"v": 9}]},
+    {"_id": 4, "name": "Davi", "age": True, "tags": []},
+]
+
+
+@pytest.mark.parametrize(
+    "filter, expected",
+    [
+        ({}, [1, 2, 3, 4]),
+        ({"age": 30}, [1]),
+        ({"age": 1}, []),
+        ({"age": None}, [3]),
+        ({"meta.level": {"$gte": 2, "$lt": 5}}, [1]),
+        ({"age": {"$gt": 10}}, [1, 2]),
+        ({"age": {"$ne": 30}}, [2, 3, 4]),
+        ({"tags": "b"}, [1, 2]),
+        ({"tags": ["b"]}, [2]),
+        ({"tags": {"$in": ["a", "z"]}}, [1]),
+        ({"name": {"$nin": ["ana", "bia"]}}, [3, 4]),
+        ({"tags": {"$size": 0}}, [4]),
+        ({"tags": {"$all": ["a", "b"]}}, [1]),
+        ({"scores": {"$exists": True}}, [3]),
+        ({"meta": {"$exists": False}}, [3, 4]),
+        ({"name": {"$regex": "^d", "$options": "i"}}, [4]),
+        ({"name": {"$not": {"$regex": "a$"}}}, [3, 4]),
+        ({"scores": {"$elemMatch": {"v": {"$gt": 5}}}}, [3]),
+        ({"tags": {"$elemMatch": {"$eq": "a"}}}, [1]),
+        ({"scores.v": 9}, [3]),
+        ({"$or": [{"age": 20}, {"name": "caio"}]}, [2, 3]),
+        ({"$and": [{"tags": "b"}, {"age": {"$lte": 25}}]}, [2]),
+        ({"$nor": [{"tags": "b"}, {"age": None}]}, [4]),
+    ],
+)
+def test_query_operators(filter: dict, expected: list[int]):
+    query = Query(filter)
+    assert [doc["_id"] for doc in DOCS if query(doc)] == expected
+
+
+def test_same_shape_reuses_compiled_query():
+    _compile.cache_clear()
+    first = Query({"age": {"$gt": 10}, "name": "ana"})
+    second = Query({"age": {"$gt": 25}, "name": "bia"})
+    assert _compile.cache_info().misses == 1
+    assert _compile.cache_info().hits == 1
+
+    assert [doc["_id"] for doc in DOCS if first(doc)] == [1]
+    assert [doc["_id"] for doc in DOCS if second(doc)] == []
+    assert Query({"$and": [{"name": "ana"}], "age": {"$in": [1]}}).keys == {
+        "name",
+        "age",
+    }
+
+    with pytest.raises(UnsupportedOperation):
+        Query({"age": {"$mod": [2, 0]}})
+    with pytest.raises(UnsupportedOperation):
+        Query({"age": {"$not": 3}})
@@ -0,0 +1,176 @@
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document, RedB
+from redb.interface.configs import JSONConfig
+from redb.json_system import segments
+from redb.json_system.segments import SEGMENTS_FOLDER, SegmentStorage
+from redb.json_system.storage import FileStorage, get_storage
+
+
+class Note(Document):
+    title: str
+    body: str
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_notes"
+
+
+@pytest.fixture
+def config(client_path: Path) -> JSONConfig:
+    return JSONConfig(
+        client_folder_path=client_path,
+        default_database_folder_path="resources",
+        storage="segments",
+        segment_max_bytes=512,
+        compaction_interval=None,
+    )
+
+
+@pytest.fixture
+def notes_path(config: JSONConfig, db_path: Path):
+    RedB.setup(config)
+    path = db_path / "json_notes"
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def notes(notes_path: Path) -> list[Note]:
+    notes = [Note(title=f"Note {i}", body="x" * 100) for i in range(10)]
+    Note.insert_many(notes)
+    return notes
+
+
+def read_records(notes_path: Path) -> list[dict]:
+    records = []
+    for segment in sorted((notes_path / SEGMENTS_FOLDER).glob("*.jsonl")):
+        with open(segment) as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_documents_are_appended(notes_path: Path, notes: list[Note]):
+    assert not list(notes_path.glob("*.json"))
+    assert [record["_id"] for record in read_records(notes_path)] == [
+        note.id for note in notes
+    ]
+    assert Note.count_documents() == 10
+    assert Note.find_one({"_id": notes[3].id}) == notes[3]
+    assert Note.find_one({"title": "Note 7"}) == notes[7]
+
+
+def test_updates_and_deletes(notes_path: Path, notes: list[Note]):
+    Note.update_one({"_id": notes[0].id}, {"body": "updated"})
+    Note.delete_one(notes[1])
+
+    assert Note.find_one({"_id": notes[0].id}).body == "updated"
+    assert Note.count_documents() == 9
+    assert Note.count_documents({"title": "Note 1"}) == 0
+
+    records = read_records(notes_path)
+    assert records[-2]["body"] == "updated"
+    assert records[-1] == {"$deleted": notes[1].id}
+
+
+def test_compaction(notes_path: Path, config: JSONConfig, notes: list[Note]):
+    for note in notes[:5]:
+        Note.delete_one(note)
+    for note in notes[5:]:
+        Note.update_one({"_id": note.id}, {"body": "y"})
+
+    storage = get_storage(notes_path, config)
+    assert storage.compact(force=True)
+    assert {record.get("_id") for record in read_records(notes_path)} >= {
+        note.id for note in notes[5:]
+    }
+    assert Note.count_documents() == 5
+    assert Note.find_one({"_id": notes[9].id}).body == "y"
+
+    # A fresh storage (as in another process) loads the hint files
+    fresh = SegmentStorage(notes_path, max_segment_bytes=512)
+    assert set(fresh.ids()) == {note.id for note in notes[5:]}
+    assert fresh.read(notes[9].id)["body"] == "y"
+    fresh.close()
+
+
+def test_concurrent_compactions(notes_path: Path, notes: list[Note]):
+    for note in notes[:5]:
+        Note.delete_one(note)
+
+    # As if in other processes, each with its own view of the segments
+    storages = [SegmentStorage(notes_path, max_segment_bytes=512) for _ in range(4)]
+    folder = notes_path / SEGMENTS_FOLDER
+    abandoned = folder / ".000001.jsonl.999999999-0.compacting"
+    abandoned.write_bytes(b"partial")
+    with ThreadPoolExecutor(len(storages)) as executor:
+        results = list(executor.map(lambda storage: storage.compact(), storages))
+
+    # The first one compacted, the rest found nothing left to merge
+    assert results.count(True) == 1
+    assert not list(folder.glob(".*"))
+    for storage in storages:
+        assert set(storage.ids()) == {note.id for note in notes[5:]}
+        assert storage.read(notes[9].id)["title"] == "Note 9"
+        storage.close()
+    assert Note.count_documents() == 5
+
+
+def test_insert_many_is_atomic_on_duplicates(notes_path: Path, notes: list[Note]):
+    with pytest.raises(ValueError):
+        Note.insert_many([Note(title="New", body=""), notes[0]])
+    assert Note.count_documents() == 10
+
+
+def test_appends_during_compactions(notes_path: Path, notes: list[Note]):
+    # As if in other processes, two appending and one compacting
+    writers = [SegmentStorage(notes_path, max_segment_bytes=512) for _ in range(2)]
+    compactor = SegmentStorage(notes_path, max_segment_bytes=512)
+
+    def write(writer: SegmentStorage, prefix: str) -> None:
+        for i in range(50):
+            writer.write([{"_id": f"{prefix}{i}", "title": "x" * 100}])
+
+    def compact() -> None:
+        while any(not future.done() for future in futures):
+            compactor.compact(force=True)
+
+    with ThreadPoolExecutor(3) as executor:
+        futures = [
+            executor.submit(write, writer, f"{i}-") for i, writer in enumerate(writers)
+        ]
+        executor.submit(compact).result()
+        for future in futures:
+            future.result()
+
+    fresh = SegmentStorage(notes_path, max_segment_bytes=512)
+    assert len(fresh) == 110
+    for storage in [*writers, compactor, fresh]:
+        storage.close()
+
+
+def test_insert_many_refreshes_once(notes_path: Path, monkeypatch):
+    listings = []
+    list_segments = segments._list_segments
+    monkeypatch.setattr(
+        segments,
+        "_list_segments",
+        lambda folder: listings.append(folder) or list_segments(folder),
+    )
+    Note.insert_many([Note(title=f"Note {i}", body="") for i in range(20)])
+    assert len(listings) < 5
+
+
+def test_storages_follow_the_config(notes_path: Path, config: JSONConfig):
+    assert get_storage(notes_path, config) is get_storage(notes_path, config)
+    files = JSONConfig(client_folder_path=config.client_folder_path, compression="zlib")
+    assert isinstance(get_storage(notes_path, files), FileStorage)
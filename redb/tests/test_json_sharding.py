@@ -0,0 +1,94 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document, RedB
+from redb.interface.configs import JSONConfig
+from redb.json_system.catalog import get_catalog, read_layout
+from redb.json_system.storage import FileStorage, shard_collection
+
+
+class Page(Document):
+    title: str
+    views: int = 0
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_sharded_pages"
+
+
+class FlatPage(Page):
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_flat_pages"
+
+
+def setup_client(client_path: Path, sharded: bool) -> None:
+    RedB.setup(
+        JSONConfig(
+            client_folder_path=client_path,
+            default_database_folder_path="resources",
+            shard_documents=sharded,
+        )
+    )
+
+
+@pytest.fixture
+def pages_path(db_path: Path):
+    paths = []
+
+    def make(name: str) -> Path:
+        path = db_path / name
+        shutil.rmtree(path, ignore_errors=True)
+        paths.append(path)
+        return path
+
+    yield make
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def test_sharded_collection(client_path: Path, pages_path):
+    path = pages_path("json_sharded_pages")
+    setup_client(client_path, sharded=True)
+    pages = [Page(title=f"Page {i}") for i in range(5)]
+    Page.insert_many(pages)
+
+    assert read_layout(path) == "sharded"
+    assert not list(path.glob("*.json"))
+    for page in pages:
+        assert (path / page.id[:2] / page.id[2:4] / f"{page.id}.json").is_file()
+
+    assert Page.count_documents() == 5
+    Page.update_one({"_id": pages[0].id}, {"views": 3})
+    assert Page.find_one({"views": {"$gt": 0}}).id == pages[0].id
+    Page.delete_one({"_id": pages[1].id})
+    assert sorted(page.id for page in Page.find_many()) == sorted(
+        page.id for page in pages if page is not pages[1]
+    )
+    # Another process would rebuild its catalog from the shards
+    assert sorted(FileStorage(path).ids()) == sorted(get_catalog(path).ids())
+
+
+def test_shard_flat_collection(client_path: Path, pages_path):
+    path = pages_path("json_flat_pages")
+    setup_client(client_path, sharded=False)
+    pages = [FlatPage(title=f"Page {i}") for i in range(4)]
+    FlatPage.insert_many(pages)
+    assert len(list(path.glob("*.json"))) == 4
+
+    assert shard_collection(path) == 4
+    assert read_layout(path) == "sharded"
+    assert not list(path.glob("*.json"))
+    assert len(list(path.glob("*/*/*.json"))) == 4
+
+    new_page = FlatPage(title="New")
+    new_page.insert()
+    assert (path / new_page.id[:2] / new_page.id[2:4] / f"{new_page.id}.json").is_file()
+    assert FlatPage.count_documents() == 5
+    assert FlatPage.find_one({"title": "Page 2"}).id == pages[2].id
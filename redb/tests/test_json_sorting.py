@@ -0,0 +1,78 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.core.serializers import get_serializer
+from redb.interface.fields import Direction, SortColumn
+from redb.json_system.sorting import sort_documents
+
+
+class Player(Document):
+    name: str
+    score: int
+    team: str
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_players"
+
+
+@pytest.fixture
+def players(json_client, db_path: Path) -> list[Player]:
+    players = [
+        Player(name="Ana", score=30, team="red"),
+        Player(name="Bia", score=10, team="blue"),
+        Player(name="Caio", score=50, team="red"),
+        Player(name="Davi", score=20, team="red"),
+        Player(name="Eva", score=40, team="blue"),
+        Player(name="Fabi", score=60, team="red"),
+    ]
+    Player.insert_many(players)
+    yield players
+    shutil.rmtree(db_path / "json_players", ignore_errors=True)
+
+
+def test_filter_sort_skip_limit(players: list[Player]):
+    by_score = SortColumn(name="score", direction=Direction.DESCENDING)
+    found = Player.find_many({"team": "red"}, sort=by_score, skip=1, limit=2)
+    assert [player.name for player in found] == ["Caio", "Ana"]
+
+    found = Player.find_many(sort=by_score, skip=4)
+    assert [player.name for player in found] == ["Davi", "Bia"]
+
+    # Without a sort, skip applies to the matches, not to every document
+    assert len(Player.find_many({"team": "red"}, skip=3)) == 1
+
+
+def test_sort_on_several_fields(players: list[Player]):
+    sort = [
+        SortColumn(name="team", direction=Direction.ASCENDING),
+        SortColumn(name="score", direction=Direction.ASCENDING),
+    ]
+    found = Player.find_many(sort=sort, fields=["name"])
+    assert [player["name"] for player in found] == [
+        "Bia",
+        "Eva",
+        "Davi",
+        "Ana",
+        "Caio",
+        "Fabi",
+    ]
+
+
+def test_external_sort():
+    docs = [{"n": n % 7, "tags": [n, -n]} for n in range(50)]
+    serializer = get_serializer()
+
+    sorted_docs = list(sort_documents(docs, [("n", 1)], serializer, buffer_size=8))
+    assert sorted_docs == sorted(docs, key=lambda doc: doc["n"])
+
+    # Arrays sort by their largest element when descending
+    sorted_docs = list(sort_documents(docs, [("tags", -1)], serializer, limit=3))
+    assert [doc["tags"][0] for doc in sorted_docs] == [49, 48, 47]
@@ -0,0 +1,87 @@
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.core.document import _stamp_update
+
+
+class Task(Document):
+    name: str
+    status: str = "open"
+    attempts: int = 0
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_stamped_tasks"
+
+
+@pytest.fixture
+def tasks(json_client, db_path: Path):
+    path = db_path / Task.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_update_stamps_updated_at(tasks: Path):
+    task = Task(name="write", updated_at=datetime(2020, 1, 1))
+    task.insert()
+
+    Task.update_one({"_id": task.id}, {"status": "done"})
+    updated = Task.find_one({"_id": task.id})
+    assert updated.status == "done"
+    assert updated.updated_at.year > 2020
+    assert updated.created_at == task.created_at
+
+
+def test_update_many_changing_filtered_field(tasks: Path):
+    old = datetime(2020, 1, 1)
+    Task.insert_many([Task(name=f"task {i}", updated_at=old) for i in range(3)])
+
+    # Stamped in the same write, it does not matter the filter stops matching
+    result = Task.update_many({"status": "open"}, {"status": "closed"})
+    assert result.matched_count == 3
+    tasks_found = Task.find_many()
+    assert {task.status for task in tasks_found} == {"closed"}
+    assert all(task.updated_at.year > 2020 for task in tasks_found)
+
+
+def test_upsert_sets_both_timestamps(tasks: Path):
+    result = Task.update_one(
+        {"_id": "upserted", "name": "new"}, {"status": "done"}, upsert=True
+    )
+    task = Task.find_one({"_id": result.upserted_id})
+    assert (task.name, task.status) == ("new", "done")
+    assert task.created_at == task.updated_at
+
+
+def test_stamp_update():
+    update = {"$set": {"status": "done"}, "$unset": {"attempts": ""}}
+    stamped = _stamp_update(update, {}, upsert=True)
+    assert update == {"$set": {"status": "done"}, "$unset": {"attempts": ""}}
+    now = stamped["$set"]["updated_at"]
+    assert stamped == {
+        "$set": {"status": "done", "updated_at": now},
+        "$unset": {"attempts": ""},
+        "$setOnInsert": {"created_at": now},
+    }
+
+    # Plain fields are set
+    assert _stamp_update({"status": "done"}, {}, upsert=False)["$set"].keys() == {
+        "status",
+        "updated_at",
+    }
+    # Fields other operators change are left to them
+    assert _stamp_update({"$unset": {"updated_at": ""}}, {}, upsert=False) == {
+        "$unset": {"updated_at": ""}
+    }
+    # Upserted documents take it from the filter then
+    stamped = _stamp_update({"$inc": {"attempts": 1}}, {"created_at": now}, upsert=True)
+    assert "$setOnInsert" not in stamped
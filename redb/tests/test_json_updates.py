@@ -0,0 +1,91 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from redb.core import Document
+from redb.interface.errors import UnsupportedOperation
+from redb.json_system.collection import _apply_update
+
+
+class Counter(Document):
+    name: str
+    hits: int = 0
+    tags: list[str] = []
+    stats: dict = {}
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.name]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_updated_counters"
+
+
+@pytest.fixture
+def counter(json_client, db_path: Path):
+    path = db_path / Counter.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    counter = Counter(name="home", tags=["a"])
+    counter.insert()
+    yield counter
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_update_operators(counter: Counter):
+    Counter.update_one({"_id": counter.id}, {"hits": 2}, operator="$inc")
+    Counter.update_one(
+        {"_id": counter.id}, {"hits": -1, "stats.views": 5}, operator="$inc"
+    )
+    Counter.update_one({"_id": counter.id}, {"tags": "b"}, operator="$push")
+    Counter.update_one(
+        {"_id": counter.id}, {"tags": {"$each": ["b", "c"]}}, operator="$addToSet"
+    )
+    found = Counter.find_one({"_id": counter.id})
+    assert (found.hits, found.tags, found.stats) == (1, ["a", "b", "c"], {"views": 5})
+    assert found.updated_at > counter.updated_at
+
+    Counter.update_many({"name": "home"}, {"tags": "b"}, operator="$pull")
+    assert Counter.find_one({"_id": counter.id}).tags == ["a", "c"]
+
+
+def test_unsupported_update_operator(counter: Counter):
+    with pytest.raises(UnsupportedOperation):
+        Counter.update_one({"_id": counter.id}, {"hits": 2}, operator="$mul")
+    with pytest.raises(UnsupportedOperation):
+        Counter.update_one(
+            {"_id": counter.id},
+            {"tags": {"$each": ["x"], "$slice": 2}},
+            operator="$push",
+        )
+    assert Counter.find_one({"_id": counter.id}).hits == 0
+
+
+def test_apply_update():
+    doc = {"n": 1, "a": {"b": [1, 2, 3, 4]}, "docs": [{"k": 1}, {"k": 2}]}
+    updated = _apply_update(
+        doc,
+        {
+            "$inc": {"n": 1.5, "new": 2},
+            "$pull": {"a.b": {"$gte": 3}, "docs": {"k": 2}},
+            "$push": {"list": {"$each": [1, 1]}},
+        },
+    )
+    assert updated == {
+        "n": 2.5,
+        "new": 2,
+        "a": {"b": [1, 2]},
+        "docs": [{"k": 1}],
+        "list": [1, 1],
+    }
+    # Nested values are copied, not changed in place
+    assert doc == {"n": 1, "a": {"b": [1, 2, 3, 4]}, "docs": [{"k": 1}, {"k": 2}]}
+    # Pulling from a missing field leaves it missing
+    pulled = _apply_update({"tags": ["a"]}, {"$pull": {"tags": "x", "missing.deep": 1}})
+    assert pulled == {"tags": ["a"]}
+
+    with pytest.raises(ValueError):
+        _apply_update({"n": "one"}, {"$inc": {"n": 1}})
+    with pytest.raises(ValueError):
+        _apply_update({"n": 1}, {"$push": {"n": 1}})
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import bson
+import pytest
+from bson import Binary, Int64, ObjectId, Regex
+from pydantic import ValidationError
+
+from redb.mongo_system.lazy import LazyDocument, _element_offsets
+
+from .utils import Embedding
+
+
+def test_lazy_document():
+    embedding = Embedding(
+        kb_name="KB",
+        model="ai",
+        text="Some data.",
+        vector=[0.5] * 512,
+        source_url="www",
+    )
+    raw = bson.encode(embedding.dict())
+    lazy = LazyDocument(Embedding, raw)
+
+    assert lazy.text == "Some data."
+    assert lazy.id == embedding.id
+    assert isinstance(lazy.created_at, datetime)
+    # Only what was looked at got decoded
+    assert set(lazy._values) == {"text", "id", "created_at"}
+    assert lazy.materialize() == embedding
+    assert lazy.dict() == embedding.dict()
+    with pytest.raises(AttributeError):
+        lazy.missing
+
+
+def test_lazy_document_validates_on_access():
+    raw = bson.encode({"_id": "x", "kb_name": 1, "model": "ai", "source_url": "www"})
+    lazy = LazyDocument(Embedding, raw)
+    assert lazy.kb_name == "1"
+    assert lazy.vector is None
+    with pytest.raises(ValidationError):
+        lazy.text
+
+
+def test_element_offsets():
+    doc = {
+        "double": 1.5,
+        "string": "héllo",
+        "document": {"a": [1, {"b": None}]},
+        "binary": Binary(b"\x00\x01", 5),
+        "object_id": ObjectId(),
+        "bool": True,
+        "null": None,
+        "regex": Regex("^a", "i"),
+        "int": 7,
+        "long": Int64(1 << 40),
+        "date": datetime(2024, 1, 1),
+        "last": "end",
+    }
+    raw = bson.encode(doc)
+    offsets = _element_offsets(raw)
+    assert list(offsets) == list(doc)
+    lazy = LazyDocument(Embedding, raw)
+    for key, value in doc.items():
+        assert lazy[key] == value
@@ -0,0 +1,74 @@
+from typing import ClassVar
+
+import pytest
+from pymongo.read_preferences import Primary, SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+
+from redb.core import Document
+from redb.interface.configs import ReadPolicy
+from redb.mongo_system import with_read_policy
+
+ANALYTICS = ReadPolicy(
+    mode="secondaryPreferred", max_staleness=120, read_concern="local"
+)
+
+
+class Report(Document):
+    __read_policy__: ClassVar[ReadPolicy | None] = ANALYTICS
+
+    title: str
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+
+class Order(Document):
+    total: float
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.total]
+
+
+def test_class_read_policy():
+    collection = Document._get_collection(Report)._get_driver_collection()
+    assert collection.read_preference == SecondaryPreferred(max_staleness=120)
+    assert collection.read_concern.level == "local"
+    # Handles are made once per policy
+    assert Document._get_driver_collection(Report) is collection
+
+    driver_collection = Document._get_collection(Order)._get_driver_collection()
+    assert driver_collection.read_preference == Primary()
+
+
+def test_call_read_policy():
+    nearest = ReadPolicy(mode="nearest")
+    collection = Document._get_collection(Order, nearest)._get_driver_collection()
+    assert collection.read_preference.mongos_mode == "nearest"
+    order_collection = Document._get_driver_collection(Order)
+    assert collection.read_concern == order_collection.read_concern
+    # Calls override the policy of the class
+    report = Document._get_collection(Report, ReadPolicy())._get_driver_collection()
+    assert report.read_preference == Primary()
+
+    async_collection = Document._get_async_collection(Report)._get_driver_collection()
+    assert async_collection.read_preference == SecondaryPreferred(max_staleness=120)
+
+
+def test_invalid_read_policy():
+    collection = Document._get_driver_collection(Order)
+    with pytest.raises(ValueError):
+        with_read_policy(collection, ReadPolicy(max_staleness=100))
+    with pytest.raises(ValueError):
+        with_read_policy(collection, ReadPolicy(mode="fastest"))  # type: ignore
+
+
+def test_read_policy_keeps_collection_options():
+    collection = Document._get_driver_collection(Order)
+    majority = collection.with_options(write_concern=WriteConcern("majority"))
+    nearest = ReadPolicy(mode="nearest")
+    handle = with_read_policy(majority, nearest)
+    assert handle.write_concern == WriteConcern("majority")
+    assert with_read_policy(majority, nearest) is handle
+    assert with_read_policy(collection, nearest).write_concern == WriteConcern()
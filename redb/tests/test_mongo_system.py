@@ -1,9 +1,14 @@
+import asyncio
 import os
 from pathlib import Path
 
 import dotenv
 import pytest
-from redb.interface.errors import DocumentNotFound
+from redb.interface.errors import (
+    BulkWriteError,
+    DocumentNotFound,
+    UniqueConstraintViolation,
+)
 from redb.interface.fields import Direction, SortColumn
 
 from .utils import Embedding, RussianDog
@@ -247,3 +252,98 @@ class TestmongoSystem:
             RussianDog.find_one({"_id": ids.inserted_ids[0]})
         with pytest.raises(DocumentNotFound):
             RussianDog.find_one({"_id": ids.inserted_ids[1]})
+
+    def test_async_api(self):
+        async def run():
+            ivan = RussianDog(
+                name="Ivan",
+                age=4,
+                breed="Borzoi",
+                color="White",
+                is_good_boy=True,
+            )
+            await RussianDog.ainsert_one(ivan)
+            assert await RussianDog.afind_one({"_id": ivan.id}) == ivan
+            await RussianDog.aupdate_one({"_id": ivan.id}, {"age": 5})
+            names = [
+                dog.name
+                async for dog in await RussianDog.afind_many({"age": 5}, iterate=True)
+            ]
+            assert names == ["Ivan"]
+            await RussianDog.adelete_one({"_id": ivan.id})
+            with pytest.raises(DocumentNotFound):
+                await RussianDog.afind_one({"_id": ivan.id})
+
+        asyncio.run(run())
+
+    def test_bulk_writer(self):
+        dogs = [
+            RussianDog(
+                name=f"Pup {i}", age=i, breed="Laika", color="Gray", is_good_boy=True
+            )
+            for i in range(5)
+        ]
+        RussianDog.insert_one(dogs[0])
+        with pytest.raises(BulkWriteError) as error:
+            with RussianDog.bulk_writer(max_ops=2) as writer:
+                for dog in dogs:
+                    writer.insert(dog)
+                writer.update_one({"_id": dogs[1].id}, {"color": "Black"})
+        assert isinstance(error.value.errors[0], UniqueConstraintViolation)
+        assert error.value.result.inserted_count == 4
+        assert RussianDog.find_one({"_id": dogs[1].id}).color == "Black"
+        RussianDog.delete_many({"breed": "Laika"})
+
+    def test_aggregate(self):
+        dogs = [
+            RussianDog(
+                name=f"Hound {i}",
+                age=i,
+                breed="Borzoi",
+                color="White",
+                is_good_boy=True,
+            )
+            for i in range(4)
+        ]
+        RussianDog.insert_many(dogs)
+        results = RussianDog.aggregate(
+            [
+                {"$match": {"breed": "Borzoi"}},
+                {
+                    "$group": {
+                        "_id": "$breed",
+                        "age": {"$sum": "$age"},
+                        "dogs": {"$sum": 1},
+                    }
+                },
+            ],
+            allow_disk_use=True,
+            batch_size=10,
+        )
+        assert list(results) == [{"_id": "Borzoi", "age": 6, "dogs": 4}]
+        RussianDog.delete_many({"breed": "Borzoi"})
+
+    def test_paginate(self):
+        dogs = [
+            RussianDog(
+                name=f"Pup {i}",
+                age=i // 2,
+                breed="Samoyed",
+                color="White",
+                is_good_boy=True,
+            )
+            for i in range(5)
+        ]
+        RussianDog.insert_many(dogs)
+        sort = SortColumn(name="age", direction=Direction.ASCENDING)
+        first = RussianDog.paginate({"breed": "Samoyed"}, sort=sort, page_size=3)
+        second = RussianDog.paginate(
+            {"breed": "Samoyed"}, sort=sort, page_size=3, after=first.next
+        )
+        assert [dog.age for dog in first.items + second.items] == [0, 0, 1, 1, 2]
+        assert second.next is None
+        back = RussianDog.paginate(
+            {"breed": "Samoyed"}, sort=sort, page_size=3, before=second.previous
+        )
+        assert back.items == first.items and back.previous is None
+        RussianDog.delete_many({"breed": "Samoyed"})
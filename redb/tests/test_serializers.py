@@ -0,0 +1,118 @@
+import math
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+
+import pytest
+import pytz
+
+from redb.core import Document
+from redb.core.serializers import StdlibSerializer, apply_encoders, get_serializer
+from redb.interface.fields import ObjectId
+
+
+class Upload(Document):
+    name: str
+    path: Path
+    owner: ObjectId
+    uploaded_at: datetime
+    tags: list[str] = []
+
+
+class StdlibUpload(Upload):
+    __serializer__ = "json"
+
+
+@pytest.fixture
+def upload() -> Upload:
+    return Upload(
+        name="report",
+        path=Path("/tmp/report.pdf"),
+        owner=ObjectId(),
+        uploaded_at=datetime(2023, 1, 2, 3, 4, 5, 6, tzinfo=pytz.UTC),
+        tags=["a", "b"],
+    )
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_serializers_match_encoders(name: str, upload: Upload):
+    pytest.importorskip(name)
+    serializer = get_serializer(name)
+    raw = super(Document, upload).dict(by_alias=True)
+    expected = apply_encoders(raw, Upload.__config__.json_encoders)
+
+    assert serializer.to_builtins(raw, Upload.__config__.json_encoders) == expected
+    assert serializer.loads(serializer.dumps(raw)) == expected
+    assert serializer.loads(serializer.dumps(raw, pretty=True)) == expected
+
+
+def test_compact_output(upload: Upload):
+    serializer = StdlibSerializer()
+    data = upload.dict()
+    assert b"\n" not in serializer.dumps(data)
+    assert b"\n" in serializer.dumps(data, pretty=True)
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_pretty_output_matches_stdlib(name: str, upload: Upload):
+    pytest.importorskip(name)
+    data = {**upload.dict(), "nested": {"lines": "a\n  b", "empty": [[], {}]}}
+    # Switching serializer does not rewrite every stored document
+    expected = StdlibSerializer().dumps(data, pretty=True)
+    assert get_serializer(name).dumps(data, pretty=True) == expected
+
+
+def test_document_serializer(upload: Upload):
+    other = StdlibUpload(**upload.dict())
+    assert other.dict() == upload.dict()
+    assert other.dict()["uploaded_at"] == "2023-01-02T03:04:05.000006+00:00"
+
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Label(str, Enum):
+    NEW = "new"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        float("nan"),
+        [0.5, float("inf")],
+        uuid.UUID(int=1),
+        Color.RED,
+        Label.NEW,
+        date(2023, 1, 2),
+        {1: "one"},
+        (1, 2),
+        datetime(2023, 1, 2, tzinfo=timezone(timedelta(hours=5, seconds=30))),
+        2**70,
+    ],
+    ids=lambda value: type(value).__name__,
+)
+def test_orjson_builtins_match_encoders(value):
+    pytest.importorskip("orjson")
+    encoders = Upload.__config__.json_encoders
+    data = {"value": value, "vector": [0.25, 0.5]}
+    builtins = get_serializer("orjson").to_builtins(data, encoders)
+    expected = apply_encoders(data, encoders)
+    if isinstance(value, float):
+        assert math.isnan(builtins["value"])
+    elif isinstance(value, tuple):
+        assert tuple(builtins["value"]) == value
+    else:
+        assert builtins == expected
+        assert type(builtins["value"]) is type(expected["value"])
+
+
+def test_orjson_builtins_without_encoders():
+    pytest.importorskip("orjson")
+    data = {"at": datetime(2023, 1, 2), "path": Path("/tmp")}
+    # Nothing to encode them with, they stay as they are
+    assert get_serializer("orjson").to_builtins(data, {}) == data
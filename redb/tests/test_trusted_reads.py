@@ -0,0 +1,93 @@
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from redb.core import Document
+from redb.core.base import construct_document
+from redb.interface.fields import Direction, SortColumn
+
+
+class Author(BaseModel):
+    name: str
+    verified: bool = False
+
+
+class Post(Document):
+    title: str
+    tags: list[str] = []
+    author: Optional[Author] = None
+    reviewers: list[Author] = []
+    vector: list[float] = []
+
+    @classmethod
+    def get_hashable_fields(cls):
+        return [cls.title]
+
+    @classmethod
+    def collection_name(cls) -> str:
+        return "json_trusted_posts"
+
+
+class TrustedPost(Post):
+    __validate_reads__ = False
+
+
+@pytest.fixture
+def posts(json_client, db_path: Path):
+    path = db_path / Post.collection_name()
+    shutil.rmtree(path, ignore_errors=True)
+    Post.insert_many(
+        [
+            Post(
+                title="first",
+                tags=["a"],
+                author=Author(name="ann", verified=True),
+                reviewers=[Author(name="bob")],
+                vector=[0.5, 1.5],
+            ),
+            Post(title="second"),
+        ]
+    )
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_find_without_validation(posts: Path):
+    validated = Post.find_one({"title": "first"})
+    trusted = Post.find_one({"title": "first"}, validate=False)
+    assert isinstance(trusted, Post)
+    assert trusted == validated
+    assert isinstance(trusted.author, Author)
+    assert isinstance(trusted.reviewers[0], Author)
+    assert isinstance(trusted.created_at, datetime)
+    assert trusted.dict() == validated.dict()
+
+    by_title = SortColumn(name="title", direction=Direction.ASCENDING)
+    unvalidated = Post.find_many(sort=by_title, validate=False)
+    assert unvalidated == Post.find_many(sort=by_title)
+
+
+def test_class_default(posts: Path):
+    trusted = TrustedPost.find_one({"title": "second"})
+    assert trusted == Post.find_one({"title": "second"})
+    # Skipped validation keeps values as stored
+    Document._get_collection(Post).update_one(
+        cls=Post, filter={"title": "second"}, update={"$set": {"tags": "not a list"}}
+    )
+    assert TrustedPost.find_one({"title": "second"}).tags == "not a list"
+    with pytest.raises(ValueError):
+        TrustedPost.find_one({"title": "second"}, validate=True)
+
+
+def test_construct_document():
+    post = construct_document(Post, {"_id": "1", "title": "third", "extra": 1})
+    assert post.id == "1"
+    assert post.tags == [] and post.author is None
+    assert post.__fields_set__ == {"id", "title"}
+    assert not hasattr(post, "extra")
+    with pytest.raises(ValueError):
+        construct_document(Post, {"_id": "1"})
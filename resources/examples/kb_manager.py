@@ -54,21 +54,23 @@ def add_test_documents():
         ),
     ]
 
-    for i, d in enumerate(data):
-        instance = Instance(
-            content_embedding=[embedding],
-            # content_embedding=[],
-            content=d["content"],
-            data_type="text",
-            file_id=file.id,
-            kb_name=d["kb_name"],
-            query=d["query"],
-            # query_embedding=[embedding] if i < 1 else [],
-            # query_embedding=[embedding],
-            query_embedding=[],
-            url=f"file://tmp/document{i}.txt",
-        )
-        Instance.insert_one(instance)
+    # writes are buffered and sent in batches instead of one by one
+    with Instance.bulk_writer() as writer:
+        for i, d in enumerate(data):
+            instance = Instance(
+                content_embedding=[embedding],
+                # content_embedding=[],
+                content=d["content"],
+                data_type="text",
+                file_id=file.id,
+                kb_name=d["kb_name"],
+                query=d["query"],
+                # query_embedding=[embedding] if i < 1 else [],
+                # query_embedding=[embedding],
+                query_embedding=[],
+                url=f"file://tmp/document{i}.txt",
+            )
+            writer.insert(instance)
 
 
 def main():